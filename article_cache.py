@@ -0,0 +1,195 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+from cache import TTLCache, SingleFlight
+from scraper import fetch_article_page
+from extract_pool import EXTRACTION_POOL
+
+# ==============================================================================
+# PERSISTENT ARTICLE CACHE
+# ==============================================================================
+# Lookup order for an article URL:
+#   1. in-memory LRU (fresh entries only)      -> microseconds
+#   2. SQLite row still inside the TTL         -> one indexed read
+#   3. stale SQLite row                        -> conditional GET (ETag / Last-Modified);
+#                                                 304 keeps the stored text, and so does
+#                                                 an error or a failed download
+#   4. nothing stored                          -> full download + extraction
+#
+# The endpoints accept any URL, so the file is kept to ARTICLE_CACHE_MAX_ROWS rows
+# and ARTICLE_CACHE_MAX_AGE_DAYS: writes prune it (at most once a minute), dropping
+# the rows checked least recently first.
+
+# -- Cache Configuration --
+ARTICLE_CACHE_PATH = os.getenv(
+    "ARTICLE_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "article_cache.sqlite3"),
+)
+ARTICLE_CACHE_TTL = float(os.getenv("ARTICLE_CACHE_TTL", str(6 * 3600)))
+ARTICLE_MEMORY_ENTRIES = int(os.getenv("ARTICLE_MEMORY_ENTRIES", "500"))
+ARTICLE_MEMORY_BYTES = int(os.getenv("ARTICLE_MEMORY_BYTES", str(32 * 1024 * 1024)))
+# Retention (0 disables a limit)
+ARTICLE_CACHE_MAX_ROWS = int(os.getenv("ARTICLE_CACHE_MAX_ROWS", "50000"))
+ARTICLE_CACHE_MAX_AGE_DAYS = float(os.getenv("ARTICLE_CACHE_MAX_AGE_DAYS", "30"))
+ARTICLE_CACHE_PRUNE_INTERVAL = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url           TEXT PRIMARY KEY,
+    content       TEXT NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    fetched_at    REAL NOT NULL,
+    checked_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_checked_at ON articles (checked_at);
+"""
+
+
+class ArticleCache:
+    """SQLite-backed article text cache with an in-memory LRU front."""
+
+    def __init__(self, path: str = ARTICLE_CACHE_PATH, ttl: float = ARTICLE_CACHE_TTL,
+                 memory_entries: int = ARTICLE_MEMORY_ENTRIES, memory_bytes: int = ARTICLE_MEMORY_BYTES,
+                 max_rows: int = ARTICLE_CACHE_MAX_ROWS, max_age_days: float = ARTICLE_CACHE_MAX_AGE_DAYS,
+                 prune_interval: float = ARTICLE_CACHE_PRUNE_INTERVAL):
+        self.path = path
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.max_age_days = max_age_days
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+        self.memory = TTLCache(max_entries=memory_entries, max_bytes=memory_bytes, ttl=ttl)
+        self.flights = SingleFlight()
+        self._conn = None
+        self._lock = threading.Lock()
+        self.revalidated = 0
+        self.refetched = 0
+        self.kept_stale = 0
+        self.pruned = 0
+
+    # -- SQLite (runs in worker threads) --
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _read(self, url: str):
+        with self._lock:
+            return self._connect().execute(
+                "SELECT content, etag, last_modified, checked_at FROM articles WHERE url = ?", (url,)
+            ).fetchone()
+
+    def _write(self, url: str, content: str, etag: str, last_modified: str, now: float):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO articles (url, content, etag, last_modified, fetched_at, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET content = excluded.content, etag = excluded.etag, "
+                "last_modified = excluded.last_modified, fetched_at = excluded.fetched_at, "
+                "checked_at = excluded.checked_at",
+                (url, content, etag, last_modified, now, now),
+            )
+            if now - self._last_prune >= self.prune_interval:
+                self._last_prune = now
+                self.pruned += self._prune(conn, now)
+            conn.commit()
+
+    def _prune(self, conn, now: float) -> int:
+        deleted = 0
+        if self.max_age_days > 0:
+            deleted += conn.execute("DELETE FROM articles WHERE checked_at < ?",
+                                    (now - self.max_age_days * 86400,)).rowcount
+        if self.max_rows > 0:
+            excess = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0] - self.max_rows
+            if excess > 0:
+                deleted += conn.execute(
+                    "DELETE FROM articles WHERE url IN (SELECT url FROM articles ORDER BY checked_at LIMIT ?)",
+                    (excess,)).rowcount
+        return deleted
+
+    def _touch(self, url: str, now: float):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("UPDATE articles SET checked_at = ? WHERE url = ?", (now, url))
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # -- Public API --
+
+    async def get(self, url: str) -> str:
+        """Returns the article text for url, fetching or revalidating only when needed."""
+        content = self.memory.get(url)
+        if content is not None:
+            return content
+        # Concurrent misses for the same URL share one lookup/download
+        return await self.flights.do(url, lambda: self._load(url))
+
+    async def _load(self, url: str) -> str:
+        now = time.time()
+        row = await asyncio.to_thread(self._read, url)
+
+        if row:
+            content, etag, last_modified, checked_at = row
+            age = now - checked_at
+            if age < self.ttl:
+                self.memory.set(url, content, ttl=self.ttl - age)
+                return content
+
+            # Stale row: revalidate (a plain refetch when there are no validators). Anything
+            # but a fresh 200 keeps the stored text, and checked_at moves on either way, so a
+            # page that errors or times out is retried after another TTL, not on every request.
+            try:
+                page = await fetch_article_page(url, etag=etag, last_modified=last_modified)
+            except Exception as e:
+                print(f"[ArticleCache] Revalidation failed for {url}, keeping stored text: {type(e).__name__}: {e}")
+                page = None
+            if page is not None and page.status == 200:
+                fresh = await self._store(url, page, now)
+                if fresh:
+                    return fresh
+            if page is not None and page.status == 304:
+                self.revalidated += 1
+            else:
+                self.kept_stale += 1
+            await asyncio.to_thread(self._touch, url, now)
+            self.memory.set(url, content)
+            return content
+
+        page = await fetch_article_page(url)
+        return await self._store(url, page, now)
+
+    async def _store(self, url: str, page, now: float) -> str:
+        self.refetched += 1
+        content = await EXTRACTION_POOL.extract(page.html, page.domain)
+        # Only successful pages are worth remembering; error pages get re-tried next time
+        if page.status == 200 and content:
+            await asyncio.to_thread(self._write, url, content, page.etag, page.last_modified, now)
+            self.memory.set(url, content)
+        return content
+
+    def stats(self) -> dict:
+        return {
+            "memory": self.memory.stats(),
+            "revalidated_304": self.revalidated,
+            "fetched": self.refetched,
+            "kept_stale": self.kept_stale,
+            "pruned": self.pruned,
+        }
+
+
+ARTICLE_CACHE = ArticleCache()
@@ -0,0 +1,231 @@
+import os
+import time
+
+from filters import AhoCorasick
+
+# ==============================================================================
+# BATCHED POLLING
+# ==============================================================================
+# Polling each watched base query on its own makes quota use grow linearly with
+# the number of watched keywords. Instead, single-term base queries are packed
+# into combined OR queries ('삼성 | 애플 | 테슬라') fetched with the full display
+# window, and every returned item is routed back to the bases whose term
+# appears in its title or description (one Aho-Corasick scan per item). A
+# cycle then costs one call per batch instead of one per keyword.
+#
+# A batch whose window comes back full, with even its oldest item newer than
+# the newest one the previous poll saw, may have dropped items in between: it
+# is split in half (a single base gets the full window instead) and the new
+# batches are polled right away. Members of a split batch take no new members
+# and aren't merged back for POLL_BATCH_COOLDOWN.
+#
+# Multi-word bases, phrases and queries with operators can't be nested in an OR
+# query, so they are polled alone, exactly as before (POLL_BATCH_SIZE=1 turns
+# batching off altogether).
+
+POLL_BATCH_SIZE = int(os.getenv("POLL_BATCH_SIZE", "30"))
+POLL_BATCH_DISPLAY = int(os.getenv("POLL_BATCH_DISPLAY", "100"))  # Naver allows display <= 100
+POLL_BATCH_MAX_CHARS = int(os.getenv("POLL_BATCH_MAX_CHARS", "200"))
+POLL_BATCH_COOLDOWN = float(os.getenv("POLL_BATCH_COOLDOWN", "1800"))
+# Batches are packed so their members' expected new items over this many seconds fill at most half the window
+POLL_BATCH_HORIZON = float(os.getenv("POLL_BATCH_HORIZON", "60"))
+RATE_SMOOTHING = 0.3
+SOLO_DISPLAY = 20  # a base polled alone fetches its first results page
+
+OR_OPERATOR = " | "
+_OPERATOR_CHARS = set('"|()')
+
+
+def packable(base: str) -> bool:
+    """A single search term without operators, which can go into an OR query as is."""
+    return bool(base) and not any(c.isspace() or c in _OPERATOR_CHARS for c in base) and base[0] not in "+-"
+
+
+class PollBatch:
+    """Base queries fetched together with one upstream call. Identity-hashed, so it can key a schedule."""
+
+    __slots__ = ("bases", "query", "display", "_matcher")
+
+    def __init__(self, bases, display: int = None):
+        self.bases = tuple(bases)
+        self.query = OR_OPERATOR.join(self.bases)
+        self.display = display or (SOLO_DISPLAY if self.solo else POLL_BATCH_DISPLAY)
+        self._matcher = None if self.solo else AhoCorasick(base.lower() for base in self.bases)
+
+    @property
+    def solo(self) -> bool:
+        return len(self.bases) == 1
+
+    def demux(self, items) -> dict:
+        """
+        { base: [items] } for every member, in upstream order. An item goes to each
+        base whose term is in its title or description; items matching none
+        (Naver also matches article bodies and word forms) are dropped.
+        """
+        if self.solo:
+            return {self.bases[0]: list(items)}
+        routed = {base: [] for base in self.bases}
+        for item in items:
+            found = self._matcher.scan(item.search_text.lower())
+            index = 0
+            while found:
+                if found & 1:
+                    routed[self.bases[index]].append(item)
+                found >>= 1
+                index += 1
+        return routed
+
+    def __str__(self):
+        return self.query
+
+    def __repr__(self):
+        return f"PollBatch({self.query!r})"
+
+
+class QueryBatcher:
+    """
+    Packs watched base queries into PollBatches and keeps the packing stable
+    between cycles: a batch object is reused as long as its members don't
+    change, so the scheduler keeps its adaptive interval.
+
+    Batches are bounded by volume as well as size: each base's rate of new
+    items is estimated from the polls, and groups are only merged while their
+    combined rate fills at most half the display window over `horizon`
+    seconds. Quiet keywords (most of them) share a few large batches, so calls
+    per cycle grow much more slowly than the number of watched keywords.
+    """
+
+    def __init__(self, batch_size: int = POLL_BATCH_SIZE, max_chars: int = POLL_BATCH_MAX_CHARS,
+                 cooldown: float = POLL_BATCH_COOLDOWN, horizon: float = POLL_BATCH_HORIZON, clock=time.monotonic):
+        self.clock = clock
+        self.batch_size = batch_size
+        self.max_chars = max_chars
+        self.cooldown = cooldown
+        self.horizon = horizon
+        self.batches = []
+        self.hot = {}          # base -> monotonic time until which it stays in a split batch
+        self.watermarks = {}   # base -> newest published_at of the last unsaturated window covering it
+        self.rates = {}        # base -> estimated new items per second (EWMA)
+        self.last_polled = {}  # base -> monotonic time of its last poll
+        self.polls = 0
+        self.saturated = 0
+        self.splits = 0
+        self.routed = 0
+        self.unrouted = 0
+
+    # -- Packing --
+
+    def _mergeable(self, group: list, now: float) -> bool:
+        return all(packable(base) and self.hot.get(base, 0) <= now for base in group)
+
+    def _volume(self, group: list) -> float:
+        return sum(self.rates.get(base, 0.0) for base in group) * self.horizon
+
+    def _fits(self, group: list, other: list) -> bool:
+        return (len(group) + len(other) <= self.batch_size
+                and len(OR_OPERATOR.join(group + other)) <= self.max_chars
+                and self._volume(group) + self._volume(other) <= POLL_BATCH_DISPLAY / 2)
+
+    def plan(self, bases) -> list:
+        """
+        The batches covering `bases`. Current batches keep their members (minus
+        unwatched ones); new bases and shrunken batches are packed first-fit
+        into batches with room.
+        """
+        wanted = list(dict.fromkeys(bases))
+        wanted_set = set(wanted)
+        now = self.clock()
+        for table in (self.hot, self.watermarks, self.rates, self.last_polled):
+            for base in [base for base in table if base not in wanted_set]:
+                del table[base]
+
+        groups = [[base for base in batch.bases if base in wanted_set] for batch in self.batches]
+        placed = {base for group in groups for base in group}
+        groups = [group for group in groups if group] + [[base] for base in wanted if base not in placed]
+
+        packed = []
+        for group in groups:
+            if self._mergeable(group, now):
+                target = next((other for other in packed
+                               if self._mergeable(other, now) and self._fits(other, group)), None)
+                if target is not None:
+                    target.extend(group)
+                    continue
+            packed.append(group)
+
+        current = {batch.bases: batch for batch in self.batches}
+        self.batches = [current.get(tuple(group)) or PollBatch(group) for group in packed]
+        return list(self.batches)
+
+    # -- Polling Results --
+
+    def ingest(self, batch: PollBatch, items) -> dict:
+        """
+        Takes one poll's results: routes them to the batch's bases (see
+        PollBatch.demux), updates the bases' volume estimates and checks the
+        window for saturation. A saturated batch is split, or widened to the
+        full display window if it's a single base; the new batches replace it
+        in the next plan(). Returns { base: [items] }.
+        """
+        now = self.clock()
+        self.polls += 1
+        routed = batch.demux(items)
+        if not batch.solo:
+            links = {item.link for found in routed.values() for item in found}
+            self.routed += len(links)
+            self.unrouted += len(items) - len(links)
+
+        for base, found in routed.items():
+            mark, last = self.watermarks.get(base), self.last_polled.get(base)
+            if mark is not None and last is not None and now > last:
+                rate = sum(1 for item in found if item.published_at > mark) / (now - last)
+                previous = self.rates.get(base)
+                self.rates[base] = rate if previous is None else previous + RATE_SMOOTHING * (rate - previous)
+            self.last_polled[base] = now
+
+        if not items:
+            return routed
+        marks = [self.watermarks[base] for base in batch.bases if base in self.watermarks]
+        # pubDate has one-second resolution: a window ending in the watermark's second may have lost its other items
+        saturated = len(items) >= batch.display and bool(marks) and min(item.published_at for item in items) >= min(marks)
+        if saturated:
+            self.saturated += 1
+            if batch in self.batches and (not batch.solo or batch.display < POLL_BATCH_DISPLAY):
+                # Keep the old watermarks: the new batches have to reach back to them too
+                self._split(batch)
+                return routed
+        newest = max(item.published_at for item in items)
+        for base in batch.bases:
+            self.watermarks[base] = max(newest, self.watermarks.get(base, 0))
+        return routed
+
+    def _split(self, batch: PollBatch):
+        until = self.clock() + self.cooldown
+        for base in batch.bases:
+            self.hot[base] = until
+        if batch.solo:
+            replacement = [PollBatch(batch.bases, display=POLL_BATCH_DISPLAY)]
+        else:
+            # Busiest bases in one half, so a single hot keyword ends up alone quickly
+            bases = sorted(batch.bases, key=lambda base: -self.rates.get(base, 0.0))
+            half = (len(bases) + 1) // 2
+            replacement = [PollBatch(part, display=POLL_BATCH_DISPLAY) for part in (bases[:half], bases[half:])]
+        index = self.batches.index(batch)
+        self.batches[index:index + 1] = replacement
+        self.splits += 1
+        print(f"[Polling] Window saturated, splitting batch: {batch.query}")
+
+    def stats(self) -> dict:
+        bases = sum(len(batch.bases) for batch in self.batches)
+        return {
+            "batches": len(self.batches),
+            "bases": bases,
+            "packed_bases": sum(len(batch.bases) for batch in self.batches if not batch.solo),
+            "calls_per_cycle_saved": bases - len(self.batches),
+            "hot_bases": sum(1 for until in self.hot.values() if until > self.clock()),
+            "polls": self.polls,
+            "saturated_polls": self.saturated,
+            "splits": self.splits,
+            "routed_items": self.routed,
+            "unrouted_items": self.unrouted,
+        }
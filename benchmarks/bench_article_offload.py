@@ -0,0 +1,97 @@
+"""
+bench_article_offload.py
+
+Drives concurrent /api/article requests through the ASGI app in-process and
+records event-loop lag for each extraction executor (inline / thread / process).
+Article pages are served from benchmarks/fixtures by a mock transport, and each
+request uses a distinct URL so every one is a cache miss that needs a parse.
+
+    python benchmarks/bench_article_offload.py [-n REQUESTS] [-c CONCURRENCY] [-w WORKERS]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ["ARTICLE_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "bench_articles.sqlite3")
+
+import httpx
+
+import http_client
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+PAGES = {
+    name: open(os.path.join(FIXTURES, name), "rb").read()
+    for name in ("naver_news.html", "yna.html", "unknown_generic.html", "og_only.html")
+}
+HOSTS = {"naver_news.html": "n.news.naver.com", "yna.html": "www.yna.co.kr",
+         "unknown_generic.html": "www.example-local-news.kr", "og_only.html": "www.example-broadcast.kr"}
+
+
+def article_handler(request: httpx.Request):
+    for name, host in HOSTS.items():
+        if request.url.host == host:
+            return httpx.Response(200, content=PAGES[name], headers={"content-type": "text/html; charset=utf-8"})
+    return httpx.Response(404)
+
+
+_build = http_client._build_client
+def _mock_build(role):
+    client = _build(role)
+    client._transport = httpx.MockTransport(article_handler)
+    return client
+http_client._build_client = _mock_build
+
+import main  # noqa: E402  (imported after the transport patch and cache path override)
+from extract_pool import EXTRACTION_POOL  # noqa: E402
+from loop_monitor import LOOP_MONITOR  # noqa: E402
+
+
+async def run_mode(kind: str, n: int, concurrency: int, workers: int):
+    EXTRACTION_POOL.shutdown()
+    EXTRACTION_POOL.configure(kind, workers, max_pending=concurrency * 2, queue_timeout=60)
+    EXTRACTION_POOL.start()
+    main.ARTICLE_CACHE.memory.clear()
+
+    transport = httpx.ASGITransport(app=main.app)
+    hosts = list(HOSTS.values())
+    sem = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i):
+            async with sem:
+                url = f"https://{hosts[i % len(hosts)]}/article/{kind}/{i}"
+                r = await client.get("/api/article", params={"url": url})
+                assert r.status_code == 200, r.text
+
+        await asyncio.sleep(0.3)
+        LOOP_MONITOR.reset()
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(n)))
+        wall = time.perf_counter() - t0
+
+    lag = LOOP_MONITOR.stats()
+    print(f"{kind:<8} wall={wall:6.2f}s  rps={n / wall:6.1f}  loop lag p50={lag['p50_ms']:7.1f}ms  "
+          f"p99={lag['p99_ms']:7.1f}ms  max={lag['max_ms']:7.1f}ms")
+
+
+async def amain(args):
+    LOOP_MONITOR.interval = 0.02
+    LOOP_MONITOR.start()
+    for kind in ("inline", "thread", "process"):
+        await run_mode(kind, args.requests, args.concurrency, args.workers)
+    LOOP_MONITOR.stop()
+    EXTRACTION_POOL.shutdown()
+    main.ARTICLE_CACHE.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--requests", type=int, default=80)
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-w", "--workers", type=int, default=4)
+    asyncio.run(amain(parser.parse_args()))
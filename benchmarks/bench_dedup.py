@@ -0,0 +1,105 @@
+"""
+bench_dedup.py
+
+Near-duplicate index on a synthetic wire feed: every story is republished by
+several outlets with their own dateline, byline, '[속보]' tags and small edits,
+mixed with unrelated stories. Reports clustering quality (stories kept apart,
+copies folded), ingest cost per item, memory per indexed item and how much
+smaller a collapsed results page is.
+
+    python benchmarks/bench_dedup.py [--stories N] [--copies N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dedup
+from scraper import NewsItem
+from serialization import encode_items
+
+OUTLETS = [("연합뉴스", "(서울=연합뉴스) {} 기자 = "), ("뉴스1", "[서울=뉴스1] {} 기자 = "),
+           ("뉴시스", "[서울=뉴시스]{} 기자 = "), ("한국경제", ""), ("매일경제", ""), ("머니투데이", "")]
+NAMES = ["김철수", "이영희", "박민수", "최지은", "정하늘"]
+WORDS = ("정부 국회 위원회 발표 예산 증가 감소 시장 기업 실적 반도체 방송 통신 심의 규제 정책 회의 "
+         "대통령 장관 의원 여당 야당 법안 통과 논란 조사 결과 전망 투자 수출 금리 물가 고용 지원").split()
+
+
+def make_story(rng: random.Random, i: int):
+    topic = rng.sample(WORDS, 6)
+    figure = f"{rng.randint(2, 99)}.{rng.randint(0, 9)}"
+    title = f"{topic[0]} {topic[1]}, {figure}% {topic[2]}…{topic[3]} {topic[4]} {i}"
+    body = " ".join(rng.choice(WORDS) for _ in range(18))
+    return title, f"{topic[0]}{'가' if i % 2 else '는'} {body} {figure}% {topic[5]} 것으로 나타났다."
+
+
+def copy_of(rng: random.Random, title: str, desc: str, outlet: int):
+    name, dateline = OUTLETS[outlet]
+    words = desc.split()
+    for _ in range(rng.randint(0, 2)):  # light edits
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    prefix = "[속보] " if rng.random() < 0.2 else ""
+    return name, prefix + title, dateline.format(rng.choice(NAMES)) + " ".join(words)
+
+
+def build_feed(n_stories: int, copies: int, seed: int = 3):
+    rng = random.Random(seed)
+    items, truth = [], []
+    for i in range(n_stories):
+        title, desc = make_story(rng, i)
+        for c in range(rng.randint(1, copies)):
+            source, t, d = copy_of(rng, title, desc, c % len(OUTLETS))
+            items.append(NewsItem(t, f"https://n.news.naver.com/{i}/{c}", d, source=source,
+                                  pubDate=f"Mon, 13 Oct 2025 {c % 24:02d}:00:00 +0900"))
+            truth.append(i)
+    order = list(range(len(items)))
+    rng.shuffle(order)
+    return [items[k] for k in order], [truth[k] for k in order]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stories", type=int, default=3000)
+    parser.add_argument("--copies", type=int, default=6)
+    args = parser.parse_args()
+
+    items, truth = build_feed(args.stories, args.copies)
+
+    index = dedup.NearDuplicateIndex(max_items=len(items))
+    t0 = time.perf_counter()
+    index.add(items)
+    elapsed = time.perf_counter() - t0
+
+    # Memory on a separate index: tracemalloc slows the interpreter down too much to time under it
+    tracemalloc.start()
+    measured = dedup.NearDuplicateIndex(max_items=len(items))
+    measured.add(items)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Pairwise quality over item pairs: same story <-> same cluster
+    by_story, by_cluster = {}, {}
+    for item, story in zip(items, truth):
+        cluster = index.cluster_of(item).id
+        by_story.setdefault(story, set()).add(cluster)
+        by_cluster.setdefault(cluster, set()).add(story)
+    split = sum(len(clusters) - 1 for clusters in by_story.values())
+    merged = sum(len(stories) - 1 for stories in by_cluster.values())
+
+    # A keyword's results page: the copies of a handful of stories
+    page = [item for item, story in zip(items, truth) if story < 30][:100]
+    collapsed = index.collapse(page)
+
+    print(f"{len(items)} items from {args.stories} stories (1-{args.copies} outlets each)")
+    print(f"clusters: {len(index.clusters)}  (stories split apart: {split}, distinct stories merged: {merged})")
+    print(f"ingest: {elapsed / len(items) * 1e6:.1f} us/item, memory: {memory / len(items):.0f} B/item")
+    print(f"100-item page: {len(collapsed)} cards, JSON {len(encode_items(page))} -> "
+          f"{len(encode_items(collapsed))} bytes")
+
+
+if __name__ == "__main__":
+    main()
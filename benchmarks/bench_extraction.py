@@ -0,0 +1,81 @@
+"""
+bench_extraction.py
+
+Extraction time and peak memory per page over the saved fixture corpus
+(benchmarks/fixtures), comparing the legacy generic full-tree extraction with
+extractors.extract_article_text (registry + SoupStrainer + fast parser).
+
+    python benchmarks/bench_extraction.py [-n RUNS]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+import extractors
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def legacy_extract(html_content: str) -> str:
+    """The original parse_article logic: full html.parser tree + generic selectors."""
+    soup = BeautifulSoup(html_content, "html.parser")
+    for tag, attr, value in extractors.GENERIC_RULES:
+        section = soup.find(tag, attrs={attr: value}) if attr else soup.find(tag)
+        if section:
+            text = section.get_text(" ", strip=True)
+            if len(text) > 50:
+                return text
+    og_desc = soup.find("meta", property="og:description")
+    if og_desc:
+        return og_desc.get("content", "")
+    return soup.get_text(" ", strip=True)[:1000] + "..."
+
+
+def measure(fn, runs: int):
+    fn()  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        result = fn()
+    elapsed = (time.perf_counter() - t0) / runs
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with open(os.path.join(FIXTURES, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    print(f"parser backend: {extractors.ARTICLE_PARSER}")
+    print(f"{'fixture':<22}{'KB':>7}  {'legacy ms':>10}{'peak KB':>9}  {'new ms':>8}{'peak KB':>9}  {'speedup':>7}  same text")
+    totals = [0.0, 0.0]
+    for entry in manifest:
+        with open(os.path.join(FIXTURES, entry["file"]), encoding="utf-8") as f:
+            html_content = f.read()
+        domain = urlparse(entry["url"]).netloc
+
+        old_t, old_mem, old_text = measure(lambda: legacy_extract(html_content), args.runs)
+        new_t, new_mem, new_text = measure(lambda: extractors.extract_article_text(html_content, domain), args.runs)
+        totals[0] += old_t
+        totals[1] += new_t
+        print(f"{entry['file']:<22}{len(html_content.encode()) / 1024:7.0f}  {old_t * 1000:10.2f}{old_mem / 1024:9.0f}  "
+              f"{new_t * 1000:8.2f}{new_mem / 1024:9.0f}  {old_t / new_t:6.1f}x  {old_text == new_text}")
+    print(f"{'total':<22}{'':>7}  {totals[0] * 1000:10.2f}{'':>9}  {totals[1] * 1000:8.2f}{'':>9}  {totals[0] / totals[1]:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
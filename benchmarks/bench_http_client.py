@@ -0,0 +1,92 @@
+"""
+bench_http_client.py
+
+Compares a fresh httpx.AsyncClient per request (the old fetch_news behaviour)
+against the shared pooled client from http_client.py.
+
+    python benchmarks/bench_http_client.py                 # local keep-alive server
+    python benchmarks/bench_http_client.py --url https://openapi.naver.com/v1/search/news.json
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+import http_client
+from local_server import start_server
+
+
+async def per_request(url: str, n: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def one():
+        async with sem:
+            t0 = time.perf_counter()
+            async with httpx.AsyncClient(timeout=10) as client:
+                await client.get(url)
+            timings.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(one() for _ in range(n)))
+    return timings
+
+
+async def pooled(url: str, n: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    timings = []
+    client = http_client.get_client(http_client.NAVER_API)
+
+    async def one():
+        async with sem:
+            t0 = time.perf_counter()
+            await client.get(url)
+            timings.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(one() for _ in range(n)))
+    await http_client.shutdown_http_clients()
+    return timings
+
+
+def report(label: str, timings: list, wall: float):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<14} n={len(timings):<5} wall={wall * 1000:8.1f}ms  "
+          f"mean={statistics.mean(timings) * 1000:7.2f}ms  p95={p95 * 1000:7.2f}ms  "
+          f"rps={len(timings) / wall:8.1f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="Remote URL to hit instead of the local server")
+    parser.add_argument("-n", type=int, default=500)
+    parser.add_argument("-c", "--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        server, url, stats = await start_server()
+        url += "/v1/search/news.json"
+
+    for label, fn in (("per-request", per_request), ("pooled", pooled)):
+        if server:
+            stats["connections"] = 0
+        t0 = time.perf_counter()
+        timings = await fn(url, args.n, args.concurrency)
+        report(label, timings, time.perf_counter() - t0)
+        if server:
+            print(f"{'':<14} upstream connections opened: {stats['connections']}")
+
+    if server:
+        server.close()
+        await server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""
+bench_poll_batching.py
+
+Simulates polling N watched keywords every 30s over a synthetic feed and
+compares one call per keyword with OR-merged batches (batching.QueryBatcher).
+Keyword volumes are Zipf-skewed. One keyword has a breaking-news burst that
+saturates its batch's window. A share of items mention their keyword only in
+the article body: Naver matches those, but the local demultiplexer can't.
+
+Reports upstream calls per cycle and the share of each keyword's articles
+that were delivered. Batching is measured against what solo polling
+delivers, and against everything published.
+
+    python benchmarks/bench_poll_batching.py [--watchers 10,50,200] [--hours 2]
+"""
+import argparse
+import bisect
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batching
+from batching import OR_OPERATOR, QueryBatcher
+from scraper import NewsItem
+
+CYCLE = 30.0
+SYLLABLES = "가나다라마바사아자차카타파하강남동론몽병상원전정진천현화"
+
+
+def make_keywords(n: int, rng: random.Random):
+    """Distinct 3-syllable terms, none a substring of another."""
+    words = set()
+    while len(words) < n:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(3)))
+    return sorted(words)
+
+
+class FakeSearch:
+    """Date-sorted search over the synthetic corpus with Naver's 'a | b' OR semantics."""
+
+    def __init__(self, keywords, hours: float, body_only: float, rng: random.Random):
+        self.by_term = {k: [] for k in keywords}     # term -> [(published_at, item)] ascending
+        self.truth = {k: [] for k in keywords}       # every item mentioning the keyword
+        horizon = hours * 3600
+        burst_keyword = keywords[3 % len(keywords)]
+        serial = 0
+        for rank, keyword in enumerate(keywords):
+            rate = 60 / (rank + 1) + 0.5              # items per hour
+            times = []
+            t = rng.expovariate(rate / 3600)
+            while t < horizon:
+                times.append(t)
+                t += rng.expovariate(rate / 3600)
+            if keyword == burst_keyword:              # breaking news: 3,000 items in 10 minutes
+                start = horizon / 2
+                times += [start + rng.random() * 600 for _ in range(3000)]
+            for t in times:
+                serial += 1
+                other = rng.choice(keywords)
+                text = f"{other} 관련 소식" if rng.random() < body_only else f"{keyword} 관련 소식 {other}"
+                item = NewsItem(f"기사 {serial}", f"https://n.news.naver.com/{serial}", text, published_at=t)
+                for term in {keyword, other} if text.startswith(keyword) else {keyword}:
+                    self.by_term[term].append((t, item))
+                    self.truth[term].append(item)
+        for postings in self.by_term.values():
+            postings.sort(key=lambda posting: posting[0])
+        self.times = {term: [t for t, _ in postings] for term, postings in self.by_term.items()}
+        self.calls = 0
+
+    def __call__(self, query: str, display: int, now: float):
+        self.calls += 1
+        found = {}
+        for term in query.split(OR_OPERATOR):
+            postings = self.by_term.get(term, [])
+            end = bisect.bisect_right(self.times.get(term, []), now)
+            for _, item in postings[max(0, end - display):end]:
+                found[item.link] = item
+        return sorted(found.values(), key=lambda item: -item.published_at)[:display]
+
+
+def simulate(search: FakeSearch, keywords, hours: float, batch_size: int):
+    clock = {"now": 0.0}
+    batcher = QueryBatcher(batch_size=batch_size, clock=lambda: clock["now"])  # simulated time
+    delivered = {k: set() for k in keywords}
+    search.calls = 0
+    cycles = int(hours * 3600 / CYCLE)
+    for cycle in range(1, cycles + 1):
+        clock["now"] = now = cycle * CYCLE
+        polled = set()
+        pending = batcher.plan(keywords)
+        while pending:
+            for batch in pending:
+                polled.add(batch)
+                items = search(batch.query, batch.display, now)
+                for base, found in batcher.ingest(batch, items).items():
+                    delivered[base].update(item.link for item in found)
+                if batch not in batcher.batches:   # split
+                    break
+            # New batches from a split are polled right away, as the scheduler does
+            pending = [batch for batch in batcher.plan(keywords) if batch not in polled]
+    return search.calls / cycles, delivered, batcher.stats()
+
+
+def coverage(delivered, reference):
+    want = sum(len(links) for links in reference.values())
+    got = sum(len(delivered[k] & links) for k, links in reference.items())
+    return got / want if want else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--watchers", default="10,50,200")
+    parser.add_argument("--hours", type=float, default=2)
+    parser.add_argument("--body-only", type=float, default=0.1, help="share of items matching only in the body")
+    args = parser.parse_args()
+
+    print(f"{'watched':>7} {'solo calls/cycle':>17} {'batched calls/cycle':>20} "
+          f"{'vs solo':>8} {'vs all':>7} {'solo vs all':>12} {'splits':>7}")
+    for n in map(int, args.watchers.split(",")):
+        rng = random.Random(n)
+        keywords = make_keywords(n, rng)
+        search = FakeSearch(keywords, args.hours, args.body_only, rng)
+        everything = {k: {item.link for item in items} for k, items in search.truth.items()}
+        solo_calls, solo, _ = simulate(search, keywords, args.hours, batch_size=1)
+        calls, batched, stats = simulate(search, keywords, args.hours, batch_size=batching.POLL_BATCH_SIZE)
+        print(f"{n:>7} {solo_calls:>17.2f} {calls:>20.2f} {coverage(batched, solo):>8.1%} "
+              f"{coverage(batched, everything):>7.1%} {coverage(solo, everything):>12.1%} {stats['splits']:>7}")
+
+
+if __name__ == "__main__":
+    main()
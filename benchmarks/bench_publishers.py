@@ -0,0 +1,114 @@
+"""
+bench_publishers.py
+
+Publisher resolution over a large corpus of originallink URLs. Hosts come from
+benchmarks/fixtures/originallink_hosts.txt and are drawn with a Zipf-like skew,
+the way a few wire services dominate a feed. A share of one-off hosts stands in
+for the long tail of small local sites. Compares the old exact lookup (strip
+'www.', DOMAIN_MAP.get) with a parent-domain walk over a dict, the bare trie
+and the memoized resolver, with urlparse and with the string-split netloc_of
+that ingest uses. Reports time per item and how many items resolve to
+an outlet name instead of a raw host.
+
+    python benchmarks/bench_publishers.py [-n ITEMS] [--tail SHARE]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import publishers
+
+HOSTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "originallink_hosts.txt")
+
+
+def load_hosts():
+    with open(HOSTS_FILE, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def build_corpus(n: int, tail: float, seed: int = 11):
+    rng = random.Random(seed)
+    hosts = load_hosts()
+    weights = [1 / (rank + 1) for rank in range(len(hosts))]
+    urls = []
+    for i, host in enumerate(rng.choices(hosts, weights, k=n)):
+        if rng.random() < tail:
+            host = f"www.local{rng.randrange(10 ** 6)}.co.kr"
+        urls.append(f"https://{host}/news/articleView.html?idxno={i}")
+    return urls
+
+
+def exact_lookup(mapping):
+    def resolve(url):
+        domain = urlparse(url).netloc.replace("www.", "")
+        return domain, mapping.get(domain, domain)
+    return resolve
+
+
+def parent_walk(mapping):
+    """Suffix matching without a trie: probe the host, then each parent domain."""
+    def resolve(url):
+        domain = publishers.host_of(urlparse(url).netloc)
+        host = domain
+        while host:
+            if host in mapping:
+                return domain, mapping[host]
+            host = host.partition(".")[2]
+        return domain, domain
+    return resolve
+
+
+def trie_lookup(trie):
+    def resolve(url):
+        domain = publishers.host_of(urlparse(url).netloc)
+        return domain, trie.lookup(domain) or domain
+    return resolve
+
+
+def memoized(resolver, netloc=lambda url: urlparse(url).netloc):
+    def resolve(url):
+        return resolver.resolve(netloc(url))
+    return resolve
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--items", type=int, default=200000)
+    parser.add_argument("--tail", type=float, default=0.02, help="share of one-off hosts")
+    args = parser.parse_args()
+
+    urls = build_corpus(args.items, args.tail)
+    merged = {**publishers.DOMAIN_MAP, **publishers.load_domain_file(publishers.PUBLISHER_DOMAINS_FILE)}
+    distinct = len({urlparse(url).netloc for url in urls})
+    print(f"{len(urls)} originallinks, {distinct} distinct hosts, {len(merged)} mapped domains")
+
+    # urlparse alone, to separate it from the resolution cost
+    t0 = time.perf_counter()
+    for url in urls:
+        urlparse(url).netloc
+    parse_cost = (time.perf_counter() - t0) / len(urls)
+    print(f"  {'urlparse only':<34} {parse_cost * 1e6:6.2f} us/item")
+
+    methods = [
+        ("exact, built-in map (previous)", exact_lookup(publishers.DOMAIN_MAP)),
+        ("exact, merged map", exact_lookup(merged)),
+        ("parent walk over dict", parent_walk(merged)),
+        ("trie, no memo", trie_lookup(publishers.DomainTrie(merged))),
+        ("trie + per-netloc memo", memoized(publishers.PublisherResolver(merged))),
+        ("netloc_of + trie + memo (ingest)", memoized(publishers.PublisherResolver(merged), publishers.netloc_of)),
+    ]
+    for label, resolve in methods:
+        t0 = time.perf_counter()
+        results = [resolve(url) for url in urls]
+        elapsed = (time.perf_counter() - t0) / len(urls)
+        named = sum(1 for domain, source in results if source != domain)
+        print(f"  {label:<34} {elapsed * 1e6:6.2f} us/item  named={named / len(results):6.1%}")
+
+
+if __name__ == "__main__":
+    main()
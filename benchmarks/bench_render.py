@@ -0,0 +1,120 @@
+"""
+bench_render.py
+
+Time to render one search_results.html page (20 cards), comparing the original
+filters (regex compiled per call, pubDate parsed per card) with the cached
+highlight patterns + pre-parsed timestamps, and with a fragment-cache hit.
+
+    python benchmarks/bench_render.py [-n RUNS]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jinja2 import Environment, FileSystemLoader
+from markupsafe import Markup
+
+import rendering
+from scraper import NewsItem
+
+TEMPLATES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+KEYWORD = '삼성전자 +"반도체" -주가'
+
+
+# -- The original filters --
+
+def legacy_time_ago(value):
+    if not value:
+        return ""
+    dt = parsedate_to_datetime(value)
+    now = datetime.now(timezone.utc) if dt.tzinfo else datetime.now()
+    seconds = (now - dt).total_seconds()
+    if seconds < 60:
+        return "방금 전"
+    elif seconds < 3600:
+        return f"{int(seconds / 60)}분 전"
+    elif seconds < 86400:
+        return f"{int(seconds / 3600)}시간 전"
+    elif seconds < 604800:
+        return f"{int(seconds / 86400)}일 전"
+    return dt.strftime("%Y-%m-%d")
+
+
+def legacy_highlight(text, keyword):
+    if not keyword or not text:
+        return text
+    pattern = re.compile(re.escape(keyword), re.IGNORECASE)
+    return Markup(pattern.sub(lambda m: f'<mark class="highlight">{m.group(0)}</mark>', text))
+
+
+def make_items(n: int = 20):
+    now = time.time()
+    return [
+        NewsItem(
+            title=f"삼성전자, 반도체 업황 회복에 3분기 실적 개선 {i}",
+            link=f"https://n.news.naver.com/mnews/article/001/{i:010d}",
+            description=f"삼성전자가 메모리 반도체 가격 상승에 힘입어 시장 기대를 웃도는 실적을 냈다. 기사 {i}",
+            originallink=f"https://www.yna.co.kr/view/AKR2024{i:06d}",
+            source="연합뉴스",
+            pubDate=format_datetime(datetime.fromtimestamp(now - i * 900, timezone.utc)),
+            domain="yna.co.kr",
+        )
+        for i in range(n)
+    ]
+
+
+def measure(fn, runs: int):
+    fn()  # warm-up (template compilation)
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - t0) / runs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--runs", type=int, default=300)
+    args = parser.parse_args()
+
+    items = make_items()
+    links = tuple(item.link for item in items)
+    context = {"items": items, "keyword": KEYWORD, "start": 21}
+
+    legacy_env = Environment(loader=FileSystemLoader(TEMPLATES), autoescape=True)
+    legacy_env.filters["highlight"] = legacy_highlight
+    legacy_env.filters["relative_time"] = lambda item: legacy_time_ago(item.pubDate)
+    legacy_template = legacy_env.get_template("search_results.html")
+
+    env = Environment(loader=FileSystemLoader(TEMPLATES), autoescape=True)
+    rendering.configure_environment(env)
+    template = env.get_template("search_results.html")
+    fragments = rendering.FragmentCache(env)
+
+    def uncached_fragment():
+        fragments.cache.clear()
+        return fragments.render("search_results.html", (KEYWORD, links), context)
+
+    legacy = measure(lambda: legacy_template.render(context), args.runs)
+    cold = measure(lambda: rendering.RenderedFragment(template.render(context)).render(), args.runs)
+    miss = measure(uncached_fragment, args.runs)
+    hit = measure(lambda: fragments.render("search_results.html", (KEYWORD, links), context), args.runs)
+
+    print(f"20 cards, keyword {KEYWORD!r}, {args.runs} runs")
+    print(f"{'render':<44}{'ms/page':>9}{'speedup':>9}")
+    for name, seconds in [
+        ("original filters", legacy),
+        ("cached patterns + parsed timestamps", cold),
+        ("fragment cache miss (render + store)", miss),
+        ("fragment cache hit (relative-time patch)", hit),
+    ]:
+        print(f"{name:<44}{seconds * 1000:9.3f}{legacy / seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+bench_serialization.py
+
+Per-1,000-item cost of turning Naver API items into NewsItems (ingest) and of
+encoding a search response (serialization), comparing the original pydantic
+model + FastAPI JSONResponse path with the slotted NewsItem + pre-encoded bytes.
+
+    python benchmarks/bench_serialization.py [-n RUNS]
+"""
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+import warnings
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+import publishers
+import scraper
+import serialization
+from cache import estimate_size
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+N_ITEMS = 1000
+DOMAINS = ["www.yna.co.kr", "news.naver.com", "www.hani.co.kr", "biz.chosun.com", "www.unknown-press.kr"]
+
+RAW_ITEMS = [
+    {
+        "title": f"<b>삼성전자</b>, 3분기 &quot;역대 최대&quot; 실적 발표 {i}",
+        "originallink": f"https://{DOMAINS[i % len(DOMAINS)]}/view/AKR2024{i:06d}",
+        "link": f"https://n.news.naver.com/mnews/article/001/{i:010d}",
+        "description": f"<b>삼성전자</b>가 반도체 부문 회복에 힘입어 시장 예상치를 웃도는 실적을 냈다 &amp; 기사 {i}",
+        "pubDate": f"Mon, 13 Oct 2025 {i % 24:02d}:{i % 60:02d}:00 +0900",
+    }
+    for i in range(N_ITEMS)
+]
+
+
+# -- The original implementation --
+
+class LegacyNewsItem(BaseModel):
+    title: str
+    link: str
+    description: str
+    originallink: str = ""
+    source: str = ""
+    pubDate: str = ""
+    domain: str = ""
+    formatted_pubdate: str = ""
+
+
+def legacy_ingest(raw_items):
+    items = []
+    for item in raw_items:
+        clean_title = html.unescape(re.sub(r"<[^>]*>", "", item.get("title", "")))
+        clean_desc = html.unescape(re.sub(r"<[^>]*>", "", item.get("description", "")))
+        origin = item.get("originallink") or item.get("link") or ""
+        domain = (urlparse(origin).netloc or "").replace("www.", "")
+        source = item.get("source", "") or publishers.DOMAIN_MAP.get(domain, domain)
+        raw_pub = item.get("pubDate", "")
+        formatted_pub = raw_pub
+        if raw_pub:
+            try:
+                dt = parsedate_to_datetime(raw_pub)
+                formatted_pub = f"{dt.year}년 {dt.month}월 {dt.day}일 {dt.hour}시 {dt.minute}분"
+            except Exception:
+                pass
+        items.append(LegacyNewsItem(
+            title=clean_title, link=item.get("link", ""), description=clean_desc,
+            originallink=item.get("originallink", ""), source=source, pubDate=raw_pub,
+            domain=domain, formatted_pubdate=formatted_pub,
+        ))
+    return items
+
+
+def legacy_response(items) -> bytes:
+    """What returning {"items": [item.dict() ...]} from the endpoint did (FastAPI JSONResponse)."""
+    content = jsonable_encoder({"items": [item.dict() for item in items], "total": len(items)})
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+# -- Harness --
+
+def measure(fn, runs: int, setup=None):
+    """Mean seconds per call; `setup` runs before every call, outside the timing."""
+    total = 0.0
+    result = None
+    for _ in range(runs):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        result = fn()
+        total += time.perf_counter() - t0
+    return total / runs, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{N_ITEMS} items, {args.runs} runs, orjson={'yes' if serialization.ORJSON_AVAILABLE else 'no'}")
+
+    old_ingest, legacy_items = measure(lambda: legacy_ingest(RAW_ITEMS), args.runs)
+    scraper.parse_pub_date.cache_clear()
+    cold_ingest, _ = measure(lambda: [scraper.news_item_from_api(i) for i in RAW_ITEMS], args.runs,
+                             setup=scraper.parse_pub_date.cache_clear)
+    warm_ingest, items = measure(lambda: [scraper.news_item_from_api(i) for i in RAW_ITEMS], args.runs)
+
+    def reset_json():
+        for item in items:
+            item._json = None
+
+    old_encode, old_body = measure(lambda: legacy_response(legacy_items), args.runs)
+    cold_encode, new_body = measure(lambda: serialization.encode_items(items, total=len(items)), args.runs,
+                                    setup=reset_json)
+    warm_encode, _ = measure(lambda: serialization.encode_items(items, total=len(items)), args.runs)
+
+    tracemalloc.start()
+    legacy_items_copy = legacy_ingest(RAW_ITEMS)
+    legacy_mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    tracemalloc.start()
+    items_copy = [scraper.news_item_from_api(i) for i in RAW_ITEMS]
+    new_mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    rows = [
+        ("ingest (pydantic, regex, parsedate)", old_ingest, None),
+        ("ingest (slotted, dates uncached)", cold_ingest, old_ingest),
+        ("ingest (slotted, dates cached)", warm_ingest, old_ingest),
+        ("encode (item.dict + JSONResponse)", old_encode, None),
+        ("encode (first response)", cold_encode, old_encode),
+        ("encode (cache hit, cached bytes)", warm_encode, old_encode),
+    ]
+    print(f"{'step':<38}{'ms/1k items':>12}{'speedup':>9}")
+    for name, seconds, baseline in rows:
+        speedup = f"{baseline / seconds:7.1f}x" if baseline else ""
+        print(f"{name:<38}{seconds * 1000:12.2f}{speedup:>9}")
+    print(f"retained memory: legacy {legacy_mem / 1024:.0f} KB, slotted {new_mem / 1024:.0f} KB "
+          f"(estimate_size per item: {estimate_size(legacy_items_copy[0])} vs {estimate_size(items_copy[0])} bytes)")
+    print(f"same JSON: {json.loads(old_body) == json.loads(new_body)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,453 @@
+"""
+loadtest.py
+
+End-to-end load test. Starts the app (uvicorn, one worker) against a local
+stand-in for the Naver search API and the publishers' article pages, drives a
+scripted scenario with concurrent clients and reports client-side latency
+percentiles, throughput, the server's memory and its event-loop lag as JSON,
+so runs before and after a change can be compared (--compare).
+
+The stand-in (FakeNaver) answers /v1/search/news.json with date-sorted pages,
+paging and 'a | b' OR queries. Every search term has a backlog of articles
+and gains new ones at --churn articles/second. /article/... serves the pages
+in benchmarks/fixtures. --latency, --jitter and --error-rate apply to both.
+
+Scenarios, each against a fresh app process:
+    search      unique keywords, so every request is a cache miss that goes upstream
+    cache_hit   a few warmed-up keywords, answered from the search cache
+    article     /api/article on distinct URLs: page fetch and body extraction
+    poller      --clients SSE clients watching --keywords keywords between them;
+                reports how long new articles take to reach the clients
+
+Load is closed-loop: --concurrency workers each send their next request as
+soon as the previous one completes, for --duration seconds.
+
+    python benchmarks/loadtest.py [--scenario NAME] [--duration 10] [--concurrency 16]
+                                  [--out results.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+import httpx
+
+from local_server import start_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+ACCESS_KEY = "loadtest"
+KST = timezone(timedelta(hours=9))
+SYLLABLES = "가나다라마바사아자차카타파하강남동론몽병상원전정진천현화금리시장"
+
+
+# ==============================================================================
+# LOCAL NAVER STAND-IN
+# ==============================================================================
+
+class FakeNaver:
+    """
+    Search API and article pages with configurable latency, errors and churn.
+    Articles are generated on demand: a term's backlog articles are `spacing`
+    seconds apart, and new ones appear every 1/churn seconds after the server
+    starts (each term at its own phase, so they don't all arrive at once).
+    """
+
+    def __init__(self, latency: float = 0.03, jitter: float = 0.02, error_rate: float = 0.0,
+                 churn: float = 0.05, backlog: int = 300, spacing: float = 60.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.churn = churn
+        self.backlog = backlog
+        self.spacing = spacing
+        self.t0 = time.time()
+        self.base_url = ""
+        self.counts = {"search": 0, "article": 0, "errors": 0}
+        self.phases = {}
+        with open(os.path.join(FIXTURES, "manifest.json"), encoding="utf-8") as f:
+            self.pages = [open(os.path.join(FIXTURES, entry["file"]), "rb").read() for entry in json.load(f)
+                          if os.path.exists(os.path.join(FIXTURES, entry["file"]))]
+
+    def phase(self, term: str) -> float:
+        if term not in self.phases:
+            self.phases[term] = random.Random(term).random()
+        return self.phases[term]
+
+    def visible(self, term: str, now: float) -> int:
+        """How many articles the term has at `now`."""
+        churned = (now - self.t0) * self.churn - self.phase(term) if self.churn > 0 else -1
+        return self.backlog + (int(churned) + 1 if churned >= 0 else 0)
+
+    def published_at(self, term: str, i: int) -> float:
+        if i < self.backlog:
+            return self.t0 - (self.backlog - i) * self.spacing
+        return self.t0 + (i - self.backlog + self.phase(term)) / self.churn
+
+    def article(self, term: str, i: int) -> dict:
+        # Distinct random wording per article, so the near-duplicate index keeps them apart
+        rng = random.Random(f"{term}:{i}")
+        words = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(16)]
+        url = f"{self.base_url}/article/{quote(term)}/{i}"
+        return {
+            "title": f"<b>{term}</b> {' '.join(words[:5])}",
+            "originallink": url,
+            "link": url,
+            "description": f"{' '.join(words[5:9])} <b>{term}</b> {' '.join(words[9:])}",
+            "pubDate": format_datetime(datetime.fromtimestamp(self.published_at(term, i), KST)),
+        }
+
+    def search(self, query: str, start: int, display: int) -> list:
+        now, depth = time.time(), start - 1 + display
+        found = []
+        for term in query.split(" | "):
+            newest = self.visible(term, now) - 1
+            found += [(-self.published_at(term, i), term, i) for i in range(newest, max(-1, newest - depth), -1)]
+        found.sort()
+        return [self.article(term, i) for _, term, i in found[start - 1:start - 1 + display]]
+
+    async def handler(self, method: str, path: str, headers: dict):
+        delay = self.latency + (random.expovariate(1 / self.jitter) if self.jitter > 0 else 0)
+        await asyncio.sleep(delay)
+        if random.random() < self.error_rate:
+            self.counts["errors"] += 1
+            return 500, "application/json", b'{"errorCode":"SE99"}'
+        parts = urlsplit(path)
+        if parts.path.startswith("/article/"):
+            self.counts["article"] += 1
+            tail = parts.path.rsplit("/", 1)[1]
+            i = int(tail) if tail.isdigit() else 0
+            return 200, "text/html", self.pages[i % len(self.pages)]
+        self.counts["search"] += 1
+        params = parse_qs(parts.query)
+        items = self.search(params["query"][0], int(params.get("start", ["1"])[0]),
+                            int(params.get("display", ["10"])[0]))
+        body = json.dumps({"items": items}, ensure_ascii=False).encode("utf-8")
+        return 200, "application/json; charset=utf-8", body
+
+    def published_at_of(self, link: str):
+        """Publication time of an article served here, from its link."""
+        try:
+            _, term, i = unquote(urlsplit(link).path).rsplit("/", 2)
+            return self.published_at(term, int(i))
+        except ValueError:
+            return None
+
+
+# ==============================================================================
+# APP PROCESS
+# ==============================================================================
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class AppProcess:
+    """The app under test, in its own process with its own state files."""
+
+    def __init__(self, fake: FakeNaver, workdir: str, args):
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.log_path = os.path.join(workdir, f"app-{self.port}.log")
+        self.env = {
+            **os.environ,
+            "PYTHONUNBUFFERED": "1",
+            "NAVER_NEWS_API_URL": f"{fake.base_url}/v1/search/news.json",
+            "NAVER_CLIENT_ID": "loadtest",
+            "NAVER_CLIENT_SECRET": "loadtest",
+            "APP_ACCESS_KEY": ACCESS_KEY,
+            "NEWS_ARCHIVE_PATH": os.path.join(workdir, f"archive-{self.port}.sqlite3"),
+            "ARTICLE_CACHE_PATH": os.path.join(workdir, f"articles-{self.port}.sqlite3"),
+            "POLL_BASE_INTERVAL": str(args.poll_interval),
+            "POLL_MIN_INTERVAL": str(min(args.poll_interval, 10)),
+            # Accelerated polling would otherwise be throttled by the daily quota bucket
+            "NAVER_DAILY_QUOTA": str(10 ** 8),
+        }
+        self.process = None
+
+    async def start(self, client: httpx.AsyncClient, timeout: float = 30):
+        self.log = open(self.log_path, "w")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(self.port),
+             "--log-level", "warning"],
+            cwd=ROOT, env=self.env, stdout=self.log, stderr=subprocess.STDOUT,
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"app exited during startup, see {self.log_path}")
+            try:
+                if (await client.get(f"{self.base_url}/login")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+        raise RuntimeError(f"app did not start within {timeout}s, see {self.log_path}")
+
+    def memory(self) -> dict:
+        """Current and peak RSS in MB (Linux /proc; empty elsewhere)."""
+        try:
+            with open(f"/proc/{self.process.pid}/status") as f:
+                fields = dict(line.split(":", 1) for line in f if ":" in line)
+        except OSError:
+            return {}
+        return {"rss_mb": round(int(fields["VmRSS"].split()[0]) / 1024, 1),
+                "peak_rss_mb": round(int(fields["VmHWM"].split()[0]) / 1024, 1)}
+
+    async def server_stats(self, client: httpx.AsyncClient) -> dict:
+        runtime = (await client.get(f"{self.base_url}/api/runtime/stats")).json()
+        return {**self.memory(), "loop_lag": runtime["loop_lag"], "upstream": runtime["upstream"],
+                "search_cache": runtime["search_cache"], "extraction": runtime["extraction"]}
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.log.close()
+
+
+# ==============================================================================
+# LOAD GENERATION & REPORTING
+# ==============================================================================
+
+def percentiles(samples: list, scale: float = 1000.0) -> dict:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pct(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * scale, 2)
+
+    return {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99), "max": round(ordered[-1] * scale, 2)}
+
+
+async def drive(duration: float, concurrency: int, send) -> dict:
+    """Closed-loop load: `concurrency` workers calling `send(worker, n) -> status` for `duration` seconds."""
+    latencies, statuses = [], {}
+    deadline = time.perf_counter() + duration
+
+    async def worker(w: int):
+        n = 0
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                status = str(await send(w, n))
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - t0)
+            statuses[status] = statuses.get(status, 0) + 1
+            n += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ok = statuses.get("200", 0)
+    return {"requests": len(latencies), "ok": ok, "statuses": statuses, "seconds": round(elapsed, 2),
+            "rps": round(len(latencies) / elapsed, 1), "latency_ms": percentiles(latencies)}
+
+
+async def scenario_search(app: AppProcess, fake: FakeNaver, client: httpx.AsyncClient, args) -> dict:
+    async def send(w, n):
+        resp = await client.post(f"{app.base_url}/api/search", data={"keyword": f"부하{w}x{n}"})
+        return resp.status_code
+
+    return await drive(args.duration, args.concurrency, send)
+
+
+async def scenario_cache_hit(app: AppProcess, fake: FakeNaver, client: httpx.AsyncClient, args) -> dict:
+    keywords = [f"인기{k}" for k in range(10)]
+    for keyword in keywords:
+        await client.post(f"{app.base_url}/api/search", data={"keyword": keyword})
+
+    async def send(w, n):
+        resp = await client.post(f"{app.base_url}/api/search", data={"keyword": random.choice(keywords)})
+        return resp.status_code
+
+    return await drive(args.duration, args.concurrency, send)
+
+
+async def scenario_article(app: AppProcess, fake: FakeNaver, client: httpx.AsyncClient, args) -> dict:
+    async def send(w, n):
+        url = f"{fake.base_url}/article/{quote(f'기사{w}')}/{n}"
+        resp = await client.get(f"{app.base_url}/api/article", params={"url": url})
+        return resp.status_code
+
+    return await drive(args.duration, args.concurrency, send)
+
+
+async def scenario_poller(app: AppProcess, fake: FakeNaver, client: httpx.AsyncClient, args) -> dict:
+    """
+    Every client watches --watch-per-client of the keywords (round robin, so all
+    are covered) over one SSE stream each. Delivery delay is the time from an
+    article's publication on the stand-in to its first arrival at a client.
+    """
+    # Fixed width, so no keyword is a substring of another (batched polls route by substring)
+    keywords = [f"감시{k:04d}" for k in range(args.keywords)]
+    per_client = min(args.watch_per_client, len(keywords))
+    delays, delivered, events = [], set(), {"count": 0}
+    started = time.time()
+
+    async def listen(client_id: str):
+        url = f"{app.base_url}/api/stream/notifications"
+        async with client.stream("GET", url, params={"client_id": client_id}, timeout=None) as resp:
+            async for line in resp.aiter_lines():
+                if not line.startswith("data: {"):
+                    continue
+                payload = json.loads(line[len("data: "):])
+                if payload.get("type") != "new_articles":
+                    continue
+                events["count"] += 1
+                received = time.time()
+                for item in payload["items"]:
+                    published = fake.published_at_of(item["link"])
+                    if (client_id, item["link"]) in delivered or published is None:
+                        continue
+                    delivered.add((client_id, item["link"]))
+                    delays.append(received - published)
+
+    listeners = []
+    for c in range(args.clients):
+        client_id = f"loadtest-{c}"
+        listeners.append(asyncio.create_task(listen(client_id)))
+        watched = [keywords[(c * per_client + k) % len(keywords)] for k in range(per_client)]
+        await client.post(f"{app.base_url}/api/sync-watch", json={"client_id": client_id, "keywords": watched})
+
+    searches_before = fake.counts["search"]
+    await asyncio.sleep(args.poller_duration)
+    for task in listeners:
+        task.cancel()
+    await asyncio.gather(*listeners, return_exceptions=True)
+
+    elapsed = time.time() - started
+    now = time.time()
+    published = sum(fake.visible(keyword, now) - fake.visible(keyword, started) for keyword in keywords)
+    poller = (await client.get(f"{app.base_url}/api/poller/stats")).json()
+    return {
+        "seconds": round(elapsed, 2),
+        "keywords": len(keywords),
+        "clients": args.clients,
+        "notifications": events["count"],
+        "articles_published": published,
+        "articles_delivered": len({link for _, link in delivered}),
+        "deliveries": len(delivered),
+        "delivery_delay_ms": percentiles(delays),
+        "upstream_calls_per_second": round((fake.counts["search"] - searches_before) / elapsed, 2),
+        "batches": poller["batching"]["batches"],
+        "splits": poller["batching"]["splits"],
+    }
+
+
+SCENARIOS = {
+    "search": scenario_search,
+    "cache_hit": scenario_cache_hit,
+    "article": scenario_article,
+    "poller": scenario_poller,
+}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(baseline: dict, report: dict):
+    """Prints the latency/throughput change of every scenario present in both runs."""
+    rows = [("rps", ("rps",)), ("p50 ms", ("latency_ms", "p50")), ("p95 ms", ("latency_ms", "p95")),
+            ("p99 ms", ("latency_ms", "p99")), ("delay p95 ms", ("delivery_delay_ms", "p95")),
+            ("peak rss MB", ("server", "peak_rss_mb")), ("loop lag p99 ms", ("server", "loop_lag", "p99_ms"))]
+    print(f"comparing {baseline['meta'].get('git') or '?'} -> {report['meta'].get('git') or '?'}")
+    for name, result in report["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if not old:
+            continue
+        print(f"  {name}")
+        for label, path in rows:
+            a, b = old, result
+            for key in path:
+                a = a.get(key, {}) if isinstance(a, dict) else {}
+                b = b.get(key, {}) if isinstance(b, dict) else {}
+            if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+                change = f"{(b - a) / a:+.1%}" if a else ""
+                print(f"    {label:<16} {a:>10} -> {b:<10} {change}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.03, help="stand-in base latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="mean of the stand-in's extra latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--churn", type=float, default=0.05, help="new articles per second per term")
+    parser.add_argument("--keywords", type=int, default=50, help="poller: watched keywords")
+    parser.add_argument("--clients", type=int, default=20, help="poller: SSE clients")
+    parser.add_argument("--watch-per-client", type=int, default=5)
+    parser.add_argument("--poll-interval", type=float, default=5, help="poller: POLL_BASE_INTERVAL for the app")
+    parser.add_argument("--poller-duration", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="a previous JSON report to compare against")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    fake = FakeNaver(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, churn=args.churn)
+    server, fake.base_url, _ = await start_server(fake.handler)
+    report = {
+        "meta": {"git": git_revision(), "started_at": datetime.now(KST).isoformat(timespec="seconds"),
+                 "python": platform.python_version(), "args": vars(args)},
+        "scenarios": {},
+    }
+    limits = httpx.Limits(max_connections=args.concurrency + args.clients + 8)
+    try:
+        with tempfile.TemporaryDirectory(prefix="loadtest-") as workdir:
+            async with httpx.AsyncClient(cookies={"access_token": ACCESS_KEY}, limits=limits, timeout=30) as client:
+                for name in args.scenario or SCENARIOS:
+                    app = AppProcess(fake, workdir, args)
+                    try:
+                        await app.start(client)
+                        before = dict(fake.counts)
+                        result = await SCENARIOS[name](app, fake, client, args)
+                        result["upstream_requests"] = {key: fake.counts[key] - before[key] for key in fake.counts}
+                        result["server"] = await app.server_stats(client)
+                    finally:
+                        app.stop()
+                    report["scenarios"][name] = result
+                    latency = result.get("latency_ms") or result.get("delivery_delay_ms") or {}
+                    print(f"[LoadTest] {name}: {result.get('rps', '-')} rps, p50 {latency.get('p50')} ms, "
+                          f"p99 {latency.get('p99')} ms, peak rss {result['server'].get('peak_rss_mb')} MB",
+                          file=sys.stderr)
+    finally:
+        server.close()
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+local_server.py
+
+Minimal keep-alive HTTP/1.1 server used by the benchmarks as a local upstream.
+Serves a canned Naver-style search JSON body for every request.
+"""
+import asyncio
+import json
+
+SAMPLE_ITEMS = [
+    {
+        "title": f"<b>샘플</b> 기사 제목 {i}",
+        "originallink": f"https://www.yna.co.kr/view/AKR2024{i:06d}",
+        "link": f"https://n.news.naver.com/mnews/article/001/{i:010d}",
+        "description": f"<b>샘플</b> 기사 요약 {i} 입니다.",
+        "pubDate": "Mon, 01 Jan 2024 09:00:00 +0900",
+    }
+    for i in range(20)
+]
+
+
+def default_handler(method: str, path: str, headers: dict):
+    """Returns (status, content_type, body_bytes) for a request."""
+    body = json.dumps({"items": SAMPLE_ITEMS}, ensure_ascii=False).encode("utf-8")
+    return 200, "application/json; charset=utf-8", body
+
+
+async def _serve_connection(reader, writer, handler, stats):
+    stats["connections"] += 1
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", "0") or 0)
+            if length:
+                await reader.readexactly(length)
+
+            stats["requests"] += 1
+            result = handler(method, path, headers)
+            if asyncio.iscoroutine(result):
+                result = await result
+            status, content_type, body = result[:3]
+            extra = result[3] if len(result) > 3 else {}
+            head = [f"HTTP/1.1 {status} OK", f"Content-Type: {content_type}",
+                    f"Content-Length: {len(body)}", "Connection: keep-alive"]
+            head += [f"{k}: {v}" for k, v in extra.items()]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+            await writer.drain()
+            if headers.get("connection", "").lower() == "close":
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(handler=default_handler, host: str = "127.0.0.1", port: int = 0):
+    """Starts the server. Returns (server, base_url, stats)."""
+    stats = {"connections": 0, "requests": 0}
+    server = await asyncio.start_server(
+        lambda r, w: _serve_connection(r, w, handler, stats), host, port
+    )
+    bound_port = server.sockets[0].getsockname()[1]
+    return server, f"http://{host}:{bound_port}", stats
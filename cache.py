@@ -0,0 +1,232 @@
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+
+# ==============================================================================
+# BOUNDED TTL / LRU CACHE
+# ==============================================================================
+
+
+def estimate_size(value) -> int:
+    """
+    Approximates the memory footprint of a cached value in bytes.
+    Walks lists/tuples/dicts and objects (via __dict__ or __slots__); good
+    enough for budget accounting, not meant to be exact.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        return size + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(estimate_size(v) for v in value)
+    if hasattr(value, "__dict__"):
+        return size + estimate_size(vars(value))
+    slots = getattr(type(value), "__slots__", ())
+    return size + sum(estimate_size(getattr(value, name, None)) for name in slots)
+
+
+class TTLCache:
+    """
+    Dict-like cache with per-entry TTL and LRU eviction.
+    Bounded both by entry count and by an approximate byte budget.
+
+    Supports the dict operations the app uses (`in`, `[]`, `get`, assignment,
+    `del`), so it can replace a plain dict cache without touching call sites.
+
+    With `stale_ttl`, expired entries are kept that much longer: regular lookups
+    treat them as missing, but `get_stale()` still returns them (for serving
+    stale results while the upstream is down).
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024, ttl: float = 600, sizer=estimate_size,
+                 stale_ttl: float = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.sizer = sizer
+        # key -> (expires_at, size, value); order = least -> most recently used
+        self._data = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # -- Internal Helpers --
+
+    def _remove(self, key):
+        _, size, _ = self._data.pop(key)
+        self.current_bytes -= size
+
+    def _lookup(self, key, stale: bool = False):
+        """Returns the live entry for key (refreshing its LRU position) or None."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if entry[0] <= now:
+            if entry[0] + self.stale_ttl <= now:
+                self._remove(key)
+                self.expirations += 1
+                return None
+            if not stale:
+                return None
+        self._data.move_to_end(key)
+        return entry
+
+    def _evict(self):
+        while self._data and (len(self._data) > self.max_entries or self.current_bytes > self.max_bytes):
+            key = next(iter(self._data))
+            self._remove(key)
+            self.evictions += 1
+
+    # -- Public API --
+
+    def get(self, key, default=None):
+        entry = self._lookup(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return entry[2]
+
+    def get_stale(self, key):
+        """
+        Returns (value, seconds past expiry) - negative while the entry is still
+        fresh - including entries up to `stale_ttl` past their TTL, or None.
+        """
+        entry = self._lookup(key, stale=True)
+        if entry is None:
+            self.misses += 1
+            return None
+        expired_for = time.monotonic() - entry[0]
+        if expired_for < 0:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return entry[2], expired_for
+
+    def set(self, key, value, ttl: float = None):
+        if key in self._data:
+            self._remove(key)
+        size = self.sizer(value)
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, size, value)
+        self.current_bytes += size
+        self._evict()
+
+    def pop(self, key, default=None):
+        if key not in self._data:
+            return default
+        value = self._data[key][2]
+        self._remove(key)
+        return value
+
+    def clear(self):
+        self._data.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.current_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stale_hits": self.stale_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    # -- Dict Protocol --
+
+    def __contains__(self, key):
+        return self._lookup(key) is not None
+
+    def __getitem__(self, key):
+        entry = self._lookup(key)
+        if entry is None:
+            self.misses += 1
+            raise KeyError(key)
+        self.hits += 1
+        return entry[2]
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        if key not in self._data:
+            raise KeyError(key)
+        self._remove(key)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SeenSet:
+    """
+    Insertion-ordered set that forgets its oldest members beyond `max_size`.
+    Used to remember which article links a keyword has already reported.
+    """
+
+    def __init__(self, items=(), max_size: int = 500):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self.update(items)
+
+    def add(self, item):
+        self._data[item] = None
+        self._data.move_to_end(item)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item):
+        return item in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+
+# ==============================================================================
+# SINGLE-FLIGHT REQUEST COALESCING
+# ==============================================================================
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight task.
+    The first caller starts the work; callers arriving while it runs await
+    the same result (or exception). Once it finishes the key is released,
+    so later calls start fresh work.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        task = self._inflight.get(key)
+        if task is None:
+            self.started += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _, key=key: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shield: one caller disconnecting must not cancel the shared upstream call
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._inflight), "started": self.started, "coalesced": self.coalesced}
@@ -0,0 +1,290 @@
+import os
+import re
+from array import array
+from collections import OrderedDict
+
+from serialization import dumps
+
+# ==============================================================================
+# NEAR-DUPLICATE STORY INDEX
+# ==============================================================================
+# Wire stories (연합뉴스, 뉴스1, 뉴시스 ...) are republished almost verbatim by many
+# outlets, so one results page can hold the same story several times over.
+# Every item is fingerprinted once at ingest with MinHash over character
+# 3-grams of its normalized title + description. It uses one-permutation
+# hashing: a single hash per shingle spread over 64 bins. Lookups go through
+# LSH bands: 16 bands of 4 bins, so two items whose shingle sets overlap by
+# Jaccard >= 0.75 share a band with ~99.8% probability, while unrelated items
+# (< 0.1) almost never do. Candidates are confirmed on the full signature.
+#
+# Results then show one card per story, with the number of outlets (resolved
+# `source` names, so m.hankyung.com and hankyung.com count once) that ran it.
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+# Estimated Jaccard similarity of two items' shingle sets at which they're the same story
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.55"))
+# Signatures kept in the band tables; least recently used stories are dropped beyond this
+DEDUP_MAX_ITEMS = int(os.getenv("DEDUP_MAX_ITEMS", "10000"))
+
+NUM_BINS = 64
+BAND_ROWS = 4
+NUM_BANDS = NUM_BINS // BAND_ROWS
+SHINGLE_SIZE = 3
+EMPTY_BIN = 0xFFFFFFFF
+SIGNATURES_PER_CLUSTER = 4     # members beyond this are counted but not indexed
+LINKS_PER_CLUSTER = 200
+SOURCES_PER_CLUSTER = 100
+
+# Datelines and bylines differ per outlet even when the story is the same:
+# '(서울=연합뉴스) 홍길동 기자 =', '[서울=뉴스1]', '[속보]', '(종합)' ...
+_BRACKETS_RE = re.compile(r"\[[^\]]*\]|\([^)]*\)|【[^】]*】|<[^>]*>")
+_BYLINE_RE = re.compile(r"\w+ ?기자 ?=")
+_NON_WORD_RE = re.compile(r"\W+")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+def normalize(text: str) -> str:
+    """Lowercased text without datelines, bylines, tags, punctuation and spaces."""
+    text = _BRACKETS_RE.sub("", text.lower())
+    if "=" in text:
+        text = _BYLINE_RE.sub("", text)
+    return _NON_WORD_RE.sub("", text)
+
+
+def signature(text: str):
+    """
+    One-permutation MinHash of the text's 3-gram set: the low 6 bits of each
+    shingle's hash pick a bin, the next 32 bits compete for the bin's minimum.
+    Empty bins borrow from the next filled bin (rotation densification).
+    Uses the built-in str hash, which is salted per process; fine for an
+    in-process index, but signatures can't be compared across workers.
+    Returns None for text too short to fingerprint.
+    """
+    text = normalize(text)
+    if len(text) < SHINGLE_SIZE:
+        return None
+    bins = [EMPTY_BIN] * NUM_BINS
+    for i in range(len(text) - SHINGLE_SIZE + 1):
+        h = hash(text[i:i + SHINGLE_SIZE])
+        b = h & (NUM_BINS - 1)
+        v = (h >> 32) & 0xFFFFFFFF
+        if v < bins[b]:
+            bins[b] = v
+    for j in range(NUM_BINS):
+        if bins[j] == EMPTY_BIN:
+            for step in range(1, NUM_BINS):
+                value = bins[(j + step) % NUM_BINS]
+                if value != EMPTY_BIN:
+                    bins[j] = (value + step * 0x9E3779B1) & 0xFFFFFFFF
+                    break
+    return array("I", bins)
+
+
+def title_numbers(title: str) -> frozenset:
+    """
+    Figures in a title. Templated stories ('3분기 영업이익 9.1조' / '2분기 영업이익 6.7조')
+    share most of their text but none of their numbers, and aren't the same story.
+    """
+    return frozenset(_NUMBER_RE.findall(title)) if any(c.isdigit() for c in title) else frozenset()
+
+
+def similarity(a, b) -> float:
+    """Estimated Jaccard similarity: the share of bins where two signatures agree."""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_BINS
+
+
+def band_keys(sig):
+    """One hash per band of BAND_ROWS bins (collisions only cost a wasted candidate check)."""
+    return [hash(tuple(sig[i:i + BAND_ROWS])) for i in range(0, NUM_BINS, BAND_ROWS)]
+
+
+class StoryCluster:
+    """Items judged to be the same story."""
+
+    __slots__ = ("id", "signatures", "links", "sources")   # signatures: [(signature, title numbers), ...]
+
+    def __init__(self, cluster_id: str):
+        self.id = cluster_id
+        self.signatures = []
+        self.links = []
+        self.sources = []   # distinct outlet names
+
+    @property
+    def outlet_count(self) -> int:
+        return max(1, len(self.sources))
+
+
+class StoryItem:
+    """
+    One card in collapsed results: the story's representative NewsItem (attribute
+    access falls through to it) plus the story's cluster id and outlet count.
+    `cursor` is the link of the last underlying item of the page up to this card,
+    which is where the next page continues from.
+    """
+
+    __slots__ = ("item", "cluster_id", "outlet_count", "cursor", "_json")
+
+    def __init__(self, item, cluster_id: str, outlet_count: int, cursor: str):
+        self.item = item
+        self.cluster_id = cluster_id
+        self.outlet_count = outlet_count
+        self.cursor = cursor
+        self._json = None
+
+    def __getattr__(self, name):
+        return getattr(self.item, name)
+
+    def dict(self) -> dict:
+        return {**self.item.dict(), "cluster_id": self.cluster_id, "outlet_count": self.outlet_count}
+
+    def json_bytes(self) -> bytes:
+        if self._json is None:
+            self._json = (self.item.json_bytes()[:-1] + b',"cluster_id":' + dumps(self.cluster_id)
+                          + b',"outlet_count":' + dumps(self.outlet_count) + b"}")
+        return self._json
+
+    def __repr__(self):
+        return f"StoryItem(link={self.item.link!r}, cluster={self.cluster_id}, outlets={self.outlet_count})"
+
+
+class NearDuplicateIndex:
+    """Incremental story clustering over every item the app ingests, bounded by DEDUP_MAX_ITEMS signatures."""
+
+    def __init__(self, max_items: int = DEDUP_MAX_ITEMS, threshold: float = DEDUP_THRESHOLD):
+        self.max_items = max_items
+        self.threshold = threshold
+        # band hash -> cluster id, or a list of ids when several clusters share the band
+        self.bands = [{} for _ in range(NUM_BANDS)]
+        self.clusters = OrderedDict()                  # cluster id -> StoryCluster, least recently used first
+        self.link_clusters = {}                        # link -> cluster id
+        self.indexed = 0
+        # Cluster ids are only meaningful within this process; the random prefix keeps
+        # ids from different workers (e.g. in cards pushed over SSE) from colliding
+        self._id_prefix = os.urandom(3).hex()
+        self._next_id = 1
+        self.items_seen = 0
+        self.duplicates = 0
+        self.evictions = 0
+
+    # -- Internal Helpers --
+
+    def _match(self, sig, numbers: frozenset):
+        candidates = set()
+        for table, key in zip(self.bands, band_keys(sig)):
+            ids = table.get(key)
+            if ids is None:
+                continue
+            if isinstance(ids, list):
+                candidates.update(ids)
+            else:
+                candidates.add(ids)
+        best, best_score = None, self.threshold
+        for cluster_id in candidates:
+            cluster = self.clusters[cluster_id]
+            for other, other_numbers in cluster.signatures:
+                if numbers and other_numbers and numbers.isdisjoint(other_numbers):
+                    continue
+                score = similarity(sig, other)
+                if score >= best_score:
+                    best, best_score = cluster, score
+        return best
+
+    def _index(self, cluster: StoryCluster, sig, numbers: frozenset):
+        cluster.signatures.append((sig, numbers))
+        for table, key in zip(self.bands, band_keys(sig)):
+            ids = table.get(key)
+            if ids is None or ids == cluster.id:
+                table[key] = cluster.id
+            elif isinstance(ids, list):
+                if cluster.id not in ids:
+                    ids.append(cluster.id)
+            else:
+                table[key] = [ids, cluster.id]
+        self.indexed += 1
+
+    def _evict(self):
+        while self.clusters and (self.indexed > self.max_items or len(self.clusters) > self.max_items):
+            _, cluster = self.clusters.popitem(last=False)
+            for sig, _ in cluster.signatures:
+                for table, key in zip(self.bands, band_keys(sig)):
+                    ids = table.get(key)
+                    if ids == cluster.id:
+                        del table[key]
+                    elif isinstance(ids, list) and cluster.id in ids:
+                        ids.remove(cluster.id)
+                        if len(ids) == 1:
+                            table[key] = ids[0]
+            self.indexed -= len(cluster.signatures)
+            for link in cluster.links:
+                self.link_clusters.pop(link, None)
+            self.evictions += 1
+
+    # -- Public API --
+
+    def cluster_of(self, item) -> StoryCluster:
+        """The item's story cluster, assigning it (and indexing its fingerprint) on first sight."""
+        cluster_id = self.link_clusters.get(item.link)
+        cluster = self.clusters.get(cluster_id) if cluster_id is not None else None
+        if cluster is not None:
+            self.clusters.move_to_end(cluster_id)
+            return cluster
+
+        self.items_seen += 1
+        sig = signature(f"{item.title} {item.description}")
+        numbers = title_numbers(item.title)
+        cluster = self._match(sig, numbers) if sig is not None else None
+        if cluster is None:
+            cluster = StoryCluster(f"{self._id_prefix}-{self._next_id}")
+            self._next_id += 1
+            self.clusters[cluster.id] = cluster
+        else:
+            self.duplicates += 1
+            self.clusters.move_to_end(cluster.id)
+
+        if sig is not None and len(cluster.signatures) < SIGNATURES_PER_CLUSTER:
+            self._index(cluster, sig, numbers)
+        if len(cluster.links) < LINKS_PER_CLUSTER:
+            cluster.links.append(item.link)
+            self.link_clusters[item.link] = cluster.id
+        source = item.source or item.domain
+        if source not in cluster.sources and len(cluster.sources) < SOURCES_PER_CLUSTER:
+            cluster.sources.append(source)
+        self._evict()
+        return cluster
+
+    def add(self, items):
+        """Clusters freshly fetched items at ingest."""
+        for item in items:
+            self.cluster_of(item)
+
+    def collapse(self, items) -> list:
+        """
+        One StoryItem per story, in order of each story's first appearance.
+        A story is represented by its earliest published item on the page
+        (usually the wire original).
+        """
+        groups = OrderedDict()
+        for position, item in enumerate(items):
+            cluster = self.cluster_of(item)
+            groups.setdefault(cluster.id, (cluster, []))[1].append((position, item))
+
+        stories = []
+        last = -1
+        for cluster, members in groups.values():
+            shown = min(members, key=lambda member: (member[1].published_at or float("inf"), member[0]))[1]
+            last = max(last, members[-1][0])
+            stories.append(StoryItem(shown, cluster.id, cluster.outlet_count, items[last].link))
+        return stories
+
+    def stats(self) -> dict:
+        return {
+            "clusters": len(self.clusters),
+            "indexed_signatures": self.indexed,
+            "max_items": self.max_items,
+            "items_seen": self.items_seen,
+            "duplicates": self.duplicates,
+            "evictions": self.evictions,
+        }
+
+
+DEDUP_INDEX = NearDuplicateIndex()
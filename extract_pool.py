@@ -0,0 +1,109 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from extractors import extract_article_text
+from metrics import ARTICLE_PARSE_SECONDS
+
+# ==============================================================================
+# EXTRACTION EXECUTOR
+# ==============================================================================
+# HTML parsing is CPU-bound; running it inside a request handler blocks the
+# event loop (SSE heartbeats, searches) for the whole parse. Extraction runs
+# on a worker pool instead:
+#   thread  - default; cheap, but workers still share the GIL with the loop
+#   process - true parallelism, the loop stays responsive under heavy load
+#   inline  - old behaviour, parse on the event loop (debugging / benchmarks)
+# A semaphore caps queued + running jobs; once it's full, callers wait up to
+# EXTRACT_QUEUE_TIMEOUT and then get ExtractorBusy instead of piling up work.
+
+EXTRACT_EXECUTOR = os.getenv("EXTRACT_EXECUTOR", "thread")
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+EXTRACT_MAX_PENDING = int(os.getenv("EXTRACT_MAX_PENDING", str(EXTRACT_WORKERS * 4)))
+EXTRACT_QUEUE_TIMEOUT = float(os.getenv("EXTRACT_QUEUE_TIMEOUT", "5"))
+
+
+def timed_extract(html_content: str, domain: str = None):
+    """extract_article_text plus its run time, measured in the worker (queueing excluded)."""
+    started = time.perf_counter()
+    text = extract_article_text(html_content, domain)
+    return text, time.perf_counter() - started
+
+
+class ExtractorBusy(Exception):
+    """Raised when the extraction pool stays saturated past the queue timeout."""
+
+
+class ExtractionPool:
+    def __init__(self, kind: str = EXTRACT_EXECUTOR, workers: int = EXTRACT_WORKERS,
+                 max_pending: int = EXTRACT_MAX_PENDING, queue_timeout: float = EXTRACT_QUEUE_TIMEOUT):
+        self.configure(kind, workers, max_pending, queue_timeout)
+
+    def configure(self, kind: str, workers: int, max_pending: int = None, queue_timeout: float = None):
+        if kind not in ("thread", "process", "inline"):
+            raise ValueError(f"Unknown extraction executor: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending or workers * 4
+        if queue_timeout is not None:
+            self.queue_timeout = queue_timeout
+        self._executor = None
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self):
+        if self._executor is None and self.kind != "inline":
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="extract")
+        return self._executor
+
+    def start(self):
+        self._get_executor()
+        print(f"[Extract] {self.kind} executor ready (workers={self.workers}, max_pending={self.max_pending})")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def extract(self, html_content: str, domain: str = None) -> str:
+        """Runs extract_article_text on the pool, applying backpressure when saturated."""
+        if self.kind == "inline":
+            text, elapsed = timed_extract(html_content, domain)
+            ARTICLE_PARSE_SECONDS.observe(elapsed, self.kind)
+            return text
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ExtractorBusy(f"extraction pool saturated ({self.max_pending} jobs pending)")
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            text, elapsed = await loop.run_in_executor(self._get_executor(), timed_extract, html_content, domain)
+            ARTICLE_PARSE_SECONDS.observe(elapsed, self.kind)
+            return text
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+EXTRACTION_POOL = ExtractionPool()
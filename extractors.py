@@ -0,0 +1,176 @@
+import importlib.util
+import os
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# ==============================================================================
+# ARTICLE BODY EXTRACTION
+# ==============================================================================
+# Known publishers (domains from publishers.DOMAIN_MAP) map straight to their body
+# selector. For those, only the matching subtree is parsed (SoupStrainer), which
+# skips building a tree for navigation, ads and comments. Unknown sites, or known
+# sites whose layout changed, fall back to the generic heuristic on a full parse.
+
+# -- Parser Backend --
+# lxml is several times faster than the pure-Python parser; use it when installed.
+ARTICLE_PARSER = os.getenv(
+    "ARTICLE_PARSER",
+    "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser",
+)
+
+# A rule is (tag, attribute, value): e.g. ("div", "id", "articleBody") matches <div id="articleBody">.
+# "class" rules match any one of the element's classes.
+NDSOFT_BODY = [("article", "id", "article-view-content-div")]  # CMS shared by many smaller outlets
+
+EXTRACTOR_REGISTRY = {
+    "news.naver.com": [("article", "id", "dic_area"), ("div", "id", "newsct_article")],
+    "yna.co.kr": [("article", "class", "story-news"), ("div", "class", "story-news")],
+    "hani.co.kr": [("div", "class", "article-text"), ("div", "class", "text")],
+    "chosun.com": [("section", "class", "article-body")],
+    "biz.chosun.com": [("section", "class", "article-body")],
+    "it.chosun.com": [("section", "class", "article-body")],
+    "donga.com": [("section", "class", "news_view"), ("div", "class", "article_txt")],
+    "joongang.co.kr": [("div", "id", "article_body")],
+    "joongang.joins.com": [("div", "id", "article_body")],
+    "khan.co.kr": [("div", "class", "art_body"), ("div", "id", "articleBody")],
+    "hankyung.com": [("div", "id", "articletxt")],
+    "mk.co.kr": [("div", "class", "news_cnt_detail_wrap")],
+    "news1.kr": [("div", "id", "articles_detail")],
+    "newsis.com": [("div", "class", "viewer")],
+    "edaily.co.kr": [("div", "class", "news_body")],
+    "mt.co.kr": [("div", "id", "textBody")],
+    "sedaily.com": [("div", "class", "article_view")],
+    "seoul.co.kr": [("div", "id", "articleContent")],
+    "kmib.co.kr": [("div", "id", "articleBody")],
+    "segye.com": [("article", "id", "article_txt")],
+    "munhwa.com": [("div", "id", "News_content")],
+    "ytn.co.kr": [("div", "id", "CmAdContent"), ("div", "class", "paragraph")],
+    "news.kbs.co.kr": [("div", "id", "cont_newstext")],
+    "news.sbs.co.kr": [("div", "class", "text_area")],
+    "imnews.imbc.com": [("div", "class", "news_txt")],
+    "fnnews.com": [("div", "id", "article_content")],
+    "etnews.com": [("div", "id", "articleBody")],
+    "zdnet.co.kr": [("div", "id", "articleBody")],
+    "inews24.com": [("div", "id", "articleBody")],
+    "nocutnews.co.kr": [("div", "id", "pnlContent")],
+    "ohmynews.com": [("div", "class", "at_contents")],
+    "hankookilbo.com": [("div", "class", "col-main")],
+    "dt.co.kr": [("div", "class", "article_view")],
+    "newspim.com": [("div", "id", "news-contents")],
+    "pressian.com": [("div", "class", "article_body")],
+    "mediatoday.co.kr": NDSOFT_BODY,
+    "mediaus.co.kr": NDSOFT_BODY,
+    "journalist.or.kr": NDSOFT_BODY,
+    "pdjournal.com": NDSOFT_BODY,
+    "newscj.com": NDSOFT_BODY,
+    "digitaltoday.co.kr": NDSOFT_BODY,
+    "kado.net": NDSOFT_BODY,
+    "sisajournal.com": NDSOFT_BODY,
+    "sisajournal-e.com": NDSOFT_BODY,
+}
+
+# Generic selectors for article bodies in Korean news sites, tried in order
+GENERIC_RULES = [
+    ("div", "class", "article_body"),
+    ("div", "class", "newsct_article"),
+    ("div", "class", "go_trans"),
+    ("article", None, None),
+    ("div", "class", "article"),
+    ("div", "id", "articleBody"),
+]
+
+MIN_BODY_LENGTH = 50
+
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+
+def registry_key(domain: str):
+    """
+    Finds the registry entry for a host, trying the host itself and then each
+    parent domain (m.hankyung.com -> hankyung.com).
+    """
+    host = (domain or "").lower().split(":")[0]
+    if host.startswith("www."):
+        host = host[4:]
+    while host:
+        if host in EXTRACTOR_REGISTRY:
+            return host
+        _, _, host = host.partition(".")
+    return None
+
+
+def decode_html(body: bytes, header_charset: str = None) -> str:
+    """Decodes a page using the HTTP charset, then a <meta charset>, then UTF-8."""
+    charset = header_charset
+    if not charset:
+        match = _META_CHARSET.search(body[:4096])
+        if match:
+            charset = match.group(1).decode("ascii", "ignore")
+    try:
+        return body.decode(charset or "utf-8", errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def _attr_matcher(attr: str, value: str):
+    """
+    Class rules match one class out of the attribute value. While parsing, a
+    strainer sees the raw 'a b c' string, so match on word boundaries.
+    """
+    if attr == "class":
+        return re.compile(r"(?:^|\s)" + re.escape(value) + r"(?:\s|$)")
+    return value
+
+
+def _find(soup, rule):
+    tag, attr, value = rule
+    return soup.find(tag, attrs={attr: _attr_matcher(attr, value)}) if attr else soup.find(tag)
+
+
+def _body_text(section):
+    if section is None:
+        return None
+    text = section.get_text(" ", strip=True)
+    return text if len(text) > MIN_BODY_LENGTH else None
+
+
+def extract_known_site(html_content: str, domain: str):
+    """Parses only the registered body subtree for a known publisher. Returns None on a miss."""
+    key = registry_key(domain)
+    if key is None:
+        return None
+    for rule in EXTRACTOR_REGISTRY[key]:
+        tag, attr, value = rule
+        strainer = SoupStrainer(tag, attrs={attr: _attr_matcher(attr, value)})
+        soup = BeautifulSoup(html_content, ARTICLE_PARSER, parse_only=strainer)
+        text = _body_text(_find(soup, rule))
+        if text:
+            return text
+    return None
+
+
+def extract_article_text(html_content: str, domain: str = None) -> str:
+    """
+    Extracts the main article content from a downloaded page.
+    Goes straight to the publisher's registered selector when the domain is
+    known, otherwise falls back to the generic heuristic.
+    """
+    if domain:
+        text = extract_known_site(html_content, domain)
+        if text:
+            return text
+
+    soup = BeautifulSoup(html_content, ARTICLE_PARSER)
+
+    for rule in GENERIC_RULES:
+        text = _body_text(_find(soup, rule))
+        if text:
+            return text
+
+    # Fallback: Open Graph description
+    og_desc = soup.find("meta", property="og:description")
+    if og_desc: return og_desc.get("content", "")
+
+    # Final Fallback: Raw text dump (truncated)
+    return soup.get_text(" ", strip=True)[:1000] + "..."
@@ -0,0 +1,224 @@
+import asyncio
+import os
+import time
+from collections import deque
+
+from serialization import dumps
+
+# ==============================================================================
+# SSE FAN-OUT HUB
+# ==============================================================================
+# Keeps everything a notification push needs in indexed form:
+#   watchers         keyword   -> set(client_id)   (who gets an event)
+#   client_keywords  client_id -> set(keyword)     (what a (re)connecting client replays)
+#   rings            keyword   -> ring buffer of recent events with increasing ids
+#   channels         client_id -> bounded outgoing queue
+# Clients resume with the standard SSE Last-Event-ID, so a reconnect replays only
+# the events it missed. A slow consumer can never grow memory without bound:
+# its queue either drops the oldest event or coalesces same-keyword events.
+
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "32"))
+SSE_QUEUE_POLICY = os.getenv("SSE_QUEUE_POLICY", "coalesce")  # "coalesce" | "drop_oldest"
+SSE_RING_SIZE = int(os.getenv("SSE_RING_SIZE", "50"))
+SSE_REPLAY_WINDOW = float(os.getenv("SSE_REPLAY_WINDOW", "120"))  # seconds, when no Last-Event-ID is given
+
+
+class Event:
+    """One notification. The SSE frame is encoded once and shared by every recipient."""
+
+    __slots__ = ("id", "keyword", "payload", "created_at", "_frame")
+
+    def __init__(self, event_id: int, keyword: str, payload: dict, created_at: float):
+        self.id = event_id
+        self.keyword = keyword
+        self.payload = payload
+        self.created_at = created_at
+        self._frame = None
+
+    def frame(self) -> str:
+        if self._frame is None:
+            data = dumps(self.payload).decode("utf-8")
+            self._frame = f"id: {self.id}\ndata: {data}\n\n"
+        return self._frame
+
+
+def merge_payloads(older: dict, newer: dict) -> dict:
+    """Coalesces two new-article payloads for one keyword into one (newest items first)."""
+    merged = dict(newer)
+    merged["items"] = newer.get("items", []) + older.get("items", [])
+    merged["html"] = newer.get("html", "") + older.get("html", "")
+    merged["message"] = f"[{newer['keyword']}] 관련 새로운 기사 {len(merged['items'])}건이 감지되었습니다."
+    return merged
+
+
+class ClientChannel:
+    """Bounded per-connection event queue."""
+
+    __slots__ = ("client_id", "events", "max_size", "policy", "closed", "dropped", "coalesced", "_wakeup")
+
+    def __init__(self, client_id: str, max_size: int = SSE_QUEUE_SIZE, policy: str = SSE_QUEUE_POLICY):
+        self.client_id = client_id
+        self.events = deque()
+        self.max_size = max_size
+        self.policy = policy
+        self.closed = False
+        self.dropped = 0
+        self.coalesced = 0
+        self._wakeup = asyncio.Event()
+
+    def push(self, event: Event):
+        if len(self.events) >= self.max_size:
+            if self.policy == "coalesce":
+                for i, pending in enumerate(self.events):
+                    if pending.keyword == event.keyword:
+                        del self.events[i]
+                        event = Event(event.id, event.keyword, merge_payloads(pending.payload, event.payload),
+                                      event.created_at)
+                        self.coalesced += 1
+                        break
+            if len(self.events) >= self.max_size:
+                self.events.popleft()
+                self.dropped += 1
+        self.events.append(event)
+        self._wakeup.set()
+
+    def close(self):
+        self.closed = True
+        self._wakeup.set()
+
+    async def get(self, timeout: float):
+        """Returns the next event, or None on timeout / close."""
+        if not self.events and not self.closed:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self.events:
+            return self.events.popleft()
+        return None
+
+    def __len__(self):
+        return len(self.events)
+
+
+class FanoutHub:
+    def __init__(self, ring_size: int = SSE_RING_SIZE):
+        self.watchers = {}          # keyword -> set(client_id)
+        self.client_keywords = {}   # client_id -> set(keyword)
+        self.rings = {}             # keyword -> deque[Event]
+        self.channels = {}          # client_id -> ClientChannel
+        self.ring_size = ring_size
+        self.last_event_id = 0
+        self.published = 0
+
+    # -- Watch Registry --
+
+    def watch(self, client_id: str, keyword: str):
+        self.watchers.setdefault(keyword, set()).add(client_id)
+        self.client_keywords.setdefault(client_id, set()).add(keyword)
+
+    def unwatch(self, client_id: str, keyword: str):
+        clients = self.watchers.get(keyword)
+        if clients is not None:
+            clients.discard(client_id)
+            if not clients:
+                self.drop_keyword(keyword)
+        keywords = self.client_keywords.get(client_id)
+        if keywords is not None:
+            keywords.discard(keyword)
+            if not keywords:
+                del self.client_keywords[client_id]
+
+    def sync(self, client_id: str, keywords):
+        """Replaces a client's watch list with exactly `keywords`."""
+        wanted = set(keywords)
+        for keyword in list(self.client_keywords.get(client_id, ())):
+            if keyword not in wanted:
+                self.unwatch(client_id, keyword)
+        for keyword in wanted:
+            self.watch(client_id, keyword)
+
+    def drop_keyword(self, keyword: str):
+        """Forgets a keyword entirely (no watchers left)."""
+        for client_id in self.watchers.pop(keyword, ()):
+            keywords = self.client_keywords.get(client_id)
+            if keywords is not None:
+                keywords.discard(keyword)
+                if not keywords:
+                    del self.client_keywords[client_id]
+        self.rings.pop(keyword, None)
+
+    # -- Connections --
+
+    def connect(self, client_id: str) -> ClientChannel:
+        old = self.channels.get(client_id)
+        if old is not None:
+            # Same client reconnected; end the stale stream
+            old.close()
+        channel = ClientChannel(client_id)
+        self.channels[client_id] = channel
+        return channel
+
+    def disconnect(self, channel: ClientChannel):
+        if self.channels.get(channel.client_id) is channel:
+            del self.channels[channel.client_id]
+        channel.close()
+
+    # -- Publishing --
+
+    def publish(self, keyword: str, payload: dict, event_id: int = None) -> Event:
+        """
+        Records and delivers one event. `event_id` comes from the shared state
+        counter when running multi-worker, so ids (and Last-Event-ID) agree on every worker.
+        """
+        if event_id is None:
+            event_id = self.last_event_id + 1
+        self.last_event_id = max(self.last_event_id, event_id)
+        self.published += 1
+        event = Event(event_id, keyword, payload, time.time())
+
+        ring = self.rings.get(keyword)
+        if ring is None:
+            ring = self.rings[keyword] = deque(maxlen=self.ring_size)
+        ring.append(event)
+
+        for client_id in self.watchers.get(keyword, ()):
+            channel = self.channels.get(client_id)
+            if channel is not None:
+                channel.push(event)
+        return event
+
+    def replay(self, client_id: str, last_event_id: int = None, window: float = SSE_REPLAY_WINDOW):
+        """
+        Events a (re)connecting client missed, oldest first: everything after
+        last_event_id, or the last `window` seconds when no id is known.
+        """
+        missed = []
+        cutoff = time.time() - window
+        for keyword in self.client_keywords.get(client_id, ()):
+            for event in self.rings.get(keyword, ()):
+                if last_event_id is not None:
+                    if event.id > last_event_id:
+                        missed.append(event)
+                elif event.created_at >= cutoff:
+                    missed.append(event)
+        missed.sort(key=lambda e: e.id)
+        return missed
+
+    def stats(self) -> dict:
+        depths = [len(c) for c in self.channels.values()]
+        return {
+            "connections": len(self.channels),
+            "keywords": len(self.watchers),
+            "clients_watching": len(self.client_keywords),
+            "last_event_id": self.last_event_id,
+            "published": self.published,
+            "queued_events": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "dropped": sum(c.dropped for c in self.channels.values()),
+            "coalesced": sum(c.coalesced for c in self.channels.values()),
+        }
+
+
+FANOUT = FanoutHub()
@@ -0,0 +1,130 @@
+import re
+from collections import deque
+from functools import lru_cache
+
+# ==============================================================================
+# KEYWORD FILTER ENGINE
+# ==============================================================================
+# Search keywords may carry filter operators on top of the base query:
+#   +"exact phrase"   must appear (sent upstream as a quoted phrase)
+#   +term             must appear (sent upstream as another search word)
+#   -term / -"phrase" must NOT appear in title or description
+# A keyword is compiled once (cached) into its upstream query ("base") plus a
+# multi-pattern matcher for the exclusions. Required terms belong upstream:
+# filtering them out of a 20-item page of the broader query leaves sparse or
+# empty pages. Exclusions only remove a few items, so variants like '삼성 -주가'
+# and '삼성 -증권' share one upstream fetch of '삼성' and are filtered locally.
+
+# Operator tokens only count at the start of a word, so hyphenated words such as 'K-pop' stay intact.
+FILTER_TOKEN = re.compile(r'(?:^|(?<=\s))([+-])(?:"([^"]+)"|([^\s"]+))')
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton: finds every occurrence of many patterns in a
+    single pass over the text, instead of one substring scan per pattern.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [0]  # bitmask of pattern indices ending at each state
+
+        for idx, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(0)
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._out[state] |= 1 << idx
+
+        # Breadth-first pass to build failure links (depth-1 states fail to the root)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] |= self._out[self._fail[nxt]]
+
+    def scan(self, text: str, stop_mask: int = 0) -> int:
+        """
+        Returns a bitmask of the pattern indices found in text.
+        Stops early as soon as any pattern in `stop_mask` is found.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        found = 0
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+                if found & stop_mask:
+                    break
+        return found
+
+
+class CompiledQuery:
+    """
+    A parsed search keyword: the upstream query (base words plus required terms)
+    and the local exclude filter. `includes` is kept for highlighting.
+    """
+
+    __slots__ = ("keyword", "base", "includes", "excludes", "_matcher", "_exclude_mask")
+
+    def __init__(self, keyword: str, base: str, includes: tuple, excludes: tuple):
+        self.keyword = keyword
+        self.base = base
+        self.includes = includes
+        self.excludes = excludes
+
+        self._matcher = AhoCorasick(excludes) if excludes else None
+        self._exclude_mask = (1 << len(excludes)) - 1
+
+    @property
+    def has_filters(self) -> bool:
+        return self._matcher is not None
+
+    def matches(self, text: str) -> bool:
+        """True if text contains no exclude term (case-insensitive)."""
+        if self._matcher is None:
+            return True
+        return not self._matcher.scan(text.lower(), stop_mask=self._exclude_mask)
+
+    def apply(self, items: list) -> list:
+        """Filters NewsItems by their title and description."""
+        if self._matcher is None:
+            return items
+        return [item for item in items if self.matches(item.search_text)]
+
+
+@lru_cache(maxsize=4096)
+def compile_query(keyword: str) -> CompiledQuery:
+    """Parses a keyword into a CompiledQuery. Results are cached per keyword string."""
+    includes, excludes, required = [], [], []
+
+    def collect(match):
+        term = match.group(2) or match.group(3)
+        if match.group(1) == "+":
+            includes.append(term.lower())
+            # Phrases stay quoted upstream
+            required.append(f'"{term}"' if match.group(2) else term)
+        else:
+            excludes.append(term.lower())
+        return " "
+
+    words = FILTER_TOKEN.sub(collect, keyword).split()
+    # Required terms narrow the upstream query itself, so every page is full of matches
+    base = " ".join(dict.fromkeys(words + required))
+    return CompiledQuery(keyword, base, tuple(dict.fromkeys(includes)), tuple(dict.fromkeys(excludes)))
@@ -0,0 +1,117 @@
+import hashlib
+import importlib.util
+import os
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, IdentityResponder, GZipResponder
+from starlette.staticfiles import StaticFiles
+
+# ==============================================================================
+# HTTP CACHING & COMPRESSION
+# ==============================================================================
+# - Static assets are linked as /static/js/main.js?v=<content hash>. A URL with
+#   the current hash can never change, so browsers may keep it for a year
+#   without asking again; a deploy changes the hash and thus the URL.
+# - Responses are compressed with brotli when the client accepts it and the
+#   'brotli' package is installed, otherwise gzip. SSE streams are left alone.
+# - Rendered fragments carry an ETag (see main.search_results) so a refresh
+#   that would return the same page gets a 304 instead of the HTML.
+
+STATIC_IMMUTABLE = "public, max-age=31536000, immutable"
+STATIC_REVALIDATE = "no-cache"  # unversioned URLs: revalidate (ETag / Last-Modified) every time
+
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+BROTLI_AVAILABLE = importlib.util.find_spec("brotli") is not None
+
+
+class VersionedStaticFiles(StaticFiles):
+    """StaticFiles that hands out content-hashed URLs and marks them immutable."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._hashes = {}  # path -> (mtime, hash)
+
+    def version(self, path: str) -> str:
+        full_path = os.path.join(self.directory, path)
+        mtime = os.stat(full_path).st_mtime
+        cached = self._hashes.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(full_path, "rb") as f:
+                cached = self._hashes[path] = (mtime, hashlib.sha256(f.read()).hexdigest()[:12])
+        return cached[1]
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            query = scope.get("query_string", b"").decode("latin-1")
+            requested = dict(part.partition("=")[::2] for part in query.split("&") if part).get("v")
+            try:
+                current = self.version(path)
+            except OSError:
+                current = None
+            immutable = requested is not None and requested == current
+            response.headers["Cache-Control"] = STATIC_IMMUTABLE if immutable else STATIC_REVALIDATE
+        return response
+
+
+def static_url_function(static_files: VersionedStaticFiles, prefix: str = "/static"):
+    """Template global: static_url('js/main.js') -> '/static/js/main.js?v=1a2b3c4d5e6f'."""
+    def static_url(path: str) -> str:
+        try:
+            return f"{prefix}/{path}?v={static_files.version(path)}"
+        except OSError:
+            return f"{prefix}/{path}"
+    return static_url
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int = BROTLI_QUALITY, **kwargs):
+        super().__init__(app, minimum_size, **kwargs)
+        import brotli  # optional dependency
+        self._compressor = brotli.Compressor(quality=quality)
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if more_body:
+            # Flush per chunk so streamed NDJSON lines reach the client right away
+            return self._compressor.process(body) + self._compressor.flush()
+        return self._compressor.process(body) + self._compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZipMiddleware that prefers brotli when the client accepts it and the package is installed."""
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_SIZE, compresslevel: int = GZIP_LEVEL, **kwargs):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel, **kwargs)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = {
+            part.split(";")[0].strip().lower()
+            for part in Headers(scope=scope).get("Accept-Encoding", "").split(",")
+        }
+        if "br" in accepted and BROTLI_AVAILABLE:
+            responder = BrotliResponder(self.app, self.minimum_size, exclude_content_types=self.exclude_content_types)
+        elif "gzip" in accepted:
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel,
+                                      thread_minimum_size=self.thread_minimum_size,
+                                      exclude_content_types=self.exclude_content_types)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size, exclude_content_types=self.exclude_content_types)
+        await responder(scope, receive, send)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in if_none_match.split(","))
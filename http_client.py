@@ -0,0 +1,72 @@
+import os
+import importlib.util
+
+import httpx
+
+# ==============================================================================
+# SHARED HTTP CLIENTS
+# ==============================================================================
+# One long-lived AsyncClient per upstream role instead of one per call, so
+# repeated requests reuse warm keep-alive connections (no new TCP+TLS handshake).
+# httpx keeps a separate connection pool per origin inside each client, so the
+# article client ends up with one warm pool per publisher host.
+
+# -- Pool Configuration (overridable via environment variables) --
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+# HTTP/2 needs the optional 'h2' package (pip install "httpx[http2]").
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true" and HTTP2_AVAILABLE
+
+# -- Client Roles --
+NAVER_API = "naver_api"   # openapi.naver.com only
+ARTICLE = "article"       # publisher pages (many hosts, redirects allowed)
+
+_clients = {}
+
+
+def _build_client(role: str) -> httpx.AsyncClient:
+    """Creates a pooled AsyncClient configured for the given role."""
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    if role == NAVER_API:
+        return httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=limits, http2=HTTP2_ENABLED)
+    if role == ARTICLE:
+        return httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=limits, http2=HTTP2_ENABLED, follow_redirects=True)
+    raise ValueError(f"Unknown HTTP client role: {role}")
+
+
+def get_client(role: str) -> httpx.AsyncClient:
+    """
+    Returns the shared client for a role.
+    Built lazily so scripts that never run the app's startup hook still work.
+    """
+    client = _clients.get(role)
+    if client is None or client.is_closed:
+        client = _build_client(role)
+        _clients[role] = client
+    return client
+
+
+async def startup_http_clients():
+    """Opens the shared clients. Called from the app startup hook."""
+    for role in (NAVER_API, ARTICLE):
+        get_client(role)
+    print(f"[HTTP] Shared clients ready (http2={HTTP2_ENABLED}, max_connections={HTTP_MAX_CONNECTIONS}, "
+          f"keepalive={HTTP_MAX_KEEPALIVE}/{HTTP_KEEPALIVE_EXPIRY}s)")
+
+
+async def shutdown_http_clients():
+    """Closes every shared client and its pooled connections."""
+    for role, client in list(_clients.items()):
+        try:
+            await client.aclose()
+        except Exception as e:
+            print(f"[HTTP Error] closing {role} client: {e}")
+    _clients.clear()
@@ -0,0 +1,61 @@
+import asyncio
+import os
+import time
+from collections import deque
+
+# ==============================================================================
+# EVENT LOOP LAG MONITOR
+# ==============================================================================
+# A task that asks to wake up every `interval` seconds and records how late it
+# actually woke up. Anything that blocks the loop (CPU-bound parsing, sync I/O)
+# shows up directly as lag.
+
+LOOP_MONITOR_INTERVAL = float(os.getenv("LOOP_MONITOR_INTERVAL", "0.1"))
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = LOOP_MONITOR_INTERVAL, window: int = 600):
+        self.interval = interval
+        self.samples = deque(maxlen=window)  # recent lag samples in seconds
+        self.max_lag = 0.0
+        self._task = None
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - expected)
+            self.samples.append(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def reset(self):
+        self.samples.clear()
+        self.max_lag = 0.0
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    def stats(self) -> dict:
+        return {
+            "last_ms": round(self.samples[-1] * 1000, 2) if self.samples else 0.0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 2),
+            "p99_ms": round(self.percentile(0.99) * 1000, 2),
+            "max_ms": round(self.max_lag * 1000, 2),
+            "samples": len(self.samples),
+        }
+
+
+LOOP_MONITOR = LoopLagMonitor()
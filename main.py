@@ -1,21 +1,19 @@
 import httpx
 import html
 import os
-import re
+import time
 import uuid
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
-from datetime import datetime, timezone 
-from typing import List
+from typing import List, Optional
 from urllib.parse import urlparse
-from email.utils import parsedate_to_datetime
 
 from fastapi import FastAPI, Request, Form, Depends, HTTPException, Cookie
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse
+from fastapi.responses import Response, HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
+from http_caching import VersionedStaticFiles, CompressionMiddleware, static_url_function, etag_matches
+from metrics import RequestMetricsMiddleware
 from bs4 import BeautifulSoup
 from pydantic import BaseModel
-from markupsafe import Markup
 import asyncio
 
 # ==============================================================================
@@ -35,10 +33,17 @@ if not os.path.exists(static_dir):
 # -- App Initialization --
 app = FastAPI()
 app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=["*"])
+# brotli (if installed) or gzip for HTML fragments, JSON and static assets; SSE is left uncompressed
+app.add_middleware(CompressionMiddleware)
+# Outermost: request timings for /metrics (compression included) and the profiler's in-flight gate
+app.add_middleware(RequestMetricsMiddleware)
 
 # -- Mount Static & Templates --
-app.mount("/static", StaticFiles(directory=static_dir), name="static")
+# Templates link assets via static_url(), which adds a content hash so they can be cached as immutable
+static_files = VersionedStaticFiles(directory=static_dir)
+app.mount("/static", static_files, name="static")
 templates = Jinja2Templates(directory=templates_dir)
+templates.env.globals["static_url"] = static_url_function(static_files)
 
 # -- Access Configuration --
 # Shared password for the service. Ideally set via environment variable.
@@ -58,173 +63,485 @@ async def verify_access(request: Request):
 # 2. TEMPLATE FILTERS
 # ==============================================================================
 
-def time_ago(value):
-    """
-    Converts a datetime object or string into a 'human-readable' time difference.
-    e.g., 'Just now', '5 minutes ago', '2 hours ago'.
-    """
-    try:
-        if not value:
-            return ""
-        
-        # Handle string input (Naver API format)
-        if isinstance(value, str):
-            try:
-                dt = parsedate_to_datetime(value)
-            except:
-                return value
-        elif isinstance(value, datetime):
-            dt = value
-        else:
-            return value
+# time_ago / highlight / relative_time filters, compiled-template cache and rendered fragment cache
+from rendering import configure_environment, FragmentCache
 
-        if dt.tzinfo:
-            now = datetime.now(timezone.utc)
-        else:
-            now = datetime.now()
-
-        diff = now - dt
-        seconds = diff.total_seconds()
-
-        if seconds < 60:
-            return "방금 전"
-        elif seconds < 3600:
-            minutes = int(seconds / 60)
-            return f"{minutes}분 전"
-        elif seconds < 86400:
-            hours = int(seconds / 3600)
-            return f"{hours}시간 전"
-        elif seconds < 604800: # 7 days
-            days = int(seconds / 86400)
-            return f"{days}일 전"
-        else:
-            return dt.strftime("%Y-%m-%d")
-    except Exception as e:
-        print(f"[Filter Error] time_ago: {e}")
-        return value
-
-def highlight_keyword(text, keyword):
-    """
-    Wraps occurrences of 'keyword' in the text with <mark> tags for highlighting.
-    Case-insensitive.
-    """
-    try:
-        if not keyword or not text:
-            return text
-        
-        pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-        
-        def replace_func(match):
-            return f'<mark class="highlight">{match.group(0)}</mark>'
-        
-        highlighted = pattern.sub(replace_func, text)
-        return Markup(highlighted)
-    except Exception as e:
-        print(f"[Filter Error] highlight_keyword: {e}")
-        return text
-
-# Register filters
-templates.env.filters["time_ago"] = time_ago
-templates.env.filters["highlight"] = highlight_keyword
+configure_environment(templates.env)
+FRAGMENTS = FragmentCache(templates.env)
 
 
 # -- Scraper Logic Import --
-from scraper import NewsItem, fetch_news, parse_article, get_naver_api_headers
+from scraper import NewsItem, fetch_news, fetch_base_news, parse_article, get_naver_api_headers
+from filters import compile_query
+from http_client import startup_http_clients, shutdown_http_clients
+from cache import TTLCache, SeenSet
+from poller import PollScheduler, POLL_BASE_INTERVAL
+from article_cache import ARTICLE_CACHE
+from news_archive import NEWS_ARCHIVE
+from timeline import TimelineCache
+from extract_pool import EXTRACTION_POOL, ExtractorBusy
+from loop_monitor import LOOP_MONITOR
+from fanout import FANOUT
+from serialization import dumps, encode_items, RawJSONResponse
+from shared_state import create_backend, WORKER_ID
+from resilience import NAVER_UPSTREAM, UpstreamError
+from dedup import DEDUP_INDEX, DEDUP_ENABLED
+from batching import QueryBatcher, PollBatch
+from publishers import PUBLISHERS
+import metrics
+from profiling import PROFILER, PROFILER_ENABLED
 
 # ==============================================================================
 # 3. CACHING & BACKGROUND POLLING (SSE)
 # ==============================================================================
 
-# In-Memory Cache for searches
-SEARCH_CACHE = {}
-
-# Registry for dynamic keyword watching: { "keyword": set(client_ids) }
-WATCH_REGISTRY = {}
-# Connection to Queue mapping: { client_id: asyncio.Queue }
-sse_connections = {}
-# Last activity timestamp per client: { client_id: float_timestamp }
+# In-Memory Cache for searches: bounded by entry count and approx. bytes, entries expire after TTL.
+# Expired pages are kept for SEARCH_STALE_TTL more seconds to be served while the Naver API is down.
+SEARCH_CACHE = TTLCache(
+    max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1000")),
+    max_bytes=int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "600")),
+    stale_ttl=float(os.getenv("SEARCH_STALE_TTL", "3600")),
+)
+# Just-expired pages are answered right away and refreshed in the background (stale-while-revalidate)
+SEARCH_SWR_WINDOW = float(os.getenv("SEARCH_SWR_WINDOW", "60"))
+
+# Watch registry, SSE channels and per-keyword event rings live in the fan-out hub.
+# Registry for dynamic keyword watching (read-only view): { "keyword": set(client_ids) }
+WATCH_REGISTRY = FANOUT.watchers
+# Connection to bounded channel mapping (read-only view): { client_id: ClientChannel }
+sse_connections = FANOUT.channels
+# Last activity timestamp per client on this worker: { client_id: wall-clock timestamp }
 LAST_SEEN_CLIENTS = {}
-# Recent notification buffer: [ (timestamp, keyword, message) ]
-NOTIFICATION_HISTORY = []
 
-POLLING_INTERVAL = 30 # 30 seconds
+POLLING_INTERVAL = POLL_BASE_INTERVAL # 30 seconds by default (base interval; adapted per keyword by the scheduler)
+
+# Watched keywords grouped by base query: { "base query": [keyword, ...] }
+POLL_GROUPS = {}
+# Base queries packed into combined OR queries, one upstream call per batch
+POLL_BATCHER = QueryBatcher()
+# Links already reported per watched keyword: { "keyword": SeenSet(links) }
+SEEN_LINKS = {}
+SEEN_LINKS_PER_KEYWORD = 500
+# Stories (near-duplicate cluster ids) already reported per watched keyword: { "keyword": SeenSet(ids) }
+SEEN_STORIES = {}
+
+async def fetch_timeline_page(base: str, start: int, display: int):
+    """Upstream fetch for older timeline items (deep pages)."""
+    headers = await get_naver_api_headers()
+    items = await fetch_base_news(base, headers=headers, start=start, display=display, interactive=True)
+    NEWS_ARCHIVE.add(items)
+    DEDUP_INDEX.add(items)
+    return items
+
+# One date-ordered, link-deduplicated timeline per base query; pages 2+ are sliced from it
+TIMELINES = TimelineCache(fetch_timeline_page)
+
+async def get_search_items(keyword: str, start: int, headers: dict, refresh: bool = False, mode: str = "live",
+                           cursor: str = None):
+    """
+    Resolves one results page for a keyword.
+    The first page goes through SEARCH_CACHE, which holds unfiltered base-query
+    results, so filter variants of the same base query ('삼성 -주가', '삼성 -증권')
+    share one entry and one fetch. Later pages are sliced from the keyword's
+    timeline after `cursor` (the link of the last card shown), so articles
+    published meanwhile don't shift them.
+    mode="archive" answers from the local news archive instead (see get_archive_items).
+    """
+    if mode == "archive":
+        return await get_archive_items(keyword, start, headers, refresh)
+
+    query = compile_query(keyword)
+    if start > 1 or cursor:
+        return await TIMELINES.page(query, limit=20, cursor=cursor, offset=start - 1)
+
+    cached = SEARCH_CACHE.get_stale(f"{query.base}_1")
+    if cached and not refresh:
+        base_items, expired_for = cached
+        if expired_for < 0:
+            return query.apply(base_items)
+        if not NAVER_UPSTREAM.available():
+            # Circuit open: a refresh would fail straight away, so just serve the stale page
+            return query.apply(base_items)
+        if expired_for <= SEARCH_SWR_WINDOW:
+            revalidate_first_page(query.base, headers)
+            return query.apply(base_items)
+
+    try:
+        base_items = await fetch_first_page(query.base, headers)
+    except UpstreamError as e:
+        # Stale-if-error: the last good page beats an error (or an empty page)
+        if not cached:
+            raise
+        print(f"[Search] Naver API unavailable, serving stale results for '{query.base}': {e}")
+        base_items = cached[0]
+    return query.apply(base_items)
+
+async def fetch_first_page(base: str, headers: dict):
+    """Fetches a base query's first page and stores it in the search cache, archive and timeline."""
+    items = await fetch_base_news(base, headers=headers, start=1, display=20, interactive=True)
+    NEWS_ARCHIVE.add(items)
+    NEWS_ARCHIVE.mark_synced(base)
+    DEDUP_INDEX.add(items)
+    SEARCH_CACHE[f"{base}_1"] = items
+    TIMELINES.merge_head(base, items)
+    return items
+
+def revalidate_first_page(base: str, headers: dict):
+    """Refreshes a stale first page in the background (concurrent refreshes share one fetch)."""
+    async def run():
+        try:
+            await fetch_first_page(base, headers)
+        except UpstreamError as e:
+            print(f"[Search] Background refresh failed for '{base}': {e}")
+
+    asyncio.create_task(run())
+
+def collapse_stories(items):
+    """One card per story: near-duplicate copies of a wire story are folded into one (see dedup)."""
+    return DEDUP_INDEX.collapse(items) if DEDUP_ENABLED else items
+
+def retry_after_header(error: UpstreamError) -> dict:
+    """Retry-After for a 503, when the circuit breaker knows when the API will be tried again."""
+    return {"Retry-After": str(max(1, round(error.retry_after)))} if error.retry_after else {}
+
+async def get_archive_items(keyword: str, start: int, headers: dict, refresh: bool = False):
+    """
+    Archive-first search: only the newest upstream page is fetched (and only when
+    the query hasn't been synced within ARCHIVE_FRESH_WINDOW); everything else,
+    including pages deeper than the Naver API allows, comes from the local FTS index.
+    When the API is down the archive answers on its own, possibly missing the newest items.
+    """
+    query = compile_query(keyword)
+    if refresh or not NEWS_ARCHIVE.is_fresh(query.base):
+        try:
+            await get_search_items(query.base, 1, headers, refresh=refresh)
+        except UpstreamError as e:
+            print(f"[Search] Naver API unavailable, serving stale archive results for '{query.base}': {e}")
+    return await NEWS_ARCHIVE.search(query, limit=20, offset=start - 1)
+
+def get_polling_queries():
+    """
+    Returns the poll batches covering the base queries worth polling right now
+    and rebuilds POLL_GROUPS.
+    Keywords whose watchers have all been offline for > 120s are pruned here.
+    """
+    if not os.getenv("NAVER_CLIENT_ID"):
+        return []
+
+    now = time.time()
+    groups = {}
+    for keyword in list(WATCH_REGISTRY.keys()):
+        # 🛡️ Pruning Logic: Only poll if there's at least one online watcher (on any worker)
+        watcher_ids = WATCH_REGISTRY.get(keyword, set())
+        if any(is_client_online(cid, now) for cid in watcher_ids):
+            groups.setdefault(compile_query(keyword).base, []).append(keyword)
+            continue
+
+        # 🕒 Grace Period: Check if all watchers have been inactive for > 120s
+        all_stale = all((now - client_last_seen(cid)) >= 120 for cid in watcher_ids)
+        if all_stale:
+            print(f"[Polling] Pruning keyword with no active watchers for 120s: {keyword}")
+            asyncio.create_task(share_watch_op({"op": "drop", "keyword": keyword}))
+
+    POLL_GROUPS.clear()
+    POLL_GROUPS.update(groups)
+    for keyword in list(SEEN_LINKS.keys()):
+        if keyword not in WATCH_REGISTRY:
+            del SEEN_LINKS[keyword]
+            SEEN_STORIES.pop(keyword, None)
+    return POLL_BATCHER.plan(groups.keys())
+
+def card_key(item) -> tuple:
+    """What a rendered news card depends on besides the keyword."""
+    return item.link, getattr(item, "outlet_count", 1), getattr(item, "cursor", None)
+
+def render_news_cards(items, keyword: str) -> str:
+    """Renders news cards with the same partial the results page uses (cached per keyword and card)."""
+    return "".join(FRAGMENTS.render("news_card.html", (keyword,) + card_key(item), {"item": item, "keyword": keyword})
+                   for item in items)
+
+async def notify_new_articles(keyword: str, new_items: list):
+    """
+    Publishes a notification carrying exactly the new items to the keyword's watchers.
+    The payload includes pre-rendered cards so clients can prepend them without refetching the page.
+    It goes out on the shared "events" channel with a cluster-wide id, so watchers
+    connected to any worker receive it.
+    """
+    print(f"[Polling] {len(new_items)} new article(s) detected for: {keyword}")
+    event_id = await STATE.incr("event_id")
+    await STATE.publish("events", {
+        "id": event_id,
+        "keyword": keyword,
+        "payload": {
+            "type": "new_articles",
+            "keyword": keyword,
+            "message": f"[{keyword}] 관련 새로운 기사 {len(new_items)}건이 감지되었습니다.",
+            "items": [item.dict() for item in new_items],
+            "html": render_news_cards(new_items, keyword),
+        },
+    })
+
+def merge_first_page(items, page):
+    """A cached first page with newly polled items merged in by date (batched polls only see a subset)."""
+    known = {item.link for item in page}
+    fresh = [item for item in items if item.link not in known]
+    if not fresh:
+        return page
+    return sorted(fresh + list(page), key=lambda item: -item.published_at)[:max(len(page), 20)]
+
+async def poll_batch(batch: PollBatch) -> bool:
+    """
+    Polls one batch of base queries with a single upstream call and hands each
+    base its share of the results (see batching). Returns True if any watched
+    keyword got new articles.
+    """
+    headers = await get_naver_api_headers()
+    # An outage raises UpstreamError here, so the cached page is never replaced by an empty one
+    items = await fetch_base_news(batch.query, headers=headers, start=1, display=batch.display)
+    routed = POLL_BATCHER.ingest(batch, items)
+    if not items:
+        return False
+    NEWS_ARCHIVE.add(items)
+    DEDUP_INDEX.add(items)
+
+    any_new = False
+    for base, base_items in routed.items():
+        if await publish_polled_items(base, base_items, complete=batch.solo):
+            any_new = True
+    return any_new
+
+async def publish_polled_items(base: str, items: list, complete: bool) -> bool:
+    """
+    Fans one base query's polled items out to every watched filter variant of
+    it. Each variant reports only links it has not seen before. `complete` is
+    False for items routed out of a batched poll: those update the cached first
+    page only by merging, and don't mark the archive as synced. A complete poll
+    may hold more than a page (a widened window); the first 20 are cached.
+    Returns True if any variant got new articles.
+    """
+    cache_key = f"{base}_1"
+    cached = SEARCH_CACHE.get_stale(cache_key)
+    cached_data = cached[0] if cached else None
+    if complete:
+        NEWS_ARCHIVE.mark_synced(base)
+        page = items[:20]
+    else:
+        page = merge_first_page(items, cached_data) if cached_data else None
+    # Update Cache (and the other workers' copies when the first page changed)
+    page_changed = page is not None and (not cached_data or [i.link for i in cached_data] != [i.link for i in page])
+    if complete or page_changed:
+        SEARCH_CACHE[cache_key] = page
+    # Only a complete poll is a real first page; batched items would skew the timeline's upstream offsets
+    if items and complete:
+        TIMELINES.merge_head(base, items)
+    elif items:
+        TIMELINES.merge(base, items)
+    if page_changed:
+        await STATE.publish("search_cache", {"origin": WORKER_ID, "key": cache_key, "complete": complete,
+                                             "items": [item.dict() for item in page]})
+
+    any_new = False
+    for keyword in POLL_GROUPS.get(base, []):
+        query = compile_query(keyword)
+        filtered = query.apply(items)
+        seen = SEEN_LINKS.get(keyword)
+        if seen is None:
+            # First poll for this keyword: what the user already saw (cached page) is the baseline
+            baseline = query.apply(cached_data) if cached_data else filtered
+            seen = SEEN_LINKS[keyword] = SeenSet((item.link for item in baseline), max_size=SEEN_LINKS_PER_KEYWORD)
+            SEEN_STORIES[keyword] = SeenSet((DEDUP_INDEX.cluster_of(item).id for item in baseline),
+                                            max_size=SEEN_LINKS_PER_KEYWORD)
+            if not cached_data:
+                continue
+            # The polled window (a widened solo one, or up to 100 batched items) reaches further back than
+            # the cached page; anything not newer than that page's oldest item isn't news to this user
+            watermark = min(item.published_at for item in cached_data)
+        else:
+            watermark = None
+
+        new_items = [item for item in filtered
+                     if item.link not in seen and (watermark is None or item.published_at > watermark)]
+        # Add oldest first so the newest links are the last to be forgotten
+        seen.update(item.link for item in reversed(filtered))
+        if DEDUP_ENABLED:
+            # One notification per story: another outlet's copy of a story already reported stays quiet
+            stories = SEEN_STORIES.setdefault(keyword, SeenSet(max_size=SEEN_LINKS_PER_KEYWORD))
+            new_items = [story for story in DEDUP_INDEX.collapse(new_items) if story.cluster_id not in stories]
+            stories.update(DEDUP_INDEX.cluster_of(item).id for item in reversed(filtered))
+        if new_items:
+            any_new = True
+            await notify_new_articles(keyword, new_items)
+    return any_new
+
+# Polling pauses while the Naver API circuit is open
+POLL_SCHEDULER = PollScheduler(poll_batch, get_polling_queries, base_interval=POLLING_INTERVAL,
+                               ready_fn=NAVER_UPSTREAM.available)
 
 async def poll_naver_news_task():
-    """Background task to poll keywords that have active watchers."""
-    print(f"[Polling] Started dynamic background polling task every {POLLING_INTERVAL}s")
+    """Background task that polls watched base queries through the adaptive scheduler."""
+    await POLL_SCHEDULER.run()
+
+# ==============================================================================
+# 4. CLUSTER STATE (MULTI-WORKER / MULTI-NODE)
+# ==============================================================================
+# Every worker keeps its own FANOUT, SEARCH_CACHE and SSE connections, and the
+# shared backend (STATE_BACKEND, see shared_state.py) keeps them in step:
+#   "events"        notifications with cluster-wide ids -> every worker's FANOUT
+#   "watch"         watch/unwatch/sync/drop ops (+ watch:{client_id} snapshots for new workers)
+#   "search_cache"  first pages refreshed by the poller
+#   seen:{client_id}  presence, so the poller knows about clients on other workers
+#   lease "poller"  leader election: only the lease holder runs POLL_SCHEDULER
+
+STATE = create_backend()
+LEADER_LEASE_TTL = float(os.getenv("LEADER_LEASE_TTL", "15"))
+PRESENCE_INTERVAL = float(os.getenv("PRESENCE_INTERVAL", "15"))
+# Presence reported by all workers (refreshed by the leader): { client_id: {"seen": ts, "connected": bool} }
+CLUSTER_PRESENCE = {}
+CLUSTER_TASKS = []
+
+def client_last_seen(client_id: str) -> float:
+    local = LAST_SEEN_CLIENTS.get(client_id, 0)
+    remote = CLUSTER_PRESENCE.get(client_id, {}).get("seen", 0)
+    return max(local, remote)
+
+def is_client_online(client_id: str, now: float) -> bool:
+    if client_id in sse_connections:
+        return True
+    presence = CLUSTER_PRESENCE.get(client_id)
+    # A presence report older than two intervals means that worker lost the client (or died)
+    return bool(presence and presence["connected"] and now - presence["seen"] < PRESENCE_INTERVAL * 2)
+
+def apply_watch_op(op: dict):
+    """Applies one watch registry change to this worker's FANOUT."""
+    kind = op["op"]
+    if kind == "watch":
+        FANOUT.watch(op["client_id"], op["keyword"])
+    elif kind == "unwatch":
+        FANOUT.unwatch(op["client_id"], op["keyword"])
+    elif kind == "sync":
+        FANOUT.sync(op["client_id"], op["keywords"])
+    elif kind == "drop":
+        FANOUT.drop_keyword(op["keyword"])
+
+async def share_watch_op(op: dict):
+    """Applies a watch registry change locally, persists the affected clients and broadcasts it."""
+    affected = [op["client_id"]] if "client_id" in op else list(WATCH_REGISTRY.get(op["keyword"], ()))
+    apply_watch_op(op)
+    try:
+        for client_id in affected:
+            keywords = FANOUT.client_keywords.get(client_id)
+            if keywords:
+                await STATE.set(f"watch:{client_id}", sorted(keywords))
+            else:
+                await STATE.delete(f"watch:{client_id}")
+        await STATE.publish("watch", dict(op, origin=WORKER_ID))
+    except Exception as e:
+        print(f"[Cluster Error] watch op {op['op']}: {e}")
+
+def on_event_message(message: dict):
+    FANOUT.publish(message["keyword"], message["payload"], event_id=message["id"])
+
+def on_watch_message(message: dict):
+    if message.get("origin") != WORKER_ID:
+        apply_watch_op(message)
+
+def on_search_cache_message(message: dict):
+    if message.get("origin") != WORKER_ID:
+        items = [NewsItem(**item) for item in message["items"]]
+        SEARCH_CACHE[message["key"]] = items
+        base = message["key"].rsplit("_", 1)[0]
+        if message.get("complete", True):
+            TIMELINES.merge_head(base, items)
+        else:
+            TIMELINES.merge(base, items)
+
+async def consume_channel(channel: str, handler):
+    """Feeds every message of a shared channel to handler, resubscribing after errors."""
     while True:
         try:
-            active_keywords = list(WATCH_REGISTRY.keys())
-            if not active_keywords:
-                await asyncio.sleep(POLLING_INTERVAL)
-                continue
-            
-            headers = await get_naver_api_headers()
-            if not headers.get("X-Naver-Client-Id"):
-                await asyncio.sleep(POLLING_INTERVAL)
-                continue
+            async for message in STATE.subscribe(channel):
+                handler(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Cluster Error] {channel} subscriber: {e}")
+            await asyncio.sleep(1)
 
-            for keyword in active_keywords:
-                # 🛡️ Pruning Logic: Only poll if there's at least one online watcher
-                watcher_ids = WATCH_REGISTRY.get(keyword, set())
-                online_watchers = [cid for cid in watcher_ids if cid in sse_connections]
-                
-                if not online_watchers:
-                    # 🕒 Grace Period: Check if all watchers have been inactive for > 120s
-                    all_stale = True
-                    for cid in watcher_ids:
-                        last_seen = LAST_SEEN_CLIENTS.get(cid, 0)
-                        if (asyncio.get_event_loop().time() - last_seen) < 120:
-                            all_stale = False
-                            break
-                    
-                    if all_stale:
-                        print(f"[Polling] Pruning keyword with no active watchers for 120s: {keyword}")
-                        if keyword in WATCH_REGISTRY:
-                            del WATCH_REGISTRY[keyword]
-                    continue
-
-                # Fetch news only if we have active, potentially offline-reconnecting watchers
-                items = await fetch_news(keyword, headers=headers, start=1, display=20)
-                
-                if items:
-                    latest_link = items[0].link
-                    cache_key = f"{keyword}_1"
-                    cached_data = SEARCH_CACHE.get(cache_key)
-                    
-                    is_new = False
-                    if cached_data and len(cached_data) > 0:
-                        if latest_link != cached_data[0].link:
-                            is_new = True
-                    
-                    # Update Cache
-                    SEARCH_CACHE[cache_key] = items
-                    
-                    if is_new:
-                        current_time = asyncio.get_event_loop().time()
-                        print(f"[Polling] New article detected for: {keyword}")
-                        message = f"[{keyword}] 관련 새로운 기사가 감지되었습니다."
-                        
-                        # Store in history buffer (keep last 50)
-                        NOTIFICATION_HISTORY.append((current_time, keyword, message))
-                        if len(NOTIFICATION_HISTORY) > 50:
-                            NOTIFICATION_HISTORY.pop(0)
-                        
-                        # Notify only the clients watching THIS keyword
-                        for client_id in list(watcher_ids):
-                            q = sse_connections.get(client_id)
-                            if q:
-                                await q.put(message)
-                        
+async def leader_election_task():
+    """Holds (or waits for) the poller lease; only the holder's scheduler ticks."""
+    POLL_SCHEDULER.enabled = False
+    while True:
+        try:
+            is_leader = await STATE.acquire_lease("poller", WORKER_ID, LEADER_LEASE_TTL)
+        except Exception as e:
+            print(f"[Cluster Error] lease: {e}")
+            is_leader = False
+        if is_leader != POLL_SCHEDULER.enabled:
+            print(f"[Cluster] {WORKER_ID} {'acquired' if is_leader else 'lost'} the poller lease")
+            POLL_SCHEDULER.enabled = is_leader
+        await asyncio.sleep(LEADER_LEASE_TTL / 3)
+
+async def presence_task():
+    """Reports this worker's clients and (on the leader) refreshes CLUSTER_PRESENCE."""
+    while True:
+        try:
+            now = time.time()
+            reports = {}
+            for client_id, seen in list(LAST_SEEN_CLIENTS.items()):
+                connected = client_id in sse_connections
+                if connected or now - seen < 300:
+                    reports[f"seen:{client_id}"] = {"seen": now if connected else seen, "connected": connected}
+            await STATE.set_many(reports, ttl=300)
+            if POLL_SCHEDULER.enabled:
+                presence = await STATE.get_prefix("seen:")
+                CLUSTER_PRESENCE.clear()
+                CLUSTER_PRESENCE.update({key[len("seen:"):]: value for key, value in presence.items()})
         except Exception as e:
-            print(f"[Polling Error] {e}")
-            
-        await asyncio.sleep(POLLING_INTERVAL)
+            print(f"[Cluster Error] presence: {e}")
+        await asyncio.sleep(PRESENCE_INTERVAL)
+
+async def load_watch_snapshot():
+    """Rebuilds the watch registry from the shared state (e.g. a worker joining late)."""
+    snapshot = await STATE.get_prefix("watch:")
+    for key, keywords in snapshot.items():
+        FANOUT.sync(key[len("watch:"):], keywords)
+    if snapshot:
+        print(f"[Cluster] Loaded {len(snapshot)} watch list(s) from shared state")
 
 @app.on_event("startup")
 async def startup_event():
+    await startup_http_clients()
+    EXTRACTION_POOL.start()
+    LOOP_MONITOR.start()
+    NEWS_ARCHIVE.start()
+    if PROFILER_ENABLED:
+        PROFILER.start()
+    await load_watch_snapshot()
+    CLUSTER_TASKS.extend([
+        asyncio.create_task(consume_channel("events", on_event_message)),
+        asyncio.create_task(consume_channel("watch", on_watch_message)),
+        asyncio.create_task(consume_channel("search_cache", on_search_cache_message)),
+        asyncio.create_task(leader_election_task()),
+        asyncio.create_task(presence_task()),
+    ])
     asyncio.create_task(poll_naver_news_task())
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in CLUSTER_TASKS:
+        task.cancel()
+    if POLL_SCHEDULER.enabled:
+        # Hand the poller over right away instead of waiting for the lease to expire
+        await STATE.release_lease("poller", WORKER_ID)
+    await STATE.close()
+    await shutdown_http_clients()
+    ARTICLE_CACHE.close()
+    await NEWS_ARCHIVE.close()
+    EXTRACTION_POOL.shutdown()
+    LOOP_MONITOR.stop()
+    PROFILER.stop()
+
 # ==============================================================================
 # 5. ROUTERS (ENDPOINTS)
 # ==============================================================================
@@ -256,29 +573,47 @@ async def search_api(
     request: Request,
     keyword: str = Form(...), 
     start: int = Form(default=1), 
+    mode: str = Form(default="live"),
+    cursor: str = Form(default=None),
     headers: dict = Depends(get_naver_api_headers)
 ):
-    """API endpoint for JSON search results."""
+    """
+    API endpoint for JSON search results. mode="archive" searches the local archive first;
+    `cursor` (link of the last item shown) pages through the keyword timeline.
+    """
     auth_check = await verify_access(request)
     if auth_check: return JSONResponse(content={"error": "Unauthorized"}, status_code=401)
     
-    # Simple explicit string matching to bypass complicated parsing
-    cache_key = f"{keyword}_{start}"
-    if cache_key in SEARCH_CACHE:
-        items = SEARCH_CACHE[cache_key]
-    else:
-        items = await fetch_news(keyword, headers=headers, start=start, display=20)
-        # Store in cache only for the first page
-        if start == 1:
-            SEARCH_CACHE[cache_key] = items
-            
-    return {"items": [item.dict() for item in items], "total": len(items)}
+    try:
+        items = collapse_stories(await get_search_items(keyword, start, headers, mode=mode, cursor=cursor))
+    except UpstreamError as e:
+        return JSONResponse(content={"error": f"Naver API unavailable: {e}", "items": [], "total": 0},
+                            status_code=503, headers=retry_after_header(e))
+    # Items cache their own JSON, so a cache hit only joins pre-encoded bytes.
+    # next_cursor: where the next page continues (collapsed stories can hide the page's last item)
+    next_cursor = getattr(items[-1], "cursor", items[-1].link) if items else None
+    return RawJSONResponse(encode_items(items, total=len(items), next_cursor=next_cursor))
+
+UPSTREAM_UNAVAILABLE_HTML = '<div class="empty-state"><p>뉴스 API에 일시적으로 연결할 수 없습니다. 잠시 후 다시 시도해주세요.</p></div>'
+
+def search_results_fragment(keyword: str, start: int, items):
+    """
+    The results fragment for one page, with its relative-time labels and ETag.
+    A repeated page is served from the fragment cache; only relative times are re-rendered.
+    """
+    fragment = FRAGMENTS.get("search_results.html", (keyword, tuple(map(card_key, items))), {
+        "items": items, "keyword": keyword, "start": start + 20
+    })
+    labels = fragment.labels()
+    return fragment, labels, fragment.etag(labels)
 
 @app.post("/search-results", response_class=HTMLResponse)
 async def search_results(
     request: Request, 
     keyword: str = Form(...), 
     start: int = Form(default=1), 
+    mode: str = Form(default="live"),
+    cursor: str = Form(default=None),
     headers: dict = Depends(get_naver_api_headers)
 ):
     """Renders search results page (Server-Side Rendering)."""
@@ -286,31 +621,152 @@ async def search_results(
     if auth_check: return auth_check
     
     try:
-        cache_key = f"{keyword}_{start}"
         is_refresh = (await request.form()).get("refresh") == "true"
-        
-        if cache_key in SEARCH_CACHE and not is_refresh:
-            items = SEARCH_CACHE[cache_key]
-        else:
-            items = await fetch_news(keyword, headers=headers, start=start, display=20)
-            if start == 1:
-                SEARCH_CACHE[cache_key] = items
-
-        return templates.TemplateResponse(request=request, name="search_results.html", context={
-            "items": items, "keyword": keyword, "start": start + 20
-        })
+        items = collapse_stories(await get_search_items(keyword, start, headers, refresh=is_refresh, mode=mode,
+                                                        cursor=cursor))
+
+        fragment, labels, etag = search_results_fragment(keyword, start, items)
+        cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=cache_headers)
+        return HTMLResponse(fragment.render(labels), headers=cache_headers)
+    except UpstreamError as e:
+        print(f"[Search] Naver API unavailable for '{keyword}': {e}")
+        return HTMLResponse(content=UPSTREAM_UNAVAILABLE_HTML, status_code=503, headers=retry_after_header(e))
     except Exception as e:
         import traceback
         error_msg = f"Server Error: {str(e)}\n{traceback.format_exc()}"
         print(error_msg)
         return HTMLResponse(content=f"<pre>{error_msg}</pre>", status_code=500)
 
+# -- Batch Search (restoring several tabs at once) --
+SEARCH_BATCH_MAX_ENTRIES = int(os.getenv("SEARCH_BATCH_MAX_ENTRIES", "10"))
+SEARCH_BATCH_CONCURRENCY = int(os.getenv("SEARCH_BATCH_CONCURRENCY", "6"))
+
+class SearchBatchEntry(BaseModel):
+    keyword: str
+    start: int = 1
+    mode: str = "live"
+    cursor: Optional[str] = None
+    refresh: bool = False
+
+class SearchBatchRequest(BaseModel):
+    searches: List[SearchBatchEntry]
+    format: str = "html"   # "html": rendered fragments, "json": items as /api/search returns them
+
+@app.post("/api/search/batch")
+async def search_batch(request: Request, data: SearchBatchRequest, headers: dict = Depends(get_naver_api_headers)):
+    """
+    Resolves several searches in one round trip, concurrently, through the same
+    cache/timeline/upstream path as /search-results and /api/search.
+    Results stream back as NDJSON lines in completion order, so a slow keyword
+    never holds up the fast ones. Every line carries the entry's "index", "keyword"
+    and "start", plus "html" and "etag" (format=html) or "result" (format=json, the
+    /api/search body). A failed entry has "status" and "error" instead, and
+    "retry_after" when the upstream circuit knows it. A request with more than
+    SEARCH_BATCH_MAX_ENTRIES searches is rejected (413) rather than cut short.
+    """
+    auth_check = await verify_access(request)
+    if auth_check: return JSONResponse(content={"error": "Unauthorized"}, status_code=401)
+
+    if len(data.searches) > SEARCH_BATCH_MAX_ENTRIES:
+        return JSONResponse(content={"error": f"At most {SEARCH_BATCH_MAX_ENTRIES} searches per batch"},
+                            status_code=413)
+    entries = data.searches
+    semaphore = asyncio.Semaphore(SEARCH_BATCH_CONCURRENCY)
+
+    async def resolve(index: int, entry: SearchBatchEntry) -> bytes:
+        line = {"index": index, "keyword": entry.keyword, "start": entry.start}
+        try:
+            async with semaphore:
+                items = collapse_stories(await get_search_items(entry.keyword, entry.start, headers,
+                                                                refresh=entry.refresh, mode=entry.mode,
+                                                                cursor=entry.cursor))
+        except UpstreamError as e:
+            line.update(status=503, error=f"Naver API unavailable: {e}")
+            if e.retry_after:
+                line["retry_after"] = max(1, round(e.retry_after))
+            if data.format == "html":
+                line["html"] = UPSTREAM_UNAVAILABLE_HTML
+            return dumps(line) + b"\n"
+        except Exception as e:
+            print(f"[Search] Batch entry '{entry.keyword}' failed: {e}")
+            line.update(status=500, error=f"Server Error: {e}")
+            return dumps(line) + b"\n"
+
+        if data.format == "json":
+            next_cursor = getattr(items[-1], "cursor", items[-1].link) if items else None
+            # Items cache their own JSON: splice the pre-encoded /api/search body in as "result"
+            return (dumps(line)[:-1] + b',"result":'
+                    + encode_items(items, total=len(items), next_cursor=next_cursor) + b"}\n")
+        fragment, labels, etag = search_results_fragment(entry.keyword, entry.start, items)
+        line.update(html=fragment.render(labels), etag=etag)
+        return dumps(line) + b"\n"
+
+    async def ndjson_generator():
+        tasks = [asyncio.create_task(resolve(i, entry)) for i, entry in enumerate(entries)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Client went away: stop the remaining searches
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(ndjson_generator(), media_type="application/x-ndjson")
+
 @app.get("/api/article", response_class=JSONResponse)
 async def get_article_content(url: str):
-    """API endpoint to fetch article content (for async loading if needed)."""
-    content = await parse_article(url)
+    """API endpoint to fetch article content (served from the article cache when possible)."""
+    try:
+        content = await ARTICLE_CACHE.get(url)
+    except ExtractorBusy as e:
+        # Backpressure: tell the client to retry instead of queueing unbounded parse work
+        return JSONResponse(content={"error": str(e)}, status_code=503, headers={"Retry-After": "2"})
+    except Exception as e:
+        content = f"Content extraction failed: {str(e)}"
     return {"content": content}
 
+# -- Batch Article Prefetch --
+ARTICLE_BATCH_MAX_URLS = int(os.getenv("ARTICLE_BATCH_MAX_URLS", "50"))
+ARTICLE_BATCH_CONCURRENCY = int(os.getenv("ARTICLE_BATCH_CONCURRENCY", "6"))
+
+class ArticleBatchRequest(BaseModel):
+    urls: List[str]
+
+@app.post("/api/articles/batch")
+async def get_articles_batch(request: Request, data: ArticleBatchRequest):
+    """
+    Fetches many article bodies in one round trip.
+    Results stream back as NDJSON lines ({"index", "url", "content"} or {"index", "url", "error"})
+    in completion order, so a slow publisher never holds up the fast ones.
+    """
+    auth_check = await verify_access(request)
+    if auth_check: return JSONResponse(content={"error": "Unauthorized"}, status_code=401)
+
+    urls = list(dict.fromkeys(data.urls))[:ARTICLE_BATCH_MAX_URLS]
+    semaphore = asyncio.Semaphore(ARTICLE_BATCH_CONCURRENCY)
+
+    async def load(index: int, url: str):
+        async with semaphore:
+            try:
+                return {"index": index, "url": url, "content": await ARTICLE_CACHE.get(url)}
+            except Exception as e:
+                return {"index": index, "url": url, "error": f"Content extraction failed: {str(e)}"}
+
+    async def ndjson_generator():
+        tasks = [asyncio.create_task(load(i, url)) for i, url in enumerate(urls)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                yield dumps(result) + b"\n"
+        finally:
+            # Client went away: stop the remaining downloads
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(ndjson_generator(), media_type="application/x-ndjson")
+
 @app.get("/clippings-tab", response_class=HTMLResponse)
 async def clippings_tab(request: Request):
     """Renders the clippings (saved news) tab."""
@@ -318,61 +774,138 @@ async def clippings_tab(request: Request):
     if auth_check: return auth_check
     return templates.TemplateResponse(request=request, name="clippings_tab.html")
 
+@app.get("/api/poller/stats", response_class=JSONResponse)
+async def poller_stats(request: Request):
+    """Polling scheduler status: cycle lag, quota spent and per-keyword intervals."""
+    auth_check = await verify_access(request)
+    if auth_check: return JSONResponse(content={"error": "Unauthorized"}, status_code=401)
+    return {**POLL_SCHEDULER.stats(), "batching": POLL_BATCHER.stats()}
+
+@app.get("/api/runtime/stats", response_class=JSONResponse)
+async def runtime_stats(request: Request):
+    """Event-loop lag and extraction pool status for this worker."""
+    auth_check = await verify_access(request)
+    if auth_check: return JSONResponse(content={"error": "Unauthorized"}, status_code=401)
+    return {"worker_id": WORKER_ID, "is_leader": POLL_SCHEDULER.enabled,
+            "loop_lag": LOOP_MONITOR.stats(), "extraction": EXTRACTION_POOL.stats(),
+            "article_cache": ARTICLE_CACHE.stats(), "news_archive": await NEWS_ARCHIVE.stats(),
+            "timelines": TIMELINES.stats(),
+            "fragments": FRAGMENTS.stats(),
+            "upstream": NAVER_UPSTREAM.stats(), "search_cache": SEARCH_CACHE.stats(),
+            "dedup": DEDUP_INDEX.stats(), "publishers": PUBLISHERS.stats(),
+            "sse": FANOUT.stats(), "profiler": PROFILER.stats()}
+
+# -- Metrics & Profiling --
+# Prometheus scrapers can't log in: with METRICS_TOKEN set they may send "Authorization: Bearer <token>" instead
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+async def verify_metrics_access(request: Request) -> bool:
+    if METRICS_TOKEN and request.headers.get("authorization") == f"Bearer {METRICS_TOKEN}":
+        return True
+    return not await verify_access(request)
+
+def collect_runtime_metrics():
+    """Copies the numbers other components keep into the scrape-time metrics."""
+    cache = SEARCH_CACHE.stats()
+    metrics.SEARCH_CACHE_LOOKUPS.set(cache["hits"], "hit")
+    metrics.SEARCH_CACHE_LOOKUPS.set(cache["misses"], "miss")
+    metrics.SEARCH_CACHE_HIT_RATIO.set(cache["hit_ratio"])
+    metrics.SEARCH_CACHE_ENTRIES.set(cache["entries"])
+    metrics.SEARCH_CACHE_BYTES.set(cache["bytes"])
+    metrics.POLL_CYCLE_LAG.set(POLL_SCHEDULER.last_lag)
+    metrics.POLL_MAX_LAG.set(POLL_SCHEDULER.max_lag)
+    metrics.POLLS_THROTTLED.set(POLL_SCHEDULER.throttled)
+    metrics.POLL_BATCHES.set(len(POLL_BATCHER.batches))
+    metrics.WATCHED_KEYWORDS.set(len(WATCH_REGISTRY))
+    metrics.HTTP_REQUESTS_IN_FLIGHT.set(PROFILER.in_flight)
+    metrics.SSE_CONNECTIONS.set(len(sse_connections))
+    # Aggregated: a series per client id would grow without bound as clients come and go
+    depths = [len(channel) for channel in sse_connections.values()]
+    metrics.SSE_QUEUED_EVENTS.set(sum(depths))
+    metrics.SSE_QUEUE_DEPTH_MAX.set(max(depths, default=0))
+    metrics.SSE_DROPPED.set(sum(channel.dropped for channel in sse_connections.values()))
+    metrics.LOOP_LAG.set(LOOP_MONITOR.percentile(0.5), "0.5")
+    metrics.LOOP_LAG.set(LOOP_MONITOR.percentile(0.99), "0.99")
+
+@app.get("/metrics")
+async def metrics_endpoint(request: Request):
+    """This worker's metrics in the Prometheus text format."""
+    if not await verify_metrics_access(request):
+        return JSONResponse(content={"error": "Unauthorized"}, status_code=401)
+    collect_runtime_metrics()
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.post("/api/profiler/start", response_class=JSONResponse)
+async def profiler_start(request: Request, seconds: float = Form(default=30), interval_ms: float = Form(default=None)):
+    """Starts sampling the request path on this worker for `seconds` (a new profile replaces the old one)."""
+    auth_check = await verify_access(request)
+    if auth_check: return JSONResponse(content={"error": "Unauthorized"}, status_code=401)
+    # Shorter intervals would keep the sampler thread busy under the GIL, stalling the loop it measures
+    interval = min(max(interval_ms, 1), 100) / 1000 if interval_ms is not None else None
+    PROFILER.start(seconds=min(max(seconds, 1), 600), interval=interval)
+    return PROFILER.stats()
+
+@app.post("/api/profiler/stop", response_class=JSONResponse)
+async def profiler_stop(request: Request):
+    auth_check = await verify_access(request)
+    if auth_check: return JSONResponse(content={"error": "Unauthorized"}, status_code=401)
+    PROFILER.stop()
+    return PROFILER.stats()
+
+@app.get("/api/profiler")
+async def profiler_profile(request: Request):
+    """The collected profile as folded stacks (flamegraph.pl / speedscope input)."""
+    auth_check = await verify_access(request)
+    if auth_check: return JSONResponse(content={"error": "Unauthorized"}, status_code=401)
+    return PlainTextResponse(PROFILER.folded())
+
 @app.get("/api/stream/notifications")
-async def sse_notifications(request: Request, client_id: str = None):
-    """Server-Sent Events endpoint for real-time notifications."""
+async def sse_notifications(request: Request, client_id: str = None, last_event_id: int = None):
+    """
+    Server-Sent Events endpoint for real-time notifications.
+    Resumes from the standard Last-Event-ID header (or ?last_event_id= for clients that
+    reconnect manually); without one, the last 2 minutes of events are replayed.
+    """
     if not client_id:
         return JSONResponse(content={"error": "client_id is required"}, status_code=400)
-        
+
+    header_id = request.headers.get("last-event-id")
+    if header_id and header_id.isdigit():
+        last_event_id = int(header_id)
+
     async def event_generator():
         # Update last seen
-        current_time = asyncio.get_event_loop().time()
-        LAST_SEEN_CLIENTS[client_id] = current_time
-        
-        # Clean up any existing connection
-        if client_id in sse_connections:
-            pass
-            
-        q = asyncio.Queue()
-        sse_connections[client_id] = q
-        
+        LAST_SEEN_CLIENTS[client_id] = time.time()
+
+        # Replaces (and ends) any older stream of the same client
+        channel = FANOUT.connect(client_id)
+
         try:
             # Send initial confirmation
             yield f"data: connected:{client_id}\n\n"
-            
+
             # 🚀 Catch-up: Replay missed notifications for this client's keywords
-            # Check notifications from the last 2 minutes
-            client_keywords = []
-            for kw, watchers in WATCH_REGISTRY.items():
-                if client_id in watchers:
-                    client_keywords.append(kw)
-            
-            if client_keywords:
-                for ts, kw, msg in NOTIFICATION_HISTORY:
-                    if kw in client_keywords and (current_time - ts) < 120:
-                        yield f"data: {msg}\n\n"
-            
-            while True:
+            for event in FANOUT.replay(client_id, last_event_id):
+                yield event.frame()
+
+            while not channel.closed:
                 if await request.is_disconnected():
                     break
-                
-                try:
-                    message = await asyncio.wait_for(q.get(), timeout=30.0)
-                    yield f"data: {message}\n\n"
-                    # Update last seen on activity
-                    LAST_SEEN_CLIENTS[client_id] = asyncio.get_event_loop().time()
-                except asyncio.TimeoutError:
+
+                event = await channel.get(timeout=30.0)
+                if event is not None:
+                    yield event.frame()
+                elif not channel.closed:
                     # Heartbeat
                     yield ": ping\n\n"
-                    LAST_SEEN_CLIENTS[client_id] = asyncio.get_event_loop().time()
+                LAST_SEEN_CLIENTS[client_id] = time.time()
         except asyncio.CancelledError:
             pass
         finally:
-            if client_id in sse_connections:
-                del sse_connections[client_id]
+            FANOUT.disconnect(channel)
             # Pruning is handled by the background task grace period now
-            LAST_SEEN_CLIENTS[client_id] = asyncio.get_event_loop().time()
-                        
+            LAST_SEEN_CLIENTS[client_id] = time.time()
+
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
 @app.post("/api/watch")
@@ -383,21 +916,16 @@ async def watch_keyword(request: Request, keyword: str = Form(...), client_id: s
     
     # We allow watching even if SSE is temporarily disconnected, 
     # as long as we have the client_id
-    if keyword not in WATCH_REGISTRY:
-        WATCH_REGISTRY[keyword] = set()
-    WATCH_REGISTRY[keyword].add(client_id)
+    await share_watch_op({"op": "watch", "client_id": client_id, "keyword": keyword})
     print(f"[Watch] Client {client_id} started watching: {keyword}")
     return {"status": "success", "keyword": keyword}
 
 @app.post("/api/unwatch")
 async def unwatch_keyword(request: Request, keyword: str = Form(...), client_id: str = Form(None)):
     """Unregisters a keyword."""
-    if client_id and keyword in WATCH_REGISTRY:
-        if client_id in WATCH_REGISTRY[keyword]:
-            WATCH_REGISTRY[keyword].remove(client_id)
-            if not WATCH_REGISTRY[keyword]:
-                del WATCH_REGISTRY[keyword]
-            print(f"[Unwatch] Client {client_id} stopped watching: {keyword}")
+    if client_id and client_id in WATCH_REGISTRY.get(keyword, ()):
+        await share_watch_op({"op": "unwatch", "client_id": client_id, "keyword": keyword})
+        print(f"[Unwatch] Client {client_id} stopped watching: {keyword}")
     return {"status": "success"}
 
 class SyncWatchRequest(BaseModel):
@@ -410,18 +938,8 @@ async def sync_watch(request: Request, data: SyncWatchRequest):
     client_id = data.client_id
     keywords = data.keywords
     
-    # 1. Remove this client from all existing watches
-    for kw in list(WATCH_REGISTRY.keys()):
-        if client_id in WATCH_REGISTRY[kw]:
-            WATCH_REGISTRY[kw].remove(client_id)
-            if not WATCH_REGISTRY[kw]:
-                del WATCH_REGISTRY[kw]
-    
-    # 2. Add the client back to ONLY the requested keywords
-    for kw in keywords:
-        if kw not in WATCH_REGISTRY:
-            WATCH_REGISTRY[kw] = set()
-        WATCH_REGISTRY[kw].add(client_id)
+    # Drop keywords no longer requested and add the new ones (via the client -> keywords index)
+    await share_watch_op({"op": "sync", "client_id": client_id, "keywords": keywords})
     
     print(f"[Sync] Client {client_id} synced {len(keywords)} keywords: {keywords}")
     return {"status": "success", "count": len(keywords)}
@@ -0,0 +1,226 @@
+import bisect
+import time
+
+from profiling import PROFILER
+
+# ==============================================================================
+# METRICS (PROMETHEUS TEXT FORMAT)
+# ==============================================================================
+# Counters, gauges and histograms kept as plain numbers in dicts keyed by label
+# values, and rendered in the Prometheus text exposition format (0.0.4) by
+# /metrics. Recording is a dict lookup and an add (histograms find their
+# bucket with bisect), so it can sit on the hot paths. Numbers other modules
+# already keep (cache hits, SSE queues, poller lag) aren't mirrored here: the
+# /metrics handler copies them into gauges at scrape time.
+#
+# Everything runs on the event loop thread, except extraction times, which are
+# measured in the worker and recorded when the job returns to the loop.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RENDER_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    """One metric family. Values are keyed by the tuple of label values, in `labels` order."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.values = {}
+
+    def _label_text(self, key: tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def clear(self):
+        self.values.clear()
+
+    def samples(self):
+        for key, value in self.values.items():
+            yield f"{self.name}{self._label_text(key)} {_number(value)}"
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1.0):
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def set(self, value: float, *labels):
+        """For running totals kept elsewhere (e.g. TTLCache.hits), copied in at scrape time."""
+        self.values[labels] = value
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, *labels):
+        self.values[labels] = value
+
+
+class Histogram(Metric):
+    """
+    Cumulative-bucket histogram. Each label set keeps per-bucket counts (the
+    last one is +Inf) plus the sum; the cumulative counts are only built when
+    rendering.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels):
+        state = self.values.get(labels)
+        if state is None:
+            state = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def time(self, *labels) -> "Timer":
+        return Timer(self, labels)
+
+    def samples(self):
+        for key, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                yield f"{self.name}_bucket{self._label_text(key, le)} {cumulative}"
+            yield f"{self.name}_sum{self._label_text(key)} {_number(total)}"
+            yield f"{self.name}_count{self._label_text(key)} {cumulative}"
+
+
+class Timer:
+    """`with HISTOGRAM.time("label"):` observes the block's wall time."""
+
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labels=()) -> Counter:
+        return self.register(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels=()) -> Gauge:
+        return self.register(Gauge(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+# -- Hot Paths (recorded where the work happens) --
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time to handle a request (SSE streams excluded).",
+    ("method", "route", "status"))
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "Requests being handled.")
+NAVER_API_SECONDS = REGISTRY.histogram(
+    "naver_api_request_seconds", "Naver search API attempts by outcome (HTTP status or error type).", ("status",))
+ARTICLE_DOWNLOAD_SECONDS = REGISTRY.histogram(
+    "article_download_seconds", "Article page downloads by outcome (HTTP status or error type).", ("status",))
+ARTICLE_PARSE_SECONDS = REGISTRY.histogram(
+    "article_parse_seconds", "Article body extraction time in the worker.", ("executor",))
+TEMPLATE_RENDER_SECONDS = REGISTRY.histogram(
+    "template_render_seconds", "Jinja template renders (fragment cache misses).", ("template",), RENDER_BUCKETS)
+POLL_SECONDS = REGISTRY.histogram(
+    "poll_duration_seconds", "One scheduled poll (a batch of watched queries) by outcome.", ("outcome",))
+
+# -- Scrape-Time Copies --
+SEARCH_CACHE_LOOKUPS = REGISTRY.counter("search_cache_lookups_total", "Search cache lookups.", ("result",))
+SEARCH_CACHE_HIT_RATIO = REGISTRY.gauge("search_cache_hit_ratio", "Search cache hits / lookups since start.")
+SEARCH_CACHE_ENTRIES = REGISTRY.gauge("search_cache_entries", "Pages in the search cache.")
+SEARCH_CACHE_BYTES = REGISTRY.gauge("search_cache_bytes", "Approximate size of the search cache.")
+POLL_CYCLE_LAG = REGISTRY.gauge("poll_cycle_lag_seconds", "How late the most overdue poll was at the last tick.")
+POLL_MAX_LAG = REGISTRY.gauge("poll_cycle_max_lag_seconds", "Worst poll lag since start.")
+POLLS_THROTTLED = REGISTRY.counter("poll_throttled_total", "Polls held back by the quota bucket.")
+POLL_BATCHES = REGISTRY.gauge("poll_batches", "Upstream calls per polling cycle (packed batches).")
+WATCHED_KEYWORDS = REGISTRY.gauge("watched_keywords", "Keywords watched by at least one client.")
+SSE_CONNECTIONS = REGISTRY.gauge("sse_connections", "Open SSE notification streams on this worker.")
+SSE_QUEUED_EVENTS = REGISTRY.gauge("sse_queued_events", "Events waiting in SSE client queues, all streams together.")
+SSE_QUEUE_DEPTH_MAX = REGISTRY.gauge("sse_queue_depth_max", "Deepest SSE client queue (the slowest reader).")
+SSE_DROPPED = REGISTRY.counter("sse_events_dropped_total", "Events dropped from full SSE queues (open streams).")
+LOOP_LAG = REGISTRY.gauge("event_loop_lag_seconds", "Event loop wake-up lag over the recent window.", ("quantile",))
+
+
+class RequestMetricsMiddleware:
+    """
+    Times every HTTP request by route template (the path pattern, so label
+    values stay bounded) and tells the profiler when requests are in flight.
+    SSE streams stop counting once their response starts: they stay open for
+    the whole session and would otherwise keep the profiler sampling.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = {"status": 500, "stream": False}
+        PROFILER.request_started()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                state["stream"] = any(name == b"content-type" and value.startswith(b"text/event-stream")
+                                      for name, value in message.get("headers", ()))
+                if state["stream"]:
+                    PROFILER.request_finished()
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not state["stream"]:
+                PROFILER.request_finished()
+                route = getattr(scope.get("route"), "path", "unmatched")
+                HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, scope["method"], route,
+                                             str(state["status"]))
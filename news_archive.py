@@ -0,0 +1,242 @@
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from scraper import NewsItem, NEWS_ITEM_FIELDS
+
+# ==============================================================================
+# LOCAL NEWS ARCHIVE (SQLite FTS5)
+# ==============================================================================
+# Every NewsItem the app sees from the Naver API is kept here, deduplicated by
+# link, with a full-text index over title and description. Historical searches
+# (and pages deeper than Naver lets us go) are answered locally; upstream is only
+# asked for the freshest window of a query.
+#
+# Writes are buffered and flushed in one transaction per batch, either when the
+# buffer fills up or every ARCHIVE_FLUSH_INTERVAL seconds. The same transaction
+# prunes the archive down to its retention limits, so the file stops growing once
+# it holds ARCHIVE_MAX_AGE_DAYS worth of archived news (or ARCHIVE_MAX_ROWS items).
+
+NEWS_ARCHIVE_PATH = os.getenv(
+    "NEWS_ARCHIVE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "news_archive.sqlite3"),
+)
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "200"))
+ARCHIVE_FLUSH_INTERVAL = float(os.getenv("ARCHIVE_FLUSH_INTERVAL", "5"))
+# An archive search re-fetches the newest upstream page when the query was last synced longer ago than this
+ARCHIVE_FRESH_WINDOW = float(os.getenv("ARCHIVE_FRESH_WINDOW", "60"))
+# Retention (0 disables a limit): items archived longer ago than this are dropped ...
+ARCHIVE_MAX_AGE_DAYS = float(os.getenv("ARCHIVE_MAX_AGE_DAYS", "90"))
+# ... and beyond this many items the earliest archived ones go first
+ARCHIVE_MAX_ROWS = int(os.getenv("ARCHIVE_MAX_ROWS", "1000000"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    id                INTEGER PRIMARY KEY,
+    link              TEXT NOT NULL UNIQUE,
+    title             TEXT NOT NULL,
+    description       TEXT NOT NULL,
+    originallink      TEXT NOT NULL,
+    source            TEXT NOT NULL,
+    pubDate           TEXT NOT NULL,
+    domain            TEXT NOT NULL,
+    formatted_pubdate TEXT NOT NULL,
+    published_at      REAL NOT NULL,
+    archived_at       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS news_published_at ON news (published_at DESC);
+CREATE INDEX IF NOT EXISTS news_archived_at ON news (archived_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+    title, description, content='news', content_rowid='id', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS news_fts_insert AFTER INSERT ON news BEGIN
+    INSERT INTO news_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS news_fts_delete AFTER DELETE ON news BEGIN
+    INSERT INTO news_fts (news_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+END;
+"""
+
+
+# A "quoted phrase" or a single word of an upstream query
+QUERY_TERM = re.compile(r'"([^"]+)"|(\S+)')
+
+
+def fts_query(text: str) -> str:
+    """
+    Turns a search phrase into an FTS5 query: every word (or "quoted phrase")
+    must appear, its last token as a prefix. Korean attaches particles to words
+    ('삼성전자가'), so a prefix match is what makes '삼성전자' find it.
+    """
+    terms = [(m.group(1) or m.group(2)).replace('"', '""') for m in QUERY_TERM.finditer(text)]
+    return " AND ".join(f'"{term}"*' for term in terms if term.strip())
+
+
+class NewsArchive:
+    def __init__(self, path: str = NEWS_ARCHIVE_PATH, batch_size: int = ARCHIVE_BATCH_SIZE,
+                 flush_interval: float = ARCHIVE_FLUSH_INTERVAL, fresh_window: float = ARCHIVE_FRESH_WINDOW,
+                 max_age_days: float = ARCHIVE_MAX_AGE_DAYS, max_rows: int = ARCHIVE_MAX_ROWS):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fresh_window = fresh_window
+        self.max_age_days = max_age_days
+        self.max_rows = max_rows
+        self.pending = {}   # link -> NewsItem, waiting for the next flush
+        self.synced = {}    # base query -> time its newest upstream page was archived
+        self._conn = None
+        self._lock = threading.Lock()
+        self._task = None
+        self.written = 0
+        self.duplicates = 0
+        self.pruned = 0
+        self.searches = 0
+
+    # -- SQLite (runs in worker threads) --
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _prune(self, conn, now: float) -> int:
+        """Deletes what falls outside the retention limits (the FTS trigger drops the index rows)."""
+        deleted = 0
+        if self.max_age_days > 0:
+            deleted += conn.execute("DELETE FROM news WHERE archived_at < ?",
+                                    (now - self.max_age_days * 86400,)).rowcount
+        if self.max_rows > 0:
+            # ids grow with archiving order and have gaps after deletes, so this keeps at most max_rows
+            deleted += conn.execute("DELETE FROM news WHERE id <= (SELECT MAX(id) FROM news) - ?",
+                                    (self.max_rows,)).rowcount
+        return deleted
+
+    def _write_batch(self, items: list):
+        now = time.time()
+        rows = [
+            tuple(getattr(item, field) for field in NEWS_ITEM_FIELDS) + (item.published_at or now, now)
+            for item in items
+        ]
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                cursor = conn.executemany(
+                    f"INSERT INTO news ({', '.join(NEWS_ITEM_FIELDS)}, published_at, archived_at) "
+                    f"VALUES ({', '.join('?' * (len(NEWS_ITEM_FIELDS) + 2))}) ON CONFLICT(link) DO NOTHING",
+                    rows,
+                )
+                # rowcount skips rows ignored by ON CONFLICT (and the FTS trigger writes)
+                inserted = cursor.rowcount
+                pruned = self._prune(conn, now)
+            return inserted, pruned
+
+    def _search(self, text: str, limit: int, offset: int):
+        match = fts_query(text)
+        if not match:
+            return []
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT {', '.join('n.' + f for f in NEWS_ITEM_FIELDS)}, n.published_at FROM news_fts "
+                "JOIN news n ON n.id = news_fts.rowid WHERE news_fts MATCH ? "
+                "ORDER BY n.published_at DESC LIMIT ? OFFSET ?",
+                (match, limit, offset),
+            ).fetchall()
+        return [NewsItem(*row) for row in rows]
+
+    def _count(self):
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM news").fetchone()[0]
+
+    # -- Writes --
+
+    def add(self, items):
+        """Queues items for the archive. A full buffer is flushed in the background."""
+        for item in items:
+            if item.link:
+                self.pending[item.link] = item
+        if len(self.pending) >= self.batch_size:
+            asyncio.ensure_future(self.flush())
+
+    async def flush(self):
+        if not self.pending:
+            return
+        batch = list(self.pending.values())
+        self.pending.clear()
+        try:
+            inserted, pruned = await asyncio.to_thread(self._write_batch, batch)
+        except sqlite3.Error as e:
+            print(f"[Archive Error] flush of {len(batch)} item(s): {e}")
+            return
+        self.written += inserted
+        self.duplicates += len(batch) - inserted
+        self.pruned += pruned
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # -- Reads --
+
+    def mark_synced(self, base: str):
+        self.synced[base] = time.time()
+
+    def is_fresh(self, base: str) -> bool:
+        return time.time() - self.synced.get(base, 0) < self.fresh_window
+
+    async def search(self, query, limit: int = 20, offset: int = 0) -> list:
+        """
+        Newest-first archived items for a CompiledQuery. The FTS index narrows by
+        the base query; the +/- filters are applied here, so offsets count
+        filtered results.
+        """
+        self.searches += 1
+        await self.flush()
+        if not query.has_filters:
+            return await asyncio.to_thread(self._search, query.base, limit, offset)
+
+        wanted = offset + limit
+        matched, scan_offset, chunk = [], 0, max(200, wanted * 2)
+        while len(matched) < wanted:
+            rows = await asyncio.to_thread(self._search, query.base, chunk, scan_offset)
+            matched.extend(query.apply(rows))
+            if len(rows) < chunk:
+                break
+            scan_offset += chunk
+        return matched[offset:wanted]
+
+    async def stats(self) -> dict:
+        return {
+            "items": await asyncio.to_thread(self._count),
+            "pending": len(self.pending),
+            "written": self.written,
+            "duplicates": self.duplicates,
+            "pruned": self.pruned,
+            "searches": self.searches,
+            "synced_queries": len(self.synced),
+        }
+
+
+NEWS_ARCHIVE = NewsArchive()
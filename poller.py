@@ -0,0 +1,217 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from metrics import POLL_SECONDS
+
+# ==============================================================================
+# ADAPTIVE POLLING SCHEDULER
+# ==============================================================================
+# Polls many watched keys concurrently instead of one after another:
+#   - a semaphore bounds how many upstream calls run at once
+#   - a token bucket keeps polling inside the Naver daily API quota
+#   - each key has its own interval that shrinks when it keeps producing new
+#     articles and backs off while it stays quiet
+
+# -- Scheduler Configuration --
+POLL_BASE_INTERVAL = float(os.getenv("POLL_BASE_INTERVAL", "30"))
+POLL_MIN_INTERVAL = float(os.getenv("POLL_MIN_INTERVAL", "10"))
+POLL_MAX_INTERVAL = float(os.getenv("POLL_MAX_INTERVAL", "300"))
+POLL_CONCURRENCY = int(os.getenv("POLL_CONCURRENCY", "8"))
+POLL_TICK = float(os.getenv("POLL_TICK", "1"))
+
+# Naver search API allows 25,000 calls/day per application; keep a share for interactive searches.
+NAVER_DAILY_QUOTA = int(os.getenv("NAVER_DAILY_QUOTA", "25000"))
+POLL_QUOTA_SHARE = float(os.getenv("POLL_QUOTA_SHARE", "0.8"))
+
+KST = timezone(timedelta(hours=9))  # Naver quota resets at midnight KST
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens/sec up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, n: float = 1) -> bool:
+        self._refill()
+        if self.tokens >= n:
+            self.tokens -= n
+            return True
+        return False
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+
+class KeySchedule:
+    """Per-key polling state."""
+
+    __slots__ = ("interval", "next_due", "in_flight", "polls", "hits", "last_new_at")
+
+    def __init__(self, interval: float, now: float):
+        self.interval = interval
+        self.next_due = now
+        self.in_flight = False
+        self.polls = 0
+        self.hits = 0
+        self.last_new_at = None
+
+
+class PollScheduler:
+    """
+    Drives `poll_fn(key) -> bool` for every key returned by `keys_fn()`.
+    `poll_fn` returns True when the poll found new articles, which halves
+    that key's interval; a quiet poll stretches it by `backoff`.
+    Dispatching pauses while `ready_fn()` is False (e.g. the upstream circuit is open).
+    """
+
+    def __init__(self, poll_fn, keys_fn, base_interval: float = POLL_BASE_INTERVAL,
+                 min_interval: float = POLL_MIN_INTERVAL, max_interval: float = POLL_MAX_INTERVAL,
+                 concurrency: int = POLL_CONCURRENCY, daily_quota: int = NAVER_DAILY_QUOTA,
+                 quota_share: float = POLL_QUOTA_SHARE, backoff: float = 1.5, ready_fn=None):
+        self.poll_fn = poll_fn
+        self.keys_fn = keys_fn
+        self.ready_fn = ready_fn
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.concurrency = concurrency
+
+        self.daily_budget = int(daily_quota * quota_share)
+        # Refill at the sustained daily rate; allow roughly one minute of burst.
+        rate = self.daily_budget / 86400
+        self.bucket = TokenBucket(rate=rate, capacity=max(concurrency, rate * 60))
+
+        self.schedules = {}
+        self.quota_day = None
+        self.quota_spent_today = 0
+        self.quota_spent_total = 0
+        self.throttled = 0
+        self.paused_ticks = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.last_cycle_at = None
+        # Cleared on workers that don't hold the poller lease (see shared_state)
+        self.enabled = True
+
+    # -- Quota Accounting --
+
+    def _charge_quota(self):
+        today = datetime.now(KST).date()
+        if today != self.quota_day:
+            self.quota_day = today
+            self.quota_spent_today = 0
+        self.quota_spent_today += 1
+        self.quota_spent_total += 1
+
+    # -- Scheduling --
+
+    def _sync_keys(self, now: float):
+        keys = set(self.keys_fn())
+        for key in keys - self.schedules.keys():
+            self.schedules[key] = KeySchedule(self.base_interval, now)
+        for key in self.schedules.keys() - keys:
+            if not self.schedules[key].in_flight:
+                del self.schedules[key]
+        return keys
+
+    def _adapt(self, sched: KeySchedule, found_new: bool, now: float):
+        if found_new:
+            sched.hits += 1
+            sched.last_new_at = now
+            sched.interval = max(self.min_interval, sched.interval / 2)
+        else:
+            sched.interval = min(self.max_interval, sched.interval * self.backoff)
+
+    async def _run_one(self, key, sched: KeySchedule):
+        try:
+            async with self.semaphore:
+                started = time.perf_counter()
+                try:
+                    found_new = await self.poll_fn(key)
+                except Exception:
+                    POLL_SECONDS.observe(time.perf_counter() - started, "error")
+                    raise
+                POLL_SECONDS.observe(time.perf_counter() - started, "new" if found_new else "quiet")
+            self._adapt(sched, bool(found_new), time.monotonic())
+        except Exception as e:
+            print(f"[Polling Error] {key}: {e}")
+        finally:
+            sched.polls += 1
+            sched.in_flight = False
+            sched.next_due = time.monotonic() + sched.interval
+
+    def tick(self):
+        """Dispatches every due key that the quota allows. Returns the number dispatched."""
+        now = time.monotonic()
+        active = self._sync_keys(now)
+        # Ordered by due time only: keys (e.g. poll batches) needn't be comparable
+        due = sorted(
+            ((s.next_due, key) for key, s in self.schedules.items()
+             if key in active and not s.in_flight and s.next_due <= now),
+            key=lambda entry: entry[0],
+        )
+
+        dispatched = 0
+        lag = 0.0
+        for next_due, key in due:
+            if not self.bucket.try_acquire():
+                self.throttled += len(due) - dispatched
+                break
+            sched = self.schedules[key]
+            sched.in_flight = True
+            self._charge_quota()
+            lag = max(lag, now - next_due)
+            asyncio.create_task(self._run_one(key, sched))
+            dispatched += 1
+
+        # Lag = how late the most overdue key is (including keys still waiting on quota)
+        if due:
+            lag = max(lag, now - due[0][0])
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.last_cycle_at = time.time()
+        return dispatched
+
+    async def run(self):
+        print(f"[Polling] Scheduler started (base={self.base_interval}s, concurrency={self.concurrency}, "
+              f"budget={self.daily_budget}/day)")
+        while True:
+            try:
+                if self.enabled and self.ready_fn is not None and not self.ready_fn():
+                    self.paused_ticks += 1
+                elif self.enabled:
+                    self.tick()
+            except Exception as e:
+                print(f"[Polling Error] {e}")
+            await asyncio.sleep(POLL_TICK)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "keys": len(self.schedules),
+            "in_flight": sum(1 for s in self.schedules.values() if s.in_flight),
+            "cycle_lag_seconds": round(self.last_lag, 3),
+            "max_lag_seconds": round(self.max_lag, 3),
+            "quota_spent_today": self.quota_spent_today,
+            "quota_spent_total": self.quota_spent_total,
+            "daily_budget": self.daily_budget,
+            "tokens_available": round(self.bucket.available(), 2),
+            "throttled": self.throttled,
+            "paused_ticks": self.paused_ticks,
+            "last_cycle_at": self.last_cycle_at,
+            "intervals": {str(k): round(s.interval, 1) for k, s in self.schedules.items()},
+        }
@@ -0,0 +1,127 @@
+import os
+import sys
+import threading
+import time
+
+# ==============================================================================
+# SAMPLING PROFILER (OPT-IN)
+# ==============================================================================
+# For finding regressions on a live worker without redeploying. While running,
+# a daemon thread wakes every PROFILER_INTERVAL seconds and records the event
+# loop thread's current Python stack (sys._current_frames) - but only while at
+# least one request is in flight, so idle time between requests doesn't
+# dilute the profile. Stacks are counted in the "folded" format
+# ('outer;inner;leaf count' per line) that flamegraph.pl and speedscope read.
+#
+# Off by default and free while off. Started for a bounded time through
+# POST /api/profiler/start, or at boot with PROFILER_ENABLED=true.
+
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+PROFILER_INTERVAL = float(os.getenv("PROFILER_INTERVAL", "0.005"))
+PROFILER_MAX_STACKS = int(os.getenv("PROFILER_MAX_STACKS", "5000"))
+PROFILER_MAX_DEPTH = 64
+TRUNCATED = "[other stacks]"
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = PROFILER_INTERVAL, max_stacks: int = PROFILER_MAX_STACKS):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.in_flight = 0          # maintained by the request middleware
+        self.stacks = {}            # folded stack -> samples
+        self.samples = 0
+        self.idle_samples = 0
+        self.started_at = None
+        self.deadline = None
+        self._target = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # -- Request Hooks --
+
+    def request_started(self):
+        self.in_flight += 1
+
+    def request_finished(self):
+        self.in_flight -= 1
+
+    # -- Control --
+
+    def start(self, seconds: float = None, interval: float = None):
+        """
+        Starts (or restarts) sampling the calling thread, which must be the event
+        loop thread. The previous profile is discarded. Stops after `seconds`.
+        """
+        self.stop()
+        if interval:
+            self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self.idle_samples = 0
+        self.started_at = time.time()
+        self.deadline = time.monotonic() + seconds if seconds else None
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        print(f"[Profiler] Sampling every {self.interval * 1000:.1f}ms"
+              + (f" for {seconds:g}s" if seconds else ""))
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                print(f"[Profiler] Done: {self.samples} samples")
+                return
+            if self.in_flight <= 0:
+                self.idle_samples += 1
+                continue
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                return
+            self._record(frame)
+
+    def _record(self, frame):
+        labels = []
+        while frame is not None and len(labels) < PROFILER_MAX_DEPTH:
+            labels.append(frame_label(frame))
+            frame = frame.f_back
+        stack = ";".join(reversed(labels))
+        if stack not in self.stacks and len(self.stacks) >= self.max_stacks:
+            stack = TRUNCATED
+        self.stacks[stack] = self.stacks.get(stack, 0) + 1
+        self.samples += 1
+
+    # -- Results --
+
+    def folded(self) -> str:
+        """The profile so far, busiest stacks first."""
+        ordered = sorted(self.stacks.items(), key=lambda entry: -entry[1])
+        return "".join(f"{stack} {count}\n" for stack, count in ordered)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "interval_ms": round(self.interval * 1000, 2),
+            "started_at": self.started_at,
+            "samples": self.samples,
+            "idle_samples": self.idle_samples,
+            "stacks": len(self.stacks),
+        }
+
+
+PROFILER = SamplingProfiler()
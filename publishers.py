@@ -0,0 +1,174 @@
+import json
+import os
+from urllib.parse import urlsplit
+
+# ==============================================================================
+# PUBLISHER RESOLUTION
+# ==============================================================================
+# Maps the host of an article's original link to the outlet's name. Hosts match
+# on their longest registered suffix, label by label: m.hankyung.com and
+# news.hankyung.com resolve through hankyung.com, while sports.khan.co.kr keeps
+# its own entry over khan.co.kr (and ahankyung.com matches nothing). The table
+# is compiled into a trie keyed on reversed labels (com -> hankyung -> m), so a
+# lookup costs one dict probe per label. A feed carries a few hundred distinct
+# hosts at most, so results are memoized per netloc and the trie is only
+# walked the first time a host shows up.
+
+# Extra domain -> outlet mappings (a JSON object), merged over DOMAIN_MAP at startup
+PUBLISHER_DOMAINS_FILE = os.getenv(
+    "PUBLISHER_DOMAINS_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "publisher_domains.json"),
+)
+# Distinct netlocs remembered; the memo is simply reset when it fills up
+PUBLISHER_MEMO_SIZE = int(os.getenv("PUBLISHER_MEMO_SIZE", "8192"))
+
+# -- Domain Mapping --
+DOMAIN_MAP = {
+    "joongang.joins.com": "중앙일보", "hani.co.kr": "한겨레", "yna.co.kr": "연합뉴스",
+    "chosun.com": "조선일보", "donga.com": "동아일보", "mediatoday.co.kr": "미디어오늘",
+    "journalist.or.kr": "기자협회보", "hankookilbo.com": "한국일보", "mbn.mk.co.kr": "MBN",
+    "newscj.com": "천지일보", "news.jtbc.co.kr": "JTBC", "mediaus.co.kr": "미디어스",
+    "dailian.co.kr": "데일리안", "view.asiae.co.kr": "아시아경제", "newspim.com": "뉴스핌",
+    "news1.kr": "뉴스1", "asiatoday.co.kr": "아시아투데이", "news.tvchosun.com": "TV조선",
+    "digitaltoday.co.kr": "디지털투데이", "biz.chosun.com": "조선비즈", "newsis.com": "뉴시스",
+    "biz.heraldcorp.com": "헤럴드경제", "etoday.co.kr": "이투데이", "ichannela.com": "채널A",
+    "news.kbs.co.kr": "KBS", "kukinews.com": "쿠키뉴스", "yonhapnewstv.co.kr": "연합뉴스TV",
+    "segye.com": "세계일보", "munhwa.com": "문화일보", "joongang.co.kr": "중앙일보",
+    "ytn.co.kr": "YTN", "seoul.co.kr": "서울신문", "sedaily.com": "서울경제",
+    "fnnews.com": "파이낸셜뉴스", "news.tf.co.kr": "더팩트", "news.sbs.co.kr": "SBS",
+    "etnews.com": "전자신문", "sisajournal-e.com": "시사저널e", "zdnet.co.kr": "지디넷코리아",
+    "mk.co.kr": "매일경제", "biz.sbs.co.kr": "SBSBiz", "weekly.chosun.com": "주간조선",
+    "kmib.co.kr": "국민일보", "mt.co.kr": "머니투데이", "khan.co.kr": "경향신문", "inews24.com": "아이뉴스24",
+    "it.chosun.com": "IT조선", "edaily.co.kr": "이데일리", "newstapa.org": "뉴스타파", "busan.com": "부산일보",
+    "hankyung.com": "한국경제", "dt.co.kr": "디지털타임스", "pdjournal.com": "PD저널", "sisajournal.com": "시사저널",
+    "nownews.seoul.co.kr": "서울신문", "kado.net": "강원도민일보", "imaeil.com": "매일신문", "sports.khan.co.kr": "스포츠경향",
+    "pressian.com": "프레시안", "imnews.imbc.com": "MBC", "nocutnews.co.kr": "노컷뉴스", "ddaily.co.kr": "디지털데일리",
+    "news.naver.com": "네이버", "news.daum.net": "다음", "sports.chosun.com": "스포츠조선",
+    "sports.seoul.co.kr": "스포츠서울", "sports.donga.com": "스포츠동아", "sports.kbs.co.kr": "KBS",
+    "sports.sbs.co.kr": "SBS 스포츠", "sports.mk.co.kr": "매일경제 스포츠", "news.kmib.co.kr": "국민일보",
+    "news.heraldcorp.com": "헤럴드경제", "news.khan.co.kr": "경향신문", "news.hankyung.com": "한국경제",
+    "news.imaeil.com": "매일신문", "news.busan.com": "부산일보", "news.joins.com": "중앙일보",
+    "news.mt.co.kr": "머니투데이", "news.edaily.co.kr": "이데일리", "news.unn.net": "한국대학신문",
+    "news.kukinews.com": "쿠키뉴스", "news.ajunews.com": "아주경제", "news.wowtv.co.kr": "한국경제TV",
+    "news.g-enews.com": "글로벌이코노믹", "news.mtn.co.kr": "머니투데이방송", "news.ebs.co.kr": "EBS",
+    "news.mbc.co.kr": "MBC", "newstomato.com": "뉴스토마토", "naeil.com": "내일신문", "insight.co.kr": "인사이트",
+    "radio.ytn.co.kr": "YTN", "thebell.co.kr": "더벨", "wowtv.co.kr": "한국경제TV", "daejoilbo.com": "대전일보",
+    "kyeongin.com": "경인일보", "kyeonggi.com": "경기일보", "kyeongbuk.co.kr": "경북일보", "kyongnam.com": "경남신문",
+    "jnilbo.com": "전북일보", "jnnews.co.kr": "전남일보", "newdaily.co.kr": "뉴데일리", "ohmynews.com": "오마이뉴스",
+    "bloter.net": "블로터", "moneys.co.kr": "머니S", "daily.hankooki.com": "데일리한국", "mbn.co.kr": "MBN",
+    "jibs.co.kr": "JIBS", "topstarnews.net": "톱스타뉴스", "kookje.co.kr": "국제신문"
+}
+
+# Sections that are outlets of their own, which the parent domain would otherwise claim
+DOMAIN_MAP.update({
+    "osen.mt.co.kr": "OSEN", "star.mt.co.kr": "스타뉴스", "tenasia.hankyung.com": "텐아시아",
+    "h21.hani.co.kr": "한겨레21", "weekly.khan.co.kr": "주간경향", "weekly.donga.com": "주간동아",
+    "shindonga.donga.com": "신동아", "science.ytn.co.kr": "YTN 사이언스",
+    "koreajoongangdaily.joins.com": "코리아중앙데일리",
+})
+
+
+def netloc_of(url: str) -> str:
+    """
+    Netloc of an absolute URL. Every originallink is a distinct URL, which misses
+    urlsplit's cache and costs several microseconds per item; plain string
+    splitting gets the same netloc for scheme://host/... URLs.
+    """
+    _, sep, rest = url.partition("://")
+    if not sep or "/" in _:
+        return urlsplit(url).netloc
+    for delimiter in "/?#":
+        rest = rest.partition(delimiter)[0]
+    return rest
+
+
+def host_of(netloc: str) -> str:
+    """Bare host of a netloc: no credentials, port, trailing dot or leading 'www.', lowercased."""
+    host = netloc.rpartition("@")[2]
+    if ":" in host and not host.endswith("]"):
+        host = host.rpartition(":")[0]
+    host = host.rstrip(".").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class DomainTrie:
+    """
+    Longest-suffix lookup over domain labels. Built once from a mapping and then
+    read-only: every node is a (value, children) tuple, children keyed by label.
+    """
+
+    def __init__(self, mapping: dict):
+        root = [None, {}]
+        for domain, value in mapping.items():
+            node = root
+            for label in reversed(host_of(domain).split(".")):
+                node = node[1].setdefault(label, [None, {}])
+            node[0] = value
+        self.root = self._compile(root)
+        self.size = len(mapping)
+
+    @classmethod
+    def _compile(cls, node):
+        return (node[0], {label: cls._compile(child) for label, child in node[1].items()})
+
+    def lookup(self, host: str):
+        """Value of the longest registered suffix of host (whole labels only), or None."""
+        best, children = self.root
+        for label in reversed(host.split(".")):
+            node = children.get(label)
+            if node is None:
+                break
+            value, children = node
+            if value is not None:
+                best = value
+        return best
+
+
+def load_domain_file(path: str) -> dict:
+    """Reads a JSON object of domain -> outlet name. A missing file is simply no extra mappings."""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[Publishers] Ignoring {path}: {e}")
+        return {}
+    if not isinstance(data, dict):
+        print(f"[Publishers] Ignoring {path}: expected a JSON object of domain -> name")
+        return {}
+    return {str(domain): str(name) for domain, name in data.items() if domain and name}
+
+
+class PublisherResolver:
+    """Resolves a netloc to (domain, outlet name), memoized per netloc."""
+
+    def __init__(self, mapping: dict, memo_size: int = PUBLISHER_MEMO_SIZE):
+        self.trie = DomainTrie(mapping)
+        self.memo_size = memo_size
+        self._memo = {}
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, netloc: str) -> tuple:
+        """
+        (domain, source) for a netloc, where domain is the bare host and source
+        is the outlet's name, or the host itself for unknown sites.
+        """
+        result = self._memo.get(netloc)
+        if result is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        host = host_of(netloc)
+        result = (host, self.trie.lookup(host) or host)
+        if len(self._memo) >= self.memo_size:
+            self._memo.clear()
+        self._memo[netloc] = result
+        return result
+
+    def stats(self) -> dict:
+        return {"domains": self.trie.size, "memoized": len(self._memo), "hits": self.hits, "misses": self.misses}
+
+
+PUBLISHERS = PublisherResolver({**DOMAIN_MAP, **load_domain_file(PUBLISHER_DOMAINS_FILE)})
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup, escape
+
+from cache import TTLCache
+from metrics import TEMPLATE_RENDER_SECONDS
+from filters import compile_query
+from scraper import parse_pub_date
+
+# ==============================================================================
+# TEMPLATE FILTERS & RENDERED FRAGMENT CACHE
+# ==============================================================================
+# The news card partial used to redo the same work on every render: a fresh
+# highlight regex per call and a pubDate parse per card. Highlight patterns are
+# now compiled once per keyword, times come from the item's parsed timestamp,
+# and whole rendered pages are cached. The one part of a page that goes stale,
+# the relative time ('5분 전'), is rendered as a slot and filled in per request.
+
+KST = timezone(timedelta(hours=9))
+TIME_SLOT = "\x00"
+
+FRAGMENT_CACHE_ENTRIES = int(os.getenv("FRAGMENT_CACHE_ENTRIES", "500"))
+FRAGMENT_CACHE_BYTES = int(os.getenv("FRAGMENT_CACHE_BYTES", str(32 * 1024 * 1024)))
+FRAGMENT_CACHE_TTL = float(os.getenv("FRAGMENT_CACHE_TTL", "600"))
+# Compiled templates are cached on disk, so new workers skip compiling them
+JINJA_CACHE_DIR = os.getenv("JINJA_CACHE_DIR")
+
+
+def time_ago(value, now: float = None):
+    """
+    Converts a timestamp, datetime or pubDate string into a 'human-readable' time difference.
+    e.g., 'Just now', '5 minutes ago', '2 hours ago'.
+    """
+    try:
+        if not value:
+            return ""
+
+        if isinstance(value, (int, float)):
+            ts = value
+        elif isinstance(value, datetime):
+            ts = value.timestamp()
+        elif isinstance(value, str):
+            ts = parse_pub_date(value)[0]
+            if not ts:
+                return value
+        else:
+            return value
+
+        seconds = (now or time.time()) - ts
+
+        if seconds < 60:
+            return "방금 전"
+        elif seconds < 3600:
+            return f"{int(seconds / 60)}분 전"
+        elif seconds < 86400:
+            return f"{int(seconds / 3600)}시간 전"
+        elif seconds < 604800: # 7 days
+            return f"{int(seconds / 86400)}일 전"
+        else:
+            return datetime.fromtimestamp(ts, KST).strftime("%Y-%m-%d")
+    except Exception as e:
+        print(f"[Filter Error] time_ago: {e}")
+        return value
+
+
+@lru_cache(maxsize=1024)
+def highlight_pattern(keyword: str):
+    """
+    One compiled pattern per keyword, covering the base query's words and the
+    +include terms ('-' terms never appear in results, so they're skipped).
+    Terms are matched against HTML-escaped text, so they're escaped the same way.
+    """
+    query = compile_query(keyword)
+    terms = {str(escape(term)) for term in query.base.replace('"', " ").split() + list(query.includes) if term}
+    if not terms:
+        return None
+    alternatives = sorted(terms, key=len, reverse=True)  # longest first: '삼성전자' before '삼성'
+    return re.compile("|".join(re.escape(term) for term in alternatives), re.IGNORECASE)
+
+
+def highlight_keyword(text, keyword):
+    """
+    Wraps occurrences of the keyword's search terms in the text with <mark> tags for highlighting.
+    Case-insensitive. The text itself is HTML-escaped.
+    """
+    try:
+        if not keyword or not text:
+            return text
+
+        pattern = highlight_pattern(keyword)
+        if pattern is None:
+            return text
+        return Markup(pattern.sub(r'<mark class="highlight">\g<0></mark>', str(escape(text))))
+    except Exception as e:
+        print(f"[Filter Error] highlight_keyword: {e}")
+        return text
+
+
+def relative_time_slot(item):
+    """Template filter: a placeholder for the card's relative time, filled in by RenderedFragment.render()."""
+    return Markup(f"{TIME_SLOT}{item.published_at or escape(item.pubDate)}{TIME_SLOT}")
+
+
+class RenderedFragment:
+    """Rendered HTML split around its relative-time slots."""
+
+    __slots__ = ("parts", "times", "digest")
+
+    def __init__(self, html: str):
+        pieces = html.split(TIME_SLOT)
+        self.parts = pieces[0::2]
+        self.times = [float(v) if v.replace(".", "", 1).isdigit() else v for v in pieces[1::2]]
+        self.digest = hashlib.blake2b(html.encode("utf-8"), digest_size=12).hexdigest()
+
+    def labels(self, now: float = None) -> list:
+        now = now or time.time()
+        memo = {}
+        for value in self.times:
+            if value not in memo:
+                memo[value] = time_ago(value, now)
+        return [memo[value] for value in self.times]
+
+    def render(self, labels: list = None) -> str:
+        labels = self.labels() if labels is None else labels
+        out = [self.parts[0]]
+        for label, part in zip(labels, self.parts[1:]):
+            out.append(label)
+            out.append(part)
+        return "".join(out)
+
+    def etag(self, labels: list) -> str:
+        """Changes when the cached HTML or any relative-time label changes."""
+        stamp = hashlib.blake2b("\x00".join(labels).encode("utf-8"), digest_size=6).hexdigest()
+        return f'W/"{self.digest}-{stamp}"'
+
+    def size(self) -> int:
+        return sum(len(part) for part in self.parts) * 2 + 64 * len(self.times)
+
+
+class FragmentCache:
+    """
+    Rendered templates keyed by what they depend on (e.g. keyword + item links).
+    A hit only fills in the relative times.
+    """
+
+    def __init__(self, env, max_entries: int = FRAGMENT_CACHE_ENTRIES, max_bytes: int = FRAGMENT_CACHE_BYTES,
+                 ttl: float = FRAGMENT_CACHE_TTL):
+        self.env = env
+        self.cache = TTLCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl,
+                              sizer=lambda fragment: fragment.size())
+
+    def get(self, name: str, key, context: dict) -> RenderedFragment:
+        fragment = self.cache.get((name, key))
+        if fragment is None:
+            with TEMPLATE_RENDER_SECONDS.time(name):
+                fragment = RenderedFragment(self.env.get_template(name).render(context))
+            self.cache[(name, key)] = fragment
+        return fragment
+
+    def render(self, name: str, key, context: dict) -> str:
+        return self.get(name, key, context).render()
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+def configure_environment(env):
+    """Registers the filters and the bytecode cache on a Jinja environment."""
+    env.filters["time_ago"] = time_ago
+    env.filters["highlight"] = highlight_keyword
+    env.filters["relative_time"] = relative_time_slot
+    env.bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR) if JINJA_CACHE_DIR else FileSystemBytecodeCache()
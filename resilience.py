@@ -0,0 +1,332 @@
+import asyncio
+import os
+import random
+import time
+from collections import deque
+
+import httpx
+
+# ==============================================================================
+# UPSTREAM RESILIENCE
+# ==============================================================================
+# Wraps Naver API calls so a slow or failing upstream degrades gracefully
+# instead of turning into empty result lists:
+#   - every call has a total time budget; each attempt gets what is left of it
+#   - transient failures (timeouts, connection errors, 5xx) are retried with
+#     full-jitter exponential backoff while the budget allows
+#   - interactive calls are hedged: when the first attempt is slower than the
+#     recent p90 latency a second one starts, and the first answer wins
+#   - a circuit breaker stops calling an upstream that keeps failing, and opens
+#     straight away on 429 (Naver's quota / rate limit), honouring Retry-After
+# Callers get an UpstreamError instead of [], so caches keep their last good
+# results and can serve them stale (see main.get_search_items).
+
+# -- Time Budgets (seconds, whole call including retries) --
+INTERACTIVE_BUDGET = float(os.getenv("UPSTREAM_INTERACTIVE_BUDGET", "4"))
+BACKGROUND_BUDGET = float(os.getenv("UPSTREAM_BACKGROUND_BUDGET", "15"))
+ATTEMPT_TIMEOUT = float(os.getenv("UPSTREAM_ATTEMPT_TIMEOUT", "3"))
+
+# -- Retries --
+MAX_ATTEMPTS = int(os.getenv("UPSTREAM_MAX_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(os.getenv("UPSTREAM_RETRY_BASE_DELAY", "0.2"))
+RETRY_MAX_DELAY = float(os.getenv("UPSTREAM_RETRY_MAX_DELAY", "2"))
+
+# -- Hedging (interactive calls only; every hedge costs one extra API call) --
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", "1"))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.25"))
+HEDGE_QUANTILE = float(os.getenv("HEDGE_QUANTILE", "0.9"))
+HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", "0.1"))
+
+# -- Circuit Breaker --
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RECOVERY_TIME = float(os.getenv("BREAKER_RECOVERY_TIME", "30"))
+BREAKER_QUOTA_COOLDOWN = float(os.getenv("BREAKER_QUOTA_COOLDOWN", "60"))
+
+
+class UpstreamError(Exception):
+    """An upstream call failed. `retryable` failures may succeed when tried again."""
+
+    def __init__(self, message: str, status: int = None, retryable: bool = True, retry_after: float = None):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class QuotaExceeded(UpstreamError):
+    """HTTP 429: the API quota or rate limit is used up. Opens the circuit."""
+
+
+class CircuitOpen(UpstreamError):
+    """Rejected without calling upstream, because the circuit is open."""
+
+
+def _retry_after(response: httpx.Response):
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def as_upstream_error(exc: Exception) -> UpstreamError:
+    """Classifies an exception raised by an upstream request."""
+    if isinstance(exc, UpstreamError):
+        return exc
+    if isinstance(exc, (asyncio.TimeoutError, httpx.TimeoutException)):
+        return UpstreamError(f"timed out ({type(exc).__name__})")
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        if status == 429:
+            return QuotaExceeded(f"HTTP 429 {exc.response.text[:200]}", status=429, retryable=False,
+                                 retry_after=_retry_after(exc.response))
+        # 4xx other than 429 (bad keys, bad query) won't get better by retrying
+        return UpstreamError(f"HTTP {status}", status=status, retryable=status >= 500)
+    if isinstance(exc, httpx.TransportError):
+        return UpstreamError(f"{type(exc).__name__}: {exc}")
+    # A malformed body is worth another try; anything else is a bug or bad config (e.g. missing API keys)
+    return UpstreamError(f"{type(exc).__name__}: {exc}", retryable=isinstance(exc, ValueError))
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures (or one 429);
+    open -> half-open after the cooldown, letting a single probe call through;
+    the probe's outcome closes the circuit again or re-opens it.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 recovery_time: float = BREAKER_RECOVERY_TIME, quota_cooldown: float = BREAKER_QUOTA_COOLDOWN):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.quota_cooldown = quota_cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.open_until = 0.0
+        self.probe_in_flight = False
+        self.trips = 0
+        self.rejected = 0
+        self.last_error = None
+
+    def available(self) -> bool:
+        """True when a call would be let through (doesn't claim the half-open probe)."""
+        if self.state == self.OPEN:
+            return time.monotonic() >= self.open_until
+        return not (self.state == self.HALF_OPEN and self.probe_in_flight)
+
+    def retry_after(self) -> float:
+        return max(0.0, self.open_until - time.monotonic()) if self.state == self.OPEN else 0.0
+
+    def allow(self) -> bool:
+        """Claims permission for one call. Every allowed call must end in record()."""
+        if self.state == self.OPEN:
+            if time.monotonic() < self.open_until:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self.probe_in_flight = False
+        if self.state == self.HALF_OPEN:
+            if self.probe_in_flight:
+                self.rejected += 1
+                return False
+            self.probe_in_flight = True
+        return True
+
+    def record(self, error: UpstreamError = None):
+        """Outcome of an allowed call: None for success (or an answer that isn't the upstream's fault)."""
+        self.probe_in_flight = False
+        if error is None:
+            if self.state != self.CLOSED:
+                print(f"[Upstream] {self.name} circuit closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            return
+
+        self.last_error = str(error)
+        if isinstance(error, QuotaExceeded):
+            self._open(error.retry_after or self.quota_cooldown)
+            return
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._open(self.recovery_time)
+
+    def release(self):
+        """An allowed call was cancelled before it had an outcome."""
+        self.probe_in_flight = False
+
+    def _open(self, duration: float):
+        # Calls already in flight when the circuit opened only push the reopening time back
+        if self.state != self.OPEN:
+            self.trips += 1
+            print(f"[Upstream] {self.name} circuit open for {duration:.0f}s ({self.last_error})")
+        self.state = self.OPEN
+        self.open_until = max(self.open_until, time.monotonic() + duration)
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_after": round(self.retry_after(), 1),
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "last_error": self.last_error,
+        }
+
+
+class LatencyTracker:
+    """Recent successful attempt latencies, for picking the hedge delay."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.samples = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def quantile(self, q: float):
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Upstream:
+    """Resilience policy for one upstream service; `call()` runs a request under it."""
+
+    def __init__(self, name: str, breaker: CircuitBreaker = None, max_attempts: int = MAX_ATTEMPTS,
+                 attempt_timeout: float = ATTEMPT_TIMEOUT, retry_base_delay: float = RETRY_BASE_DELAY,
+                 retry_max_delay: float = RETRY_MAX_DELAY, hedge_quantile: float = HEDGE_QUANTILE,
+                 hedge_max_ratio: float = HEDGE_MAX_RATIO):
+        self.name = name
+        self.breaker = breaker or CircuitBreaker(name)
+        self.max_attempts = max_attempts
+        self.attempt_timeout = attempt_timeout
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.hedge_quantile = hedge_quantile
+        self.hedge_max_ratio = hedge_max_ratio
+        self.latency = LatencyTracker()
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failures = 0
+
+    # -- Single Attempt --
+
+    async def _attempt(self, fn, timeout: float):
+        self.attempts += 1
+        t0 = time.monotonic()
+        try:
+            result = await asyncio.wait_for(fn(), timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            raise as_upstream_error(e) from e
+        self.latency.add(time.monotonic() - t0)
+        return result
+
+    def hedge_delay(self) -> float:
+        observed = self.latency.quantile(self.hedge_quantile)
+        return HEDGE_DEFAULT_DELAY if observed is None else max(HEDGE_MIN_DELAY, observed)
+
+    async def _hedged(self, fn, timeout: float):
+        """Starts a second attempt if the first is still running after the hedge delay; first success wins."""
+        delay = self.hedge_delay()
+        first = asyncio.ensure_future(self._attempt(fn, timeout))
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            # Hedges cost API quota, so only a bounded share of calls may hedge
+            if done or delay >= timeout or self.hedges >= self.hedge_max_ratio * self.calls:
+                return await first
+            self.hedges += 1
+            second = asyncio.ensure_future(self._attempt(fn, timeout - delay))
+            tasks.add(second)
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    # -- Public API --
+
+    def available(self) -> bool:
+        return self.breaker.available()
+
+    async def call(self, fn, budget: float = BACKGROUND_BUDGET, hedge: bool = False):
+        """
+        Runs `fn()` (a coroutine factory, called once per attempt) within `budget`
+        seconds, retrying transient failures. Raises UpstreamError when it can't.
+        """
+        self.calls += 1
+        deadline = time.monotonic() + budget
+        error = None
+        for attempt in range(self.max_attempts):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if not self.breaker.allow():
+                error = CircuitOpen(f"{self.name} circuit open", retryable=False,
+                                    retry_after=self.breaker.retry_after())
+                break
+
+            timeout = min(remaining, self.attempt_timeout)
+            try:
+                result = await (self._hedged(fn, timeout) if hedge else self._attempt(fn, timeout))
+            except UpstreamError as e:
+                error = e
+                # Answers like 401/400 mean the upstream itself is fine
+                self.breaker.record(e if e.retryable or isinstance(e, QuotaExceeded) else None)
+                if not e.retryable:
+                    break
+            except BaseException:
+                self.breaker.release()
+                raise
+            else:
+                self.breaker.record(None)
+                return result
+
+            if attempt + 1 < self.max_attempts:
+                # Full jitter: spreads retries from many callers instead of syncing them up
+                delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+                if time.monotonic() + delay >= deadline:
+                    break
+                self.retries += 1
+                await asyncio.sleep(delay)
+
+        self.failures += 1
+        error = error or UpstreamError(f"{self.name}: time budget of {budget:.1f}s used up")
+        if not isinstance(error, CircuitOpen):
+            print(f"[Upstream] {self.name} call failed: {error}")
+        raise error
+
+    def stats(self) -> dict:
+        p50 = self.latency.quantile(0.5)
+        return {
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failures": self.failures,
+            "latency_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "hedge_delay_ms": round(self.hedge_delay() * 1000, 1),
+            "circuit": self.breaker.stats(),
+        }
+
+
+# The Naver Open API (search); shared by interactive searches, deep pages and the poller
+NAVER_UPSTREAM = Upstream("naver_api")
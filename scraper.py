@@ -2,57 +2,76 @@ import httpx
 import html
 import re
 import os
-from urllib.parse import urlparse
+import time
 from email.utils import parsedate_to_datetime
-from bs4 import BeautifulSoup
-from pydantic import BaseModel
-
-# -- Domain Mapping --
-DOMAIN_MAP = {
-    "joongang.joins.com": "중앙일보", "hani.co.kr": "한겨레", "yna.co.kr": "연합뉴스",
-    "chosun.com": "조선일보", "donga.com": "동아일보", "mediatoday.co.kr": "미디어오늘",
-    "journalist.or.kr": "기자협회보", "hankookilbo.com": "한국일보", "mbn.mk.co.kr": "MBN",
-    "newscj.com": "천지일보", "news.jtbc.co.kr": "JTBC", "mediaus.co.kr": "미디어스",
-    "dailian.co.kr": "데일리안", "view.asiae.co.kr": "아시아경제", "newspim.com": "뉴스핌",
-    "news1.kr": "뉴스1", "asiatoday.co.kr": "아시아경제", "news.tvchosun.com": "TV조선",
-    "digitaltoday.co.kr": "디지털투데이", "biz.chosun.com": "조선비즈", "newsis.com": "뉴시스",
-    "biz.heraldcorp.com": "헤럴드경제", "etoday.co.kr": "이투데이", "ichannela.com": "채널A",
-    "news.kbs.co.kr": "KBS", "kukinews.com": "쿠키뉴스", "yonhapnewstv.co.kr": "연합뉴스TV",
-    "segye.com": "세계일보", "munhwa.com": "문화일보", "joongang.co.kr": "중앙일보",
-    "ytn.co.kr": "YTN", "seoul.co.kr": "서울신문", "sedaily.com": "서울경제",
-    "fnnews.com": "파이낸셜뉴스", "news.tf.co.kr": "더팩트", "news.sbs.co.kr": "SBS",
-    "etnews.com": "전자신문", "sisajournal-e.com": "시사저널e", "zdnet.co.kr": "지디넷코리아",
-    "mk.co.kr": "매일경제", "biz.sbs.co.kr": "SBSBiz", "weekly.chosun.com": "주간조선",
-    "kmib.co.kr": "국민일보", "mt.co.kr": "머니투데이", "khan.co.kr": "경향신문", "inews24.com": "아이뉴스24",
-    "it.chosun.com": "IT조선", "edaily.co.kr": "이데일리", "newstapa.org": "뉴스타파", "busan.com": "부산일보",
-    "hankyung.com": "한국경제", "dt.co.kr": "디지털타임스", "pdjournal.com": "PD저널", "sisajournal.com": "시사저널",
-    "nownews.seoul.co.kr": "서울신문", "kado.net": "강원도민일보", "imaeil.com": "매일신문", "sports.khan.co.kr": "스포츠경향",
-    "pressian.com": "프레시안", "imnews.imbc.com": "MBC", "nocutnews.co.kr": "노컷뉴스", "ddaily.co.kr": "디지털데일리",
-    "news.naver.com": "네이버", "news.daum.net": "다음", "sports.chosun.com": "스포츠조선",
-    "sports.seoul.co.kr": "스포츠서울", "sports.donga.com": "스포츠동아", "sports.kbs.co.kr": "KBS",
-    "sports.sbs.co.kr": "SBS 스포츠", "sports.mk.co.kr": "매일경제 스포츠", "news.kmib.co.kr": "국민일보",
-    "news.heraldcorp.com": "헤럴드경제", "news.khan.co.kr": "경향신문", "news.hankyung.com": "한국경제",
-    "news.imaeil.com": "매일신문", "news.busan.com": "부산일보", "news.joins.com": "중앙일보",
-    "news.mt.co.kr": "머니투데이", "news.edaily.co.kr": "이데일리", "news.unn.net": "한국대학신문",
-    "news.kukinews.com": "쿠키뉴스", "news.ajunews.com": "아주경제", "news.wowtv.co.kr": "한국경제TV",
-    "news.g-enews.com": "글로벌이코노믹", "news.mtn.co.kr": "머니투데이방송", "news.ebs.co.kr": "EBS",
-    "news.mbc.co.kr": "MBC", "newstomato.com": "뉴스토마토", "naeil.com": "내일신문", "insight.co.kr": "인사이트",
-    "radio.ytn.co.kr": "YTN", "thebell.co.kr": "더벨", "wowtv.co.kr": "한국경제TV", "daejoilbo.com": "대전일보",
-    "kyeongin.com": "경인일보", "kyeonggi.com": "경기일보", "kyeongbuk.co.kr": "경북일보", "kyongnam.com": "경남신문",
-    "jnilbo.com": "전북일보", "jnnews.co.kr": "전남일보", "newdaily.co.kr": "뉴데일리", "ohmynews.com": "오마이뉴스",
-    "bloter.net": "블로터", "moneys.co.kr": "머니S", "daily.hankooki.com": "데일리한국", "mbn.co.kr": "MBN",
-    "jibs.co.kr": "JIBS", "topstarnews.net": "톱스타뉴스", "kookje.co.kr": "국제신문"
-}
-
-class NewsItem(BaseModel):
-    title: str
-    link: str
-    description: str
-    originallink: str = ""
-    source: str = ""
-    pubDate: str = ""
-    domain: str = ""
-    formatted_pubdate: str = ""
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from http_client import get_client, NAVER_API, ARTICLE
+from cache import SingleFlight
+from filters import compile_query
+from extractors import decode_html
+from extract_pool import EXTRACTION_POOL
+from serialization import dumps
+from resilience import NAVER_UPSTREAM, INTERACTIVE_BUDGET, BACKGROUND_BUDGET
+from publishers import PUBLISHERS, netloc_of
+from metrics import NAVER_API_SECONDS, ARTICLE_DOWNLOAD_SECONDS
+
+# Overridable so the benchmarks / load tests can point the scraper at a local stub
+NAVER_NEWS_API_URL = os.getenv("NAVER_NEWS_API_URL", "https://openapi.naver.com/v1/search/news.json")
+
+NEWS_ITEM_FIELDS = ("title", "link", "description", "originallink", "source", "pubDate", "domain", "formatted_pubdate")
+
+@lru_cache(maxsize=8192)
+def parse_pub_date(raw_pub: str):
+    """
+    Parses a Naver pubDate once: returns (unix timestamp, '2025년 1월 2일 3시 4분').
+    Unparseable dates give (0.0, raw_pub). Cached, since polling sees the same dates over and over.
+    """
+    try:
+        dt = parsedate_to_datetime(raw_pub)
+    except (TypeError, ValueError):
+        return 0.0, raw_pub
+    return dt.timestamp(), f"{dt.year}년 {dt.month}월 {dt.day}일 {dt.hour}시 {dt.minute}분"
+
+class NewsItem:
+    """
+    One search result. Built once at ingest, with the derived fields the app
+    keeps needing precomputed: `published_at` (unix timestamp, 0.0 if unknown)
+    and `search_text` (what the +/- filters match against). The JSON encoding
+    is cached on first use, so repeated responses reuse the same bytes.
+    Items are treated as immutable.
+    """
+
+    __slots__ = NEWS_ITEM_FIELDS + ("published_at", "search_text", "_json")
+
+    def __init__(self, title: str, link: str, description: str, originallink: str = "", source: str = "",
+                 pubDate: str = "", domain: str = "", formatted_pubdate: str = "", published_at: float = None):
+        self.title = title
+        self.link = link
+        self.description = description
+        self.originallink = originallink
+        self.source = source
+        self.pubDate = pubDate
+        self.domain = domain
+        self.formatted_pubdate = formatted_pubdate
+        self.published_at = parse_pub_date(pubDate)[0] if published_at is None else published_at
+        self.search_text = title + " " + description
+        self._json = None
+
+    def dict(self) -> dict:
+        return {field: getattr(self, field) for field in NEWS_ITEM_FIELDS}
+
+    def json_bytes(self) -> bytes:
+        if self._json is None:
+            self._json = dumps(self.dict())
+        return self._json
+
+    def __eq__(self, other):
+        return isinstance(other, NewsItem) and self.dict() == other.dict()
+
+    def __repr__(self):
+        return f"NewsItem(link={self.link!r}, title={self.title!r})"
 
 async def get_naver_api_headers():
     """Retrieves Naver API credentials from environment variables."""
@@ -64,131 +83,160 @@ async def get_naver_api_headers():
         
     return {"X-Naver-Client-Id": client_id, "X-Naver-Client-Secret": client_secret}
 
-async def fetch_news(keyword: str, headers: dict, start: int = 1, display: int = 20):
+# Identical in-flight fetch_news calls share one upstream request
+NEWS_FLIGHTS = SingleFlight()
+
+def normalize_query(keyword: str) -> str:
+    """Collapses whitespace so trivially different spellings share a coalescing key."""
+    return " ".join(keyword.split())
+
+async def fetch_news(keyword: str, headers: dict, start: int = 1, display: int = 20, client: httpx.AsyncClient = None,
+                     interactive: bool = False):
+    """
+    Fetches news for a keyword that may carry +/- filter operators.
+    Only the base query goes upstream; include/exclude filters are applied
+    locally with the keyword's compiled matcher (2nd layer filtering).
+    """
+    query = compile_query(keyword)
+    items = await fetch_base_news(query.base, headers, start=start, display=display, client=client,
+                                  interactive=interactive)
+    return query.apply(items)
+
+async def fetch_base_news(query: str, headers: dict, start: int = 1, display: int = 20, client: httpx.AsyncClient = None,
+                          interactive: bool = False):
     """
-    Fetches news data from Naver Open API.
+    Fetches unfiltered results for a base query from Naver Open API.
+    Concurrent calls for the same (query, start, display) are coalesced into
+    a single upstream request whose result every caller receives.
+    The request runs under the upstream resilience policy: interactive calls get
+    a short time budget and hedging, background ones (the poller) a longer budget.
+    Raises resilience.UpstreamError when the API can't be reached, rather than
+    returning [], so callers never mistake an outage for "no results".
+    """
+    query = normalize_query(query)
+    key = (query, start, display)
+    budget = INTERACTIVE_BUDGET if interactive else BACKGROUND_BUDGET
+    return await NEWS_FLIGHTS.do(key, lambda: NAVER_UPSTREAM.call(
+        lambda: _fetch_news_upstream(query, headers, start, display, client), budget=budget, hedge=interactive,
+    ))
+
+async def _fetch_news_upstream(keyword: str, headers: dict, start: int, display: int, client: httpx.AsyncClient = None):
+    """
+    Performs one Naver Open API request (one attempt; errors propagate to the policy).
     Handles HTML unescaping, date formatting, and source mapping.
+    Uses the shared pooled client unless one is injected.
     """
-    url = "https://openapi.naver.com/v1/search/news.json"
     params = {"query": keyword, "display": display, "start": start, "sort": "date"}
 
+    client = client or get_client(NAVER_API)
+
+    started = time.perf_counter()
+    outcome = "cancelled"  # e.g. the losing copy of a hedged request
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            res = await client.get(url, headers=headers, params=params)
-            res.raise_for_status()
-            data = res.json()
+        res = await client.get(NAVER_NEWS_API_URL, headers=headers, params=params)
+        outcome = str(res.status_code)
     except Exception as e:
-        print(f"[API Error] fetch_news: {e}")
-        return []
-
-    items = []
-    for item in data.get("items", []):
-        # Clean HTML tags from title/description
-        raw_title = item.get("title", "")
-        raw_desc = item.get("description", "")
-        clean_title = html.unescape(re.sub(r"<[^>]*>", "", raw_title))
-        clean_desc = html.unescape(re.sub(r"<[^>]*>", "", raw_desc))
-        
-        # Determine Source/Domain
-        origin = item.get("originallink") or item.get("link") or ""
-        source = item.get("source", "")
-        netloc = urlparse(origin).netloc or ""
-        domain = netloc.replace("www.", "")
-        
-        if not source:
-            source = DOMAIN_MAP.get(domain, domain)
-
-        # Format Date
-        raw_pub = item.get("pubDate", "")
-        formatted_pub = raw_pub
-        if raw_pub:
-            try:
-                dt = parsedate_to_datetime(raw_pub)
-                formatted_pub = f"{dt.year}년 {dt.month}월 {dt.day}일 {dt.hour}시 {dt.minute}분"
-            except:
-                pass
-        
-        items.append(NewsItem(
-            title=clean_title, 
-            link=item.get("link", ""), 
-            description=clean_desc,
-            originallink=item.get("originallink", ""), 
-            source=source,
-            pubDate=raw_pub, 
-            domain=domain, 
-            formatted_pubdate=formatted_pub
-        ))
-
-    # --- 🔍 Server-Side Strict Filtering (2nd layer) ---
-    # Extract includes and excludes from keyword
-    includes = re.findall(r'\+"([^"]+)"', keyword) + re.findall(r'\+([^\s"]+)', keyword)
-    excludes = re.findall(r'-([^\s"]+)', keyword)
-    
-    if not includes and not excludes:
-        return items
-        
-    filtered_items = []
-    for item in items:
-        # Check both title and description for matches
-        search_text = (item.title + " " + item.description).lower()
-        
-        # 🟢 Must Include ALL
-        all_included = True
-        for inc in includes:
-            if inc.lower() not in search_text:
-                all_included = False
-                break
-        
-        if not all_included:
-            continue
-            
-        # 🔴 Must NOT include ANY
-        contains_exclude = False
-        for ex in excludes:
-            if ex.lower() in search_text:
-                contains_exclude = True
-                break
-        
-        if contains_exclude:
-            continue
-            
-        filtered_items.append(item)
-        
-    return filtered_items
+        outcome = type(e).__name__
+        raise
+    finally:
+        NAVER_API_SECONDS.observe(time.perf_counter() - started, outcome)
+    res.raise_for_status()
+    data = res.json()
+
+    return [news_item_from_api(item) for item in data.get("items", [])]
+
+_TAG_RE = re.compile(r"<[^>]*>")
+
+def clean_text(raw: str) -> str:
+    """Strips tags (Naver wraps matches in <b>) and unescapes entities, skipping work plain text doesn't need."""
+    if "<" in raw:
+        raw = _TAG_RE.sub("", raw)
+    return html.unescape(raw) if "&" in raw else raw
+
+def news_item_from_api(item: dict) -> NewsItem:
+    """Normalizes one raw Naver API item: clean text, source/domain mapping and the parsed date."""
+    # Determine Source/Domain
+    origin = item.get("originallink") or item.get("link") or ""
+    source = item.get("source", "")
+    domain, publisher = PUBLISHERS.resolve(netloc_of(origin))
+
+    if not source:
+        source = publisher
+
+    # Parse the date once; the timestamp rides along on the item
+    raw_pub = item.get("pubDate", "")
+    published_at, formatted_pub = parse_pub_date(raw_pub) if raw_pub else (0.0, raw_pub)
+
+    return NewsItem(
+        title=clean_text(item.get("title", "")),
+        link=item.get("link", ""),
+        description=clean_text(item.get("description", "")),
+        originallink=item.get("originallink", ""),
+        source=source,
+        pubDate=raw_pub,
+        domain=domain,
+        formatted_pubdate=formatted_pub,
+        published_at=published_at,
+    )
+
+# Pages larger than this are cut off; article bodies sit well inside the first couple of MB
+ARTICLE_MAX_BYTES = int(os.getenv("ARTICLE_MAX_BYTES", str(2 * 1024 * 1024)))
 
-async def parse_article(url: str) -> str:
+class ArticlePage(NamedTuple):
+    status: int
+    html: Optional[str]   # None on 304 Not Modified
+    etag: Optional[str]
+    last_modified: Optional[str]
+    domain: str           # host of the final URL after redirects
+
+async def fetch_article_page(url: str, client: httpx.AsyncClient = None, etag: str = None,
+                             last_modified: str = None, max_bytes: int = ARTICLE_MAX_BYTES) -> ArticlePage:
+    """
+    Streams an article page, optionally as a conditional GET.
+    Reading stops once max_bytes have arrived, so huge pages never load fully.
+    """
+    client = client or get_client(ARTICLE)
+
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    started = time.perf_counter()
+    outcome = "cancelled"
+    try:
+        async with client.stream("GET", url, headers=headers) as response:
+            html_content = None
+            if response.status_code != 304:
+                chunks, size = [], 0
+                async for chunk in response.aiter_bytes():
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= max_bytes:
+                        break
+                html_content = decode_html(b"".join(chunks)[:max_bytes], response.charset_encoding)
+            outcome = str(response.status_code)
+
+            return ArticlePage(
+                response.status_code,
+                html_content,
+                response.headers.get("etag") or etag,
+                response.headers.get("last-modified") or last_modified,
+                response.url.host,
+            )
+    except Exception as e:
+        outcome = type(e).__name__
+        raise
+    finally:
+        ARTICLE_DOWNLOAD_SECONDS.observe(time.perf_counter() - started, outcome)
+
+async def parse_article(url: str, client: httpx.AsyncClient = None) -> str:
     """
     Crawls the target URL to extract the main article content.
-    Uses a heuristic approach with common class names/IDs.
     """
     try:
-        async with httpx.AsyncClient(timeout=10, follow_redirects=True) as client:
-            response = await client.get(url)
-            html_content = response.text
-        
-        soup = BeautifulSoup(html_content, "html.parser")
-        
-        # List of common selectors for article bodies in Korean news sites
-        candidates = [
-            {"tag": "div", "class": "article_body"},
-            {"tag": "div", "class": "newsct_article"},
-            {"tag": "div", "class": "go_trans"},
-            {"tag": "article", "class": None},
-            {"tag": "div", "class": "article"},
-            {"tag": "div", "id": "articleBody"},
-        ]
-        
-        for c in candidates:
-            section = soup.find(c["tag"], class_=c["class"]) if c["class"] else soup.find(c["tag"])
-            if section:
-                text = section.get_text(" ", strip=True)
-                if len(text) > 50: return text
-        
-        # Fallback: Open Graph description
-        og_desc = soup.find("meta", property="og:description")
-        if og_desc: return og_desc.get("content", "")
-        
-        # Final Fallback: Raw text dump (truncated)
-        return soup.get_text(" ", strip=True)[:1000] + "..."
+        page = await fetch_article_page(url, client=client)
+        return await EXTRACTION_POOL.extract(page.html, page.domain)
     except Exception as e:
         return f"Content extraction failed: {str(e)}"
@@ -0,0 +1,348 @@
+import abc
+import asyncio
+import importlib.util
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+# ==============================================================================
+# SHARED STATE & PUB/SUB BACKENDS
+# ==============================================================================
+# Lets several uvicorn workers (or replicas) act as one app:
+#   - key/value with TTL   (watch lists, client presence)
+#   - counters             (cluster-wide event ids)
+#   - pub/sub channels     (notifications, watch changes, cache updates)
+#   - leases               (leader election: exactly one poller cluster-wide)
+#
+# STATE_BACKEND selects the backend:
+#   memory                    single process (default, same behaviour as before)
+#   sqlite:///path/to/file    every worker on one host shares a SQLite file
+#   redis://host:6379/0       multi-node; needs the optional 'redis' package
+
+STATE_BACKEND = os.getenv("STATE_BACKEND", "memory")
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class StateBackend(abc.ABC):
+    """Interface shared by every backend. Values are JSON-serializable."""
+
+    @abc.abstractmethod
+    async def get(self, key: str):
+        ...
+
+    @abc.abstractmethod
+    async def set(self, key: str, value, ttl: float = None):
+        ...
+
+    async def set_many(self, mapping: dict, ttl: float = None):
+        for key, value in mapping.items():
+            await self.set(key, value, ttl)
+
+    @abc.abstractmethod
+    async def delete(self, key: str):
+        ...
+
+    @abc.abstractmethod
+    async def get_prefix(self, prefix: str) -> dict:
+        """Returns {key: value} for every live key starting with prefix."""
+
+    @abc.abstractmethod
+    async def incr(self, key: str) -> int:
+        ...
+
+    @abc.abstractmethod
+    async def publish(self, channel: str, message: dict):
+        ...
+
+    @abc.abstractmethod
+    def subscribe(self, channel: str):
+        """Async iterator over messages published to channel from now on (including our own)."""
+
+    @abc.abstractmethod
+    async def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """Acquires the lease, or renews it if `owner` already holds it."""
+
+    @abc.abstractmethod
+    async def release_lease(self, name: str, owner: str):
+        ...
+
+    async def close(self):
+        pass
+
+
+# ------------------------------------------------------------------------------
+# In-process backend
+# ------------------------------------------------------------------------------
+
+class MemoryBackend(StateBackend):
+    def __init__(self):
+        self._kv = {}        # key -> (expires_at or None, value)
+        self._counters = {}
+        self._subscribers = {}  # channel -> set(asyncio.Queue)
+        self._leases = {}    # name -> (owner, expires_at)
+
+    def _live(self, key):
+        entry = self._kv.get(key)
+        if entry is None:
+            return None
+        if entry[0] is not None and entry[0] <= time.time():
+            del self._kv[key]
+            return None
+        return entry
+
+    async def get(self, key):
+        entry = self._live(key)
+        return entry[1] if entry else None
+
+    async def set(self, key, value, ttl=None):
+        self._kv[key] = (time.time() + ttl if ttl else None, value)
+
+    async def delete(self, key):
+        self._kv.pop(key, None)
+
+    async def get_prefix(self, prefix):
+        return {k: e[1] for k in list(self._kv) if k.startswith(prefix) and (e := self._live(k))}
+
+    async def incr(self, key):
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def publish(self, channel, message):
+        for queue in self._subscribers.get(channel, ()):
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel):
+        queue = asyncio.Queue()
+        self._subscribers.setdefault(channel, set()).add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers[channel].discard(queue)
+
+    async def acquire_lease(self, name, owner, ttl):
+        holder = self._leases.get(name)
+        now = time.time()
+        if holder is None or holder[0] == owner or holder[1] <= now:
+            self._leases[name] = (owner, now + ttl)
+            return True
+        return False
+
+    async def release_lease(self, name, owner):
+        if self._leases.get(name, (None,))[0] == owner:
+            del self._leases[name]
+
+
+# ------------------------------------------------------------------------------
+# SQLite backend (all workers on one host)
+# ------------------------------------------------------------------------------
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL);
+CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS messages (id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL,
+                                     payload TEXT NOT NULL, created_at REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS messages_channel ON messages (channel, id);
+CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL);
+"""
+
+
+class SQLiteBackend(StateBackend):
+    """
+    Shared state in one SQLite file (WAL mode). Pub/sub is a message table that
+    subscribers poll by id; messages older than `retention` seconds are purged.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.25, retention: float = 600):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SQLITE_SCHEMA)
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def _run(self, fn):
+        with self._lock:
+            return fn(self._conn)
+
+    async def _call(self, fn):
+        return await asyncio.to_thread(self._run, fn)
+
+    async def get(self, key):
+        def op(conn):
+            return conn.execute("SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                                (key, time.time())).fetchone()
+        row = await self._call(op)
+        return json.loads(row[0]) if row else None
+
+    async def set(self, key, value, ttl=None):
+        await self.set_many({key: value}, ttl)
+
+    async def set_many(self, mapping, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        rows = [(k, json.dumps(v, ensure_ascii=False), expires_at) for k, v in mapping.items()]
+
+        def op(conn):
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) "
+                             "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+                             rows)
+            conn.execute("COMMIT")
+        if rows:
+            await self._call(op)
+
+    async def delete(self, key):
+        await self._call(lambda conn: conn.execute("DELETE FROM kv WHERE key = ?", (key,)))
+
+    async def get_prefix(self, prefix):
+        def op(conn):
+            return conn.execute("SELECT key, value FROM kv WHERE key >= ? AND key < ? "
+                                "AND (expires_at IS NULL OR expires_at > ?)",
+                                (prefix, prefix + "\uffff", time.time())).fetchall()
+        return {k: json.loads(v) for k, v in await self._call(op)}
+
+    async def incr(self, key):
+        def op(conn):
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("INSERT INTO counters (key, value) VALUES (?, 1) "
+                         "ON CONFLICT(key) DO UPDATE SET value = value + 1", (key,))
+            value = conn.execute("SELECT value FROM counters WHERE key = ?", (key,)).fetchone()[0]
+            conn.execute("COMMIT")
+            return value
+        return await self._call(op)
+
+    async def publish(self, channel, message):
+        now = time.time()
+        payload = json.dumps(message, ensure_ascii=False)
+
+        def op(conn):
+            conn.execute("INSERT INTO messages (channel, payload, created_at) VALUES (?, ?, ?)", (channel, payload, now))
+            if now - self._last_purge > 60:
+                self._last_purge = now
+                conn.execute("DELETE FROM messages WHERE created_at < ?", (now - self.retention,))
+        await self._call(op)
+
+    async def subscribe(self, channel):
+        row = await self._call(lambda conn: conn.execute("SELECT MAX(id) FROM messages").fetchone())
+        last_id = row[0] or 0
+        while True:
+            rows = await self._call(lambda conn: conn.execute(
+                "SELECT id, payload FROM messages WHERE channel = ? AND id > ? ORDER BY id LIMIT 500",
+                (channel, last_id)).fetchall())
+            for message_id, payload in rows:
+                last_id = message_id
+                yield json.loads(payload)
+            if not rows:
+                await asyncio.sleep(self.poll_interval)
+
+    async def acquire_lease(self, name, owner, ttl):
+        def op(conn):
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                         "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                         "WHERE leases.owner = excluded.owner OR leases.expires_at <= ?",
+                         (name, owner, now + ttl, now))
+            holder = conn.execute("SELECT owner FROM leases WHERE name = ?", (name,)).fetchone()[0]
+            conn.execute("COMMIT")
+            return holder == owner
+        return await self._call(op)
+
+    async def release_lease(self, name, owner):
+        await self._call(lambda conn: conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner)))
+
+    async def close(self):
+        self._run(lambda conn: conn.close())
+
+
+# ------------------------------------------------------------------------------
+# Redis backend (multi-node)
+# ------------------------------------------------------------------------------
+
+REDIS_AVAILABLE = importlib.util.find_spec("redis") is not None
+
+# Renew only if we still own the lease; release only our own lease.
+_RENEW_LEASE = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) else return 0 end"
+_RELEASE_LEASE = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+
+
+class RedisBackend(StateBackend):
+    def __init__(self, url: str = None, namespace: str = "navernews:", client=None):
+        """Connects to `url`, or uses `client` (an async redis client with decode_responses=True)."""
+        if client is None:
+            import redis.asyncio as aioredis  # optional dependency
+            client = aioredis.from_url(url, decode_responses=True)
+        self.redis = client
+        self.ns = namespace
+
+    async def get(self, key):
+        value = await self.redis.get(self.ns + key)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key, value, ttl=None):
+        await self.redis.set(self.ns + key, json.dumps(value, ensure_ascii=False), px=int(ttl * 1000) if ttl else None)
+
+    async def set_many(self, mapping, ttl=None):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, value in mapping.items():
+                pipe.set(self.ns + key, json.dumps(value, ensure_ascii=False), px=int(ttl * 1000) if ttl else None)
+            await pipe.execute()
+
+    async def delete(self, key):
+        await self.redis.delete(self.ns + key)
+
+    async def get_prefix(self, prefix):
+        keys = [k async for k in self.redis.scan_iter(match=self.ns + prefix + "*", count=500)]
+        if not keys:
+            return {}
+        values = await self.redis.mget(keys)
+        return {k[len(self.ns):]: json.loads(v) for k, v in zip(keys, values) if v is not None}
+
+    async def incr(self, key):
+        return await self.redis.incr(self.ns + key)
+
+    async def publish(self, channel, message):
+        await self.redis.publish(self.ns + channel, json.dumps(message, ensure_ascii=False))
+
+    async def subscribe(self, channel):
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(self.ns + channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    yield json.loads(message["data"])
+        finally:
+            await pubsub.unsubscribe(self.ns + channel)
+            await getattr(pubsub, "aclose", pubsub.close)()  # redis-py < 5.0.1 only has close()
+
+    async def acquire_lease(self, name, owner, ttl):
+        key = self.ns + "lease:" + name
+        if await self.redis.set(key, owner, nx=True, px=int(ttl * 1000)):
+            return True
+        return bool(await self.redis.eval(_RENEW_LEASE, 1, key, owner, int(ttl * 1000)))
+
+    async def release_lease(self, name, owner):
+        await self.redis.eval(_RELEASE_LEASE, 1, self.ns + "lease:" + name, owner)
+
+    async def close(self):
+        await getattr(self.redis, "aclose", self.redis.close)()
+
+
+def create_backend(spec: str = STATE_BACKEND) -> StateBackend:
+    """Builds the backend named by STATE_BACKEND."""
+    if spec.startswith("sqlite:///"):
+        return SQLiteBackend(spec[len("sqlite:///"):])
+    if spec.startswith(("redis://", "rediss://")):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("STATE_BACKEND is redis but the 'redis' package is not installed")
+        return RedisBackend(spec)
+    if spec != "memory":
+        raise ValueError(f"Unknown STATE_BACKEND: {spec}")
+    return MemoryBackend()
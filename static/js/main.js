@@ -10,6 +10,7 @@
 // ==============================================================================
 
 const RECENT_KEYWORDS_KEY = 'navernews_recent_keywords';
+const SEARCH_BATCH_SIZE = 10; // server's SEARCH_BATCH_MAX_ENTRIES; larger batches are rejected
 // CLIPPING_TEXT_KEY is now managed globally or in clipping_service.js
 
 // Global state
@@ -405,6 +406,8 @@ async function refreshSearchTab(id) {
 
     const keyword = panel.dataset.keyword;
     const contentArea = panel.querySelector('.search-panel-content');
+    // Keep the current results so an unchanged page (304) can be put back as is
+    const previousNodes = contentArea ? Array.from(contentArea.childNodes) : [];
 
     if (contentArea) {
         contentArea.innerHTML = getSkeletonHTML();
@@ -416,14 +419,24 @@ async function refreshSearchTab(id) {
     fd.append('start', 1);
     fd.append('refresh', 'true');
 
+    const headers = {};
+    if (panel.dataset.etag) headers['If-None-Match'] = panel.dataset.etag;
+
     try {
-        const resp = await fetch('/search-results', { method: 'POST', body: fd });
+        const resp = await fetch('/search-results', { method: 'POST', body: fd, headers });
+        if (resp.status === 304) {
+            if (contentArea) contentArea.replaceChildren(...previousNodes);
+            showToast(`✅ '${keyword}' 새로운 기사가 없습니다.`);
+            return;
+        }
         if (!resp.ok) {
-            showToast('새로고침 실패: 서버 오류');
-            if (contentArea) contentArea.innerHTML = '<div class="empty-state"><p>새로고침에 실패했습니다.</p></div>';
+            // Keep the results already on screen (e.g. while the news API is unavailable)
+            if (contentArea) contentArea.replaceChildren(...previousNodes);
+            showToast(resp.status === 503 ? '새로고침 실패: 뉴스 API 일시 장애' : '새로고침 실패: 서버 오류');
             return;
         }
         const html = await resp.text();
+        panel.dataset.etag = resp.headers.get('ETag') || '';
 
         if (contentArea) {
             contentArea.innerHTML = html;
@@ -442,6 +455,37 @@ async function refreshSearchTab(id) {
     }
 }
 
+/**
+ * Inserts pushed news cards at the top of a tab's result list, skipping any already shown.
+ */
+function prependNewsCards(panel, html) {
+    const list = panel.querySelector('.search-results-list');
+    if (!list || !html) return;
+
+    const template = document.createElement('template');
+    template.innerHTML = html;
+    // Skip cards already shown, or whose story (near-duplicate cluster) is already shown
+    const cards = Array.from(template.content.querySelectorAll('.news-card'))
+        .filter(card => !list.querySelector(`.news-card[data-link="${CSS.escape(card.dataset.link)}"]`))
+        .filter(card => !card.dataset.cluster ||
+            !list.querySelector(`.news-card[data-cluster="${CSS.escape(card.dataset.cluster)}"]`));
+    if (cards.length === 0) return;
+
+    const emptyState = list.querySelector('.empty-state');
+    if (emptyState) emptyState.remove();
+
+    const anchor = list.querySelector('.watch-toggle-container');
+    let insertAfter = anchor;
+    cards.forEach(card => {
+        if (insertAfter) {
+            insertAfter.after(card);
+        } else {
+            list.prepend(card);
+        }
+        insertAfter = card;
+    });
+}
+
 function switchTab(tabId) {
     if (!tabId) return;
 
@@ -507,6 +551,13 @@ function setupInfiniteScrollForPanel(panel) {
             const fd = new FormData();
             fd.append('keyword', keyword);
             fd.append('start', start);
+            // Continue after the last card shown, so articles published meanwhile don't shift the page
+            // (data-cursor: the page's last article, which may be folded into an earlier story card)
+            const cards = panel.querySelectorAll('.news-card');
+            if (cards.length > 0) {
+                const last = cards[cards.length - 1];
+                fd.append('cursor', last.dataset.cursor || last.dataset.link);
+            }
 
             try {
                 const resp = await fetch('/search-results', { method: 'POST', body: fd });
@@ -608,25 +659,7 @@ async function handleSearch() {
         if (resp.ok) {
             const html = await resp.text();
             const panel = document.getElementById(newTabId);
-            if (panel) {
-                const contentArea = panel.querySelector('.search-panel-content');
-                if (contentArea) {
-                    contentArea.innerHTML = html;
-                    
-                    // Sync toggle state
-                    const checkbox = panel.querySelector('.watch-checkbox');
-                    if (checkbox && window.keywordWatchSet) {
-                        checkbox.checked = window.keywordWatchSet.has(checkbox.dataset.keyword);
-                    }
-
-                    const sentinel = document.createElement('div');
-                    sentinel.className = 'panel-sentinel';
-                    sentinel.innerHTML = getSentinelHTML();
-                    contentArea.appendChild(sentinel);
-                }
-                panel.dataset.start = '21';
-                setupInfiniteScrollForPanel(panel);
-            }
+            if (panel) fillSearchPanel(panel, html, resp.headers.get('ETag'));
         } else {
             showToast('검색 실패: ' + resp.status);
             removeSearchTab(newTabId);
@@ -638,6 +671,124 @@ async function handleSearch() {
 }
 window.handleSearch = handleSearch;
 
+/**
+ * Puts a first results page into a search tab panel and re-arms its infinite scroll.
+ */
+function fillSearchPanel(panel, html, etag) {
+    panel.dataset.etag = etag || '';
+    const contentArea = panel.querySelector('.search-panel-content');
+    if (contentArea) {
+        contentArea.innerHTML = html;
+
+        // Sync toggle state
+        const checkbox = panel.querySelector('.watch-checkbox');
+        if (checkbox && window.keywordWatchSet) {
+            checkbox.checked = window.keywordWatchSet.has(checkbox.dataset.keyword);
+        }
+
+        const sentinel = document.createElement('div');
+        sentinel.className = 'panel-sentinel';
+        sentinel.innerHTML = getSentinelHTML();
+        contentArea.appendChild(sentinel);
+    }
+    panel.dataset.start = '21';
+    setupInfiniteScrollForPanel(panel);
+}
+
+/**
+ * Shows a failed first page in a search tab panel (no infinite scroll to arm).
+ */
+function showSearchPanelError(panel, status) {
+    const contentArea = panel.querySelector('.search-panel-content');
+    if (!contentArea) return;
+    const message = status === 503
+        ? '뉴스 API에 일시적으로 연결할 수 없습니다. 잠시 후 다시 시도해주세요.'
+        : `검색 실패: ${status || '네트워크 오류'}`;
+    contentArea.innerHTML = '<div class="empty-state"><p></p></div>';
+    contentArea.querySelector('p').textContent = message;
+}
+
+/**
+ * Reads an NDJSON response body, calling onLine with each parsed line as soon as it arrives.
+ */
+async function readNDJSON(resp, onLine) {
+    const reader = resp.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    const handleLine = (line) => {
+        if (!line.trim()) return;
+        onLine(JSON.parse(line));
+    };
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.forEach(handleLine);
+    }
+    handleLine(buffer);
+}
+
+/**
+ * Opens a tab per keyword right away and fills them from /api/search/batch requests
+ * (SEARCH_BATCH_SIZE tabs each).
+ * The server streams each tab's fragment as soon as it is ready, so a slow keyword
+ * doesn't hold back the others. Falls back to one /search-results request per tab.
+ */
+async function loadSearchTabs(keywords) {
+    const panels = keywords.map(kw => document.getElementById(createSearchTab(kw, null, 21, false)));
+    const pending = new Set(panels.map((_, i) => i));
+
+    const batches = [];
+    for (let offset = 0; offset < keywords.length; offset += SEARCH_BATCH_SIZE) {
+        batches.push(offset);
+    }
+    await Promise.all(batches.map(async (offset) => {
+        try {
+            const searches = keywords.slice(offset, offset + SEARCH_BATCH_SIZE).map(keyword => ({ keyword, start: 1 }));
+            const resp = await fetch('/api/search/batch', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ searches, format: 'html' })
+            });
+            if (!resp.ok || !resp.body) throw new Error('batch search failed: ' + resp.status);
+            await readNDJSON(resp, (result) => {
+                const index = offset + result.index;
+                const panel = panels[index];
+                // Server errors (no html) are retried one tab at a time below
+                if (!panel || result.html === undefined) return;
+                pending.delete(index);
+                if (result.status) showSearchPanelError(panel, result.status);
+                else fillSearchPanel(panel, result.html, result.etag);
+            });
+        } catch (e) {
+            console.error('일괄 검색 오류:', e);
+        }
+    }));
+
+    // Whatever the batch didn't deliver is loaded one tab at a time
+    await Promise.all(Array.from(pending).map(async (i) => {
+        const fd = new FormData();
+        fd.append('keyword', keywords[i]);
+        fd.append('start', 1);
+        try {
+            const resp = await fetch('/search-results', { method: 'POST', body: fd });
+            if (!resp.ok) {
+                showSearchPanelError(panels[i], resp.status);
+                return;
+            }
+            fillSearchPanel(panels[i], await resp.text(), resp.headers.get('ETag'));
+        } catch (e) {
+            console.error('기본 검색 오류:', e);
+            showSearchPanelError(panels[i]);
+        }
+    }));
+}
+window.loadSearchTabs = loadSearchTabs;
+
 
 // Clipping Logic moved to clipping_service.js
 
@@ -726,20 +877,7 @@ document.addEventListener('DOMContentLoaded', () => {
     // 4. Load Default Search Tabs
     async function loadDefaultSearch() {
         const keywords = ['방송미디어통신심의위원회', '방송미디어통신위원회', '과방위'];
-        for (const kw of keywords) {
-            const fd = new FormData();
-            fd.append('keyword', kw);
-            fd.append('start', 1);
-            try {
-                const resp = await fetch('/search-results', { method: 'POST', body: fd });
-                if (resp.ok) {
-                    const html = await resp.text();
-                    createSearchTab(kw, html, 21, false);
-                }
-            } catch (e) {
-                console.error('기본 검색 오류:', e);
-            }
-        }
+        await loadSearchTabs(keywords);
     }
 
 
@@ -833,7 +971,9 @@ document.addEventListener('DOMContentLoaded', () => {
             window.eventSource.close();
         }
 
-        const url = `/api/stream/notifications?client_id=${encodeURIComponent(window.sseClientId)}`;
+        // Manual reconnects lose the browser's Last-Event-ID, so pass it explicitly to resume
+        let url = `/api/stream/notifications?client_id=${encodeURIComponent(window.sseClientId)}`;
+        if (window.sseLastEventId) url += `&last_event_id=${encodeURIComponent(window.sseLastEventId)}`;
         const eventSource = new EventSource(url);
         window.eventSource = eventSource;
         
@@ -852,6 +992,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
         eventSource.onmessage = function (event) {
             resetWatchdog();
+            if (event.lastEventId) window.sseLastEventId = event.lastEventId;
             if (event.data) {
                 // Heartbeat check (skip ": ping")
                 if (event.data === 'ping') return;
@@ -870,35 +1011,38 @@ document.addEventListener('DOMContentLoaded', () => {
                     return;
                 }
 
-                // 3. Auto-Refresh Logic
-                const match = event.data.match(/\[(.*?)\]/);
-                if (match && match[1]) {
-                    const notifyKeyword = match[1];
-                    
-                    // Only show notifications and refresh if the user HAS enabled alerts for this keyword
-                    if (window.keywordWatchSet && window.keywordWatchSet.has(notifyKeyword)) {
-                        
-                        // Prevent duplicate toasts (especially during catch-up)
-                        const notifKey = `${notifyKeyword}:${event.data}`;
-                        if (RECENT_NOTIF_CACHE.has(notifKey)) return;
-                        
-                        RECENT_NOTIF_CACHE.add(notifKey);
-                        setTimeout(() => RECENT_NOTIF_CACHE.delete(notifKey), 10000); // 10s expiry
-
-                        // 1. UI Toast
-                        showToast('🔔 ' + event.data);
-                        
-                        // 2. Browser Desktop Notification
-                        showBrowserNotification(event.data);
-
-                        // 3. Auto-Refresh matching tabs
-                        document.querySelectorAll('.tab-pane').forEach(panel => {
-                            if (panel.dataset.keyword === notifyKeyword) {
-                                console.log(`Auto-refreshing tab ${panel.id} for keyword: ${notifyKeyword}`);
-                                refreshSearchTab(panel.id);
-                            }
-                        });
-                    }
+                // 3. Live Update Logic: payload carries exactly the new items
+                let payload;
+                try {
+                    payload = JSON.parse(event.data);
+                } catch (e) {
+                    return;
+                }
+                if (payload.type !== 'new_articles' || !payload.keyword) return;
+                const notifyKeyword = payload.keyword;
+
+                // Only show notifications and update if the user HAS enabled alerts for this keyword
+                if (window.keywordWatchSet && window.keywordWatchSet.has(notifyKeyword)) {
+
+                    // Prevent duplicate toasts (especially during catch-up)
+                    const notifKey = `${notifyKeyword}:${(payload.items || []).map(i => i.link).join('|')}`;
+                    if (RECENT_NOTIF_CACHE.has(notifKey)) return;
+
+                    RECENT_NOTIF_CACHE.add(notifKey);
+                    setTimeout(() => RECENT_NOTIF_CACHE.delete(notifKey), 10000); // 10s expiry
+
+                    // 1. UI Toast
+                    showToast('🔔 ' + payload.message);
+
+                    // 2. Browser Desktop Notification
+                    showBrowserNotification(payload.message);
+
+                    // 3. Prepend the new cards to matching tabs (no page refetch)
+                    document.querySelectorAll('.tab-pane').forEach(panel => {
+                        if (panel.dataset.keyword === notifyKeyword) {
+                            prependNewsCards(panel, payload.html);
+                        }
+                    });
                 }
             }
         };
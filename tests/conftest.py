@@ -0,0 +1,41 @@
+"""
+Shared test setup. The app modules read their configuration at import time,
+so state files are pointed at a temporary directory before anything imports them.
+Async tests run their scenario with asyncio.run (no pytest plugin needed).
+"""
+import contextlib
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+STATE_DIR = tempfile.mkdtemp(prefix="navernews-tests-")
+os.environ.setdefault("NEWS_ARCHIVE_PATH", os.path.join(STATE_DIR, "news_archive.sqlite3"))
+os.environ.setdefault("ARTICLE_CACHE_PATH", os.path.join(STATE_DIR, "article_cache.sqlite3"))
+os.environ.setdefault("NAVER_CLIENT_ID", "test")
+os.environ.setdefault("NAVER_CLIENT_SECRET", "test")
+
+import http_client  # noqa: E402
+import scraper  # noqa: E402
+from local_server import start_server  # noqa: E402
+
+
+@contextlib.asynccontextmanager
+async def naver_stub(handler):
+    """
+    Runs `handler` as a local Naver search API and points the scraper at it.
+    Yields the stub's stats ({"requests": n, ...}). The shared HTTP clients are
+    closed afterwards, since they are bound to the test's event loop.
+    """
+    server, base_url, stats = await start_server(handler)
+    previous = scraper.NAVER_NEWS_API_URL
+    scraper.NAVER_NEWS_API_URL = f"{base_url}/v1/search/news.json"
+    try:
+        yield stats
+    finally:
+        scraper.NAVER_NEWS_API_URL = previous
+        await http_client.shutdown_http_clients()
+        server.close()
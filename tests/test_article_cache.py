@@ -0,0 +1,117 @@
+import asyncio
+import os
+
+import pytest
+
+import http_client
+from article_cache import ArticleCache
+from local_server import start_server
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+with open(os.path.join(FIXTURES, "naver_news.html"), "rb") as f:
+    ARTICLE_HTML = f.read()
+
+
+class ArticleServer:
+    """Answers article requests with `status`; the page carries an ETag only when asked to."""
+
+    def __init__(self, etag: str = None):
+        self.status = 200
+        self.etag = etag
+
+    async def handler(self, method, path, headers):
+        if self.status != 200:
+            return self.status, "text/html; charset=utf-8", b"<html><body>error</body></html>"
+        return 200, "text/html; charset=utf-8", ARTICLE_HTML, {"ETag": self.etag} if self.etag else {}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ArticleCache(path=str(tmp_path / "articles.sqlite3"), ttl=0.1)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.parametrize("etag", ['"v1"', None], ids=["revalidation", "refetch"])
+@pytest.mark.parametrize("status", [500, 404])
+def test_failed_revalidation_keeps_stored_text(cache, etag, status):
+    server = ArticleServer(etag)
+
+    async def scenario():
+        httpd, base_url, stats = await start_server(server.handler)
+        url = f"{base_url}/article/1"
+        try:
+            stored = await cache.get(url)
+            await asyncio.sleep(0.15)  # stale: the next lookup goes upstream
+            cache.memory.clear()
+
+            server.status = status
+            kept = await cache.get(url)
+            cache.memory.clear()
+            # checked_at moved on, so the broken page isn't fetched again within the TTL
+            again = await cache.get(url)
+            return stored, kept, again, stats["requests"]
+        finally:
+            await http_client.shutdown_http_clients()
+            httpd.close()
+
+    stored, kept, again, requests = asyncio.run(scenario())
+    assert stored
+    assert kept == stored
+    assert again == stored
+    assert requests == 2
+    assert cache.kept_stale == 1
+
+
+def test_unreachable_site_keeps_stored_text(cache):
+    server = ArticleServer('"v1"')
+
+    async def scenario():
+        httpd, base_url, _ = await start_server(server.handler)
+        url = f"{base_url}/article/1"
+        try:
+            stored = await cache.get(url)
+        finally:
+            await http_client.shutdown_http_clients()  # drop the kept-alive connection too
+            httpd.close()
+        await asyncio.sleep(0.15)
+        cache.memory.clear()
+        try:
+            return stored, await cache.get(url)
+        finally:
+            await http_client.shutdown_http_clients()
+
+    stored, kept = asyncio.run(scenario())
+    assert stored
+    assert kept == stored
+    assert cache.kept_stale == 1
+
+
+def stored_urls(cache):
+    with cache._lock:
+        return sorted(url for (url,) in cache._connect().execute("SELECT url FROM articles"))
+
+
+def test_row_cap_drops_least_recently_checked(tmp_path):
+    cache = ArticleCache(path=str(tmp_path / "articles.sqlite3"), max_rows=3, max_age_days=0, prune_interval=0)
+    try:
+        now = 1_700_000_000
+        for i in range(5):
+            cache._write(f"https://example.com/{i}", f"본문 {i}", None, None, now + i)
+        cache._touch("https://example.com/2", now + 10)  # recently revalidated: kept over newer writes
+        cache._write("https://example.com/5", "본문 5", None, None, now + 11)
+        assert stored_urls(cache) == ["https://example.com/2", "https://example.com/4", "https://example.com/5"]
+        assert cache.pruned == 3
+    finally:
+        cache.close()
+
+
+def test_old_rows_pruned_on_write(tmp_path):
+    cache = ArticleCache(path=str(tmp_path / "articles.sqlite3"), max_rows=0, max_age_days=30, prune_interval=0)
+    try:
+        now = 1_700_000_000
+        cache._write("https://example.com/old", "본문", None, None, now - 31 * 86400)
+        cache._write("https://example.com/new", "본문", None, None, now)
+        assert stored_urls(cache) == ["https://example.com/new"]
+    finally:
+        cache.close()
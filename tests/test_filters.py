@@ -0,0 +1,57 @@
+import asyncio
+import json
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import main
+import scraper
+from cache import TTLCache
+from conftest import naver_stub
+from filters import compile_query
+from local_server import SAMPLE_ITEMS
+from resilience import CircuitBreaker, Upstream
+from scraper import NewsItem
+
+BODY = json.dumps({"items": SAMPLE_ITEMS}, ensure_ascii=False).encode("utf-8")
+
+
+@pytest.mark.parametrize("keyword, base", [
+    ("삼성 +반도체", "삼성 반도체"),
+    ('삼성 +"반도체 공장" -주가', '삼성 "반도체 공장"'),
+    ("+반도체 -주가", "반도체"),
+    ("삼성 -주가 -증권", "삼성"),
+    ("K-pop +BTS", "K-pop BTS"),
+])
+def test_required_terms_go_upstream(keyword, base):
+    assert compile_query(keyword).base == base
+
+
+def test_only_exclusions_filter_locally():
+    query = compile_query("삼성 +반도체 -주가")
+    kept = NewsItem(title="삼성 메모리 투자", link="a", description="")
+    dropped = NewsItem(title="삼성 주가 급등", link="b", description="")
+    assert query.apply([kept, dropped]) == [kept]
+    assert not compile_query("삼성 +반도체").has_filters
+
+
+def test_search_sends_required_terms_and_shares_exclusion_variants(monkeypatch):
+    monkeypatch.setattr(scraper, "NAVER_UPSTREAM", Upstream("naver_api", breaker=CircuitBreaker("naver_api"),
+                                                            max_attempts=1))
+    monkeypatch.setattr(main, "SEARCH_CACHE", TTLCache())
+    queries = []
+
+    async def handler(method, path, headers):
+        queries.append(parse_qs(urlsplit(path).query)["query"][0])
+        return 200, "application/json; charset=utf-8", BODY
+
+    async def scenario():
+        async with naver_stub(handler):
+            full = await main.get_search_items("샘플 +기사", 1, {})
+            await main.get_search_items("샘플 -요약", 1, {})
+            await main.get_search_items("샘플 -제목", 1, {})
+            return full
+
+    full = asyncio.run(scenario())
+    assert queries == ["샘플 기사", "샘플"]
+    assert len(full) == len(SAMPLE_ITEMS)
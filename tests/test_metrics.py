@@ -0,0 +1,46 @@
+import asyncio
+
+import httpx
+
+import main
+import metrics
+from fanout import ClientChannel, Event
+from profiling import PROFILER, PROFILER_INTERVAL
+
+
+def test_sse_queue_metrics_are_aggregated(monkeypatch):
+    channels = {}
+    for client_id, depth in (("client-a", 3), ("client-b", 0), ("client-c", 5)):
+        channel = ClientChannel(client_id)
+        for i in range(depth):
+            channel.push(Event(i, f"키워드{i}", {"items": []}, 0.0))
+        channels[client_id] = channel
+    monkeypatch.setattr(main, "sse_connections", channels)
+
+    main.collect_runtime_metrics()
+    text = metrics.REGISTRY.render()
+
+    assert "sse_connections 3\n" in text
+    assert "sse_queued_events 8\n" in text
+    assert "sse_queue_depth_max 5\n" in text
+    # Client ids never become label values
+    assert "client_id" not in text
+    assert "client-a" not in text
+
+
+def test_profiler_interval_is_clamped():
+    async def start(interval_ms):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://app",
+                                     cookies={"access_token": main.APP_ACCESS_KEY}) as client:
+            resp = await client.post("/api/profiler/start", data={"seconds": 1, "interval_ms": interval_ms})
+            await client.post("/api/profiler/stop")
+            return resp.json()
+
+    try:
+        assert asyncio.run(start(0.001))["interval_ms"] == 1
+        assert asyncio.run(start(-5))["interval_ms"] == 1
+        assert asyncio.run(start(10_000))["interval_ms"] == 100
+    finally:
+        PROFILER.stop()
+        PROFILER.interval = PROFILER_INTERVAL
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from filters import compile_query
+from news_archive import NewsArchive
+from scraper import NewsItem
+
+
+def items(start: int, count: int):
+    return [NewsItem(title=f"반도체 기사 {i}", link=f"https://n.news.naver.com/article/{i}", description="요약",
+                     published_at=1_700_000_000 + i) for i in range(start, start + count)]
+
+
+@pytest.fixture
+def archive_factory(tmp_path):
+    archives = []
+
+    def build(**limits):
+        archive = NewsArchive(path=str(tmp_path / "archive.sqlite3"), **limits)
+        archives.append(archive)
+        return archive
+
+    yield build
+    for archive in archives:
+        asyncio.run(archive.close())
+
+
+def links(found):
+    return sorted(int(item.link.rsplit("/", 1)[1]) for item in found)
+
+
+def test_row_cap_keeps_latest_archived(archive_factory):
+    archive = archive_factory(max_age_days=0, max_rows=5)
+
+    async def scenario():
+        archive.add(items(0, 4))
+        await archive.flush()
+        archive.add(items(4, 4))
+        await archive.flush()
+        return await archive.search(compile_query("반도체"), limit=20), await archive.stats()
+
+    found, stats = asyncio.run(scenario())
+    assert links(found) == [3, 4, 5, 6, 7]
+    assert stats["items"] == 5
+    assert stats["pruned"] == 3
+
+
+def test_old_items_pruned_on_flush(archive_factory):
+    archive = archive_factory(max_age_days=30, max_rows=0)
+
+    async def scenario():
+        archive.add(items(0, 3))
+        await archive.flush()
+        # Pretend the first batch was archived 31 days ago
+        with archive._lock:
+            with archive._conn:
+                archive._conn.execute("UPDATE news SET archived_at = archived_at - 31 * 86400")
+        archive.add(items(3, 2))
+        await archive.flush()
+        return await archive.search(compile_query("반도체"), limit=20), await archive.stats()
+
+    found, stats = asyncio.run(scenario())
+    assert links(found) == [3, 4]
+    assert stats["items"] == 2
+    assert stats["pruned"] == 3
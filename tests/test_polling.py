@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+import main
+from cache import TTLCache
+from scraper import NewsItem
+
+BASE = "반도체"
+
+
+def items(start: int, count: int, base_time: float = 1_700_000_000):
+    return [NewsItem(title=f"반도체 기사 {i}", link=f"https://n.news.naver.com/article/{i}", description="",
+                     published_at=base_time + i * 60) for i in range(start, start + count)]
+
+
+@pytest.fixture
+def notified(monkeypatch):
+    """Watches BASE with an empty seen-set and records what would be pushed to clients."""
+    sent = []
+
+    async def notify(keyword, new_items):
+        sent.extend(new_items)
+
+    monkeypatch.setattr(main, "notify_new_articles", notify)
+    monkeypatch.setattr(main, "DEDUP_ENABLED", False)
+    monkeypatch.setattr(main, "SEARCH_CACHE", TTLCache())
+    monkeypatch.setitem(main.POLL_GROUPS, BASE, [BASE])
+    main.SEEN_LINKS.pop(BASE, None)
+    main.SEEN_STORIES.pop(BASE, None)
+    yield sent
+    main.SEEN_LINKS.pop(BASE, None)
+    main.SEEN_STORIES.pop(BASE, None)
+
+
+@pytest.mark.parametrize("complete", [False, True], ids=["batched", "widened-solo"])
+def test_first_poll_does_not_report_items_older_than_cached_page(notified, complete):
+    cached_page = list(reversed(items(100, 20)))
+    main.SEARCH_CACHE[f"{BASE}_1"] = cached_page
+
+    # A deep window: two articles newer than the cached page, then 40 older ones it never showed
+    newer = list(reversed(items(200, 2)))
+    older = list(reversed(items(0, 40)))
+    asyncio.run(main.publish_polled_items(BASE, newer + cached_page[:5] + older, complete=complete))
+
+    assert [item.link for item in notified] == [item.link for item in newer]
+
+    # The old items count as seen from now on
+    notified.clear()
+    asyncio.run(main.publish_polled_items(BASE, older, complete=False))
+    assert notified == []
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+import main
+import scraper
+from cache import TTLCache
+from conftest import naver_stub
+from local_server import SAMPLE_ITEMS
+from resilience import CircuitBreaker, CircuitOpen, QuotaExceeded, Upstream, UpstreamError
+
+BODY = json.dumps({"items": SAMPLE_ITEMS}, ensure_ascii=False).encode("utf-8")
+QUOTA_BODY = json.dumps({"errorMessage": "Query limit exceeded", "errorCode": "010"}).encode("utf-8")
+KEYWORD = "샘플"
+
+
+class Faults:
+    """What the stub answers; tests flip it between phases."""
+
+    def __init__(self):
+        self.status = 200
+        self.headers = {}
+
+    async def handler(self, method, path, headers):
+        body = BODY if self.status == 200 else QUOTA_BODY if self.status == 429 else b'{"errorCode":"SE99"}'
+        return self.status, "application/json; charset=utf-8", body, self.headers
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Single attempt per call, three failures to trip, short recovery; shared by scraper and main."""
+    upstream = Upstream("naver_api", breaker=CircuitBreaker("naver_api", failure_threshold=3, recovery_time=0.3),
+                        max_attempts=1)
+    monkeypatch.setattr(scraper, "NAVER_UPSTREAM", upstream)
+    monkeypatch.setattr(main, "NAVER_UPSTREAM", upstream)
+    monkeypatch.setattr(main, "SEARCH_CACHE", TTLCache(ttl=0.05, stale_ttl=3600))
+    monkeypatch.setattr(main, "SEARCH_SWR_WINDOW", 0)
+    return upstream
+
+
+def test_breaker_opens_after_consecutive_failures(upstream):
+    faults = Faults()
+    faults.status = 500
+
+    async def scenario():
+        async with naver_stub(faults.handler) as stats:
+            for _ in range(3):
+                with pytest.raises(UpstreamError) as error:
+                    await scraper.fetch_base_news(KEYWORD, headers={})
+                assert error.value.status == 500
+            assert upstream.breaker.state == CircuitBreaker.OPEN
+
+            # Open circuit: rejected without reaching the API
+            with pytest.raises(CircuitOpen):
+                await scraper.fetch_base_news(KEYWORD, headers={})
+            return stats["requests"]
+
+    assert asyncio.run(scenario()) == 3
+
+
+def test_stale_page_served_while_breaker_is_open(upstream, capsys):
+    faults = Faults()
+
+    async def scenario():
+        async with naver_stub(faults.handler) as stats:
+            fresh = await main.get_search_items(KEYWORD, 1, {})
+            await asyncio.sleep(0.1)  # past the cache TTL
+
+            faults.status = 500
+            for _ in range(3):
+                assert await main.get_search_items(KEYWORD, 1, {}) == fresh
+            assert upstream.breaker.state == CircuitBreaker.OPEN
+            requests = stats["requests"]
+
+            # With the circuit open the stale page is answered straight away, without background refreshes
+            capsys.readouterr()
+            for _ in range(5):
+                assert await main.get_search_items(KEYWORD, 1, {}) == fresh
+            await asyncio.sleep(0.01)
+            return fresh, requests, stats["requests"]
+
+    fresh, requests, after = asyncio.run(scenario())
+    assert len(fresh) == len(SAMPLE_ITEMS)
+    assert requests == 4
+    assert after == requests
+    assert "Background refresh failed" not in capsys.readouterr().out
+
+
+def test_quota_error_opens_breaker_at_once(upstream):
+    faults = Faults()
+    faults.status = 429
+    faults.headers = {"Retry-After": "30"}
+
+    async def scenario():
+        async with naver_stub(faults.handler) as stats:
+            with pytest.raises(QuotaExceeded) as error:
+                await scraper.fetch_base_news(KEYWORD, headers={})
+            assert error.value.retry_after == 30
+            assert upstream.breaker.state == CircuitBreaker.OPEN
+            assert upstream.breaker.retry_after() > 25  # Retry-After wins over recovery_time
+
+            with pytest.raises(CircuitOpen):
+                await scraper.fetch_base_news(KEYWORD, headers={})
+            return stats["requests"]
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_breaker_recovers_after_cooldown(upstream):
+    faults = Faults()
+    faults.status = 500
+
+    async def scenario():
+        async with naver_stub(faults.handler) as stats:
+            for _ in range(3):
+                with pytest.raises(UpstreamError):
+                    await scraper.fetch_base_news(KEYWORD, headers={})
+            assert upstream.breaker.state == CircuitBreaker.OPEN
+
+            faults.status = 200
+            await asyncio.sleep(0.35)  # past recovery_time: the next call is the half-open probe
+            items = await scraper.fetch_base_news(KEYWORD, headers={})
+            assert upstream.breaker.state == CircuitBreaker.CLOSED
+            return items, stats["requests"]
+
+    items, requests = asyncio.run(scenario())
+    assert len(items) == len(SAMPLE_ITEMS)
+    assert requests == 4
+
+
+def test_failed_probe_reopens_breaker(upstream):
+    faults = Faults()
+    faults.status = 500
+
+    async def scenario():
+        async with naver_stub(faults.handler):
+            for _ in range(3):
+                with pytest.raises(UpstreamError):
+                    await scraper.fetch_base_news(KEYWORD, headers={})
+            await asyncio.sleep(0.35)
+            with pytest.raises(UpstreamError) as error:
+                await scraper.fetch_base_news(KEYWORD, headers={})
+            assert not isinstance(error.value, CircuitOpen)
+            assert upstream.breaker.state == CircuitBreaker.OPEN
+            assert upstream.breaker.trips == 2
+
+    asyncio.run(scenario())
+
+
+def test_archive_search_answers_while_api_is_down(upstream):
+    faults = Faults()
+
+    async def scenario():
+        async with naver_stub(faults.handler):
+            await main.get_search_items(KEYWORD, 1, {})
+            await main.NEWS_ARCHIVE.flush()
+            main.NEWS_ARCHIVE.synced.clear()
+            main.SEARCH_CACHE.clear()  # nothing stale to fall back on: the refresh itself fails
+
+            faults.status = 500
+            started = time.monotonic()
+            items = await main.get_search_items(KEYWORD, 1, {}, mode="archive")
+            return items, time.monotonic() - started
+
+    items, elapsed = asyncio.run(scenario())
+    assert {item.link for item in items} >= {item["link"] for item in SAMPLE_ITEMS}
+    assert elapsed < 2
@@ -0,0 +1,35 @@
+import asyncio
+import json
+
+import httpx
+
+import main
+from conftest import naver_stub
+from local_server import default_handler
+
+
+async def post_batch(keywords):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app",
+                                 cookies={"access_token": main.APP_ACCESS_KEY}) as client:
+        return await client.post("/api/search/batch", json={
+            "searches": [{"keyword": keyword, "start": 1} for keyword in keywords], "format": "html"})
+
+
+def test_oversized_batch_is_rejected():
+    keywords = [f"키워드{i}" for i in range(main.SEARCH_BATCH_MAX_ENTRIES + 1)]
+    resp = asyncio.run(post_batch(keywords))
+    assert resp.status_code == 413
+    assert str(main.SEARCH_BATCH_MAX_ENTRIES) in resp.json()["error"]
+
+
+def test_batch_streams_one_line_per_entry():
+    async def scenario():
+        async with naver_stub(default_handler):
+            return await post_batch(["배치 하나", "배치 둘"])
+
+    resp = asyncio.run(scenario())
+    assert resp.status_code == 200
+    lines = [json.loads(line) for line in resp.text.splitlines() if line]
+    assert sorted(line["index"] for line in lines) == [0, 1]
+    assert all(line["html"] and "status" not in line for line in lines)
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from shared_state import MemoryBackend, RedisBackend, SQLiteBackend, StateBackend
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def workers(request, tmp_path):
+    """Two backends seeing the same shared state, as two workers would."""
+    if request.param == "memory":
+        backend = MemoryBackend()
+        pair = (backend, backend)
+    elif request.param == "sqlite":
+        path = str(tmp_path / "state.sqlite3")
+        pair = (SQLiteBackend(path, poll_interval=0.02), SQLiteBackend(path, poll_interval=0.02))
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        pair = tuple(RedisBackend(client=fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+                     for _ in range(2))
+    yield pair
+    for backend in set(pair):
+        asyncio.run(backend.close())
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        StateBackend()
+
+
+def test_key_value_with_ttl(workers):
+    a, b = workers
+
+    async def scenario():
+        await a.set("watch:1", ["삼성전자"], ttl=0.2)
+        await a.set_many({"watch:2": ["반도체"], "other": 1})
+        assert await b.get("watch:1") == ["삼성전자"]
+        assert await b.get_prefix("watch:") == {"watch:1": ["삼성전자"], "watch:2": ["반도체"]}
+        await asyncio.sleep(0.3)
+        assert await b.get("watch:1") is None
+        await b.delete("watch:2")
+        assert await a.get_prefix("watch:") == {}
+        assert [await a.incr("seq"), await b.incr("seq")] == [1, 2]
+
+    asyncio.run(scenario())
+
+
+def test_lease_acquire_renew_and_expiry(workers):
+    a, b = workers
+
+    async def scenario():
+        assert await a.acquire_lease("poller", "a", ttl=0.3)
+        assert not await b.acquire_lease("poller", "b", ttl=0.3)
+
+        # Renewal by the holder pushes expiry back
+        await asyncio.sleep(0.2)
+        assert await a.acquire_lease("poller", "a", ttl=0.3)
+        await asyncio.sleep(0.2)
+        assert not await b.acquire_lease("poller", "b", ttl=0.3)
+
+        # Unrenewed, the lease lapses and another worker takes over
+        await asyncio.sleep(0.2)
+        assert await b.acquire_lease("poller", "b", ttl=0.3)
+
+        # Only the holder can release it
+        await a.release_lease("poller", "a")
+        assert not await a.acquire_lease("poller", "a", ttl=0.3)
+        await b.release_lease("poller", "b")
+        assert await a.acquire_lease("poller", "a", ttl=0.3)
+
+    asyncio.run(scenario())
+
+
+def test_publish_reaches_subscribers(workers):
+    a, b = workers
+
+    async def scenario():
+        messages = b.subscribe("events")
+        first = asyncio.ensure_future(messages.__anext__())
+        await asyncio.sleep(0.1)  # subscribed before anything is published
+        await a.publish("other", {"n": 0})
+        await a.publish("events", {"n": 1, "keyword": "삼성전자"})
+        await a.publish("events", {"n": 2})
+        try:
+            received = [await asyncio.wait_for(first, 2), await asyncio.wait_for(messages.__anext__(), 2)]
+        finally:
+            await messages.aclose()
+        return received
+
+    assert asyncio.run(scenario()) == [{"n": 1, "keyword": "삼성전자"}, {"n": 2}]
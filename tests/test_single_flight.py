@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import pytest
+
+import scraper
+from conftest import naver_stub
+from local_server import SAMPLE_ITEMS
+from resilience import CircuitBreaker, Upstream, UpstreamError
+
+BODY = json.dumps({"items": SAMPLE_ITEMS}, ensure_ascii=False).encode("utf-8")
+
+
+@pytest.fixture(autouse=True)
+def fresh_upstream(monkeypatch):
+    """A single-attempt policy, so the stub's request count is the number of upstream calls."""
+    upstream = Upstream("naver_api", breaker=CircuitBreaker("naver_api"), max_attempts=1)
+    monkeypatch.setattr(scraper, "NAVER_UPSTREAM", upstream)
+    return upstream
+
+
+def slow_handler(status: int, body: bytes = BODY):
+    async def handler(method, path, headers):
+        await asyncio.sleep(0.2)  # long enough for every caller to join the flight
+        return status, "application/json; charset=utf-8", body
+    return handler
+
+
+def test_concurrent_callers_share_one_upstream_call():
+    async def scenario():
+        async with naver_stub(slow_handler(200)) as stats:
+            results = await asyncio.gather(*(
+                # Spellings differing only in whitespace share the flight too
+                scraper.fetch_base_news("삼성 전자" if i % 2 else " 삼성  전자 ", headers={}, start=1, display=20)
+                for i in range(20)
+            ))
+            return stats["requests"], results
+
+    requests, results = asyncio.run(scenario())
+    assert requests == 1
+    assert all(len(items) == len(SAMPLE_ITEMS) for items in results)
+    assert all(items is results[0] for items in results)
+
+
+def test_flight_failure_reaches_every_waiter():
+    async def scenario():
+        async with naver_stub(slow_handler(400, b'{"errorCode":"SE01"}')) as stats:
+            results = await asyncio.gather(*(
+                scraper.fetch_base_news("삼성전자", headers={}) for _ in range(10)
+            ), return_exceptions=True)
+            return stats["requests"], results
+
+    requests, results = asyncio.run(scenario())
+    assert requests == 1
+    assert all(isinstance(result, UpstreamError) and result.status == 400 for result in results)
+
+
+def test_later_calls_start_a_new_flight():
+    async def scenario():
+        async with naver_stub(slow_handler(200)) as stats:
+            await scraper.fetch_base_news("삼성전자", headers={})
+            await scraper.fetch_base_news("삼성전자", headers={})
+            return stats["requests"]
+
+    assert asyncio.run(scenario()) == 2
@@ -0,0 +1,50 @@
+import asyncio
+
+import main
+from scraper import NewsItem
+from timeline import Timeline
+
+
+def items(start: int, count: int, base_time: float = 1_700_000_000):
+    return [NewsItem(title=f"기사 {i}", link=f"https://n.news.naver.com/article/{i}", description="",
+                     published_at=base_time + i) for i in range(start, start + count)]
+
+
+def test_batched_poll_leaves_upstream_offsets_alone():
+    base = "타임라인 배치"
+    first_page = items(0, 20)
+    main.TIMELINES.merge_head(base, first_page)
+    timeline = main.TIMELINES.get(base)
+    assert timeline.upstream_next == 21
+
+    # Items routed out of an OR-batched poll: not a contiguous first page
+    routed = items(100, 3)
+    asyncio.run(main.publish_polled_items(base, routed, complete=False))
+    assert timeline.upstream_next == 21
+    assert timeline.gap_after is None
+    assert [item.link for item in timeline.items[:3]] == [item.link for item in reversed(routed)]
+
+    # A complete poll is a first page again: the newer items shift upstream offsets
+    asyncio.run(main.publish_polled_items(base, items(200, 2) + routed + first_page[:15], complete=True))
+    assert timeline.upstream_next == 23
+
+
+def test_batched_poll_does_not_start_a_timeline():
+    base = "타임라인 없음"
+    asyncio.run(main.publish_polled_items(base, items(0, 3), complete=False))
+    assert base not in main.TIMELINES.timelines
+
+
+def test_index_after_finds_position_without_comparing_items(monkeypatch):
+    timeline = Timeline("커서")
+    # Equal timestamps and out-of-order arrival, as real pages have
+    timeline.merge(items(0, 30, base_time=1_700_000_000) + items(30, 10, base_time=1_699_999_970))
+    timeline.merge(items(40, 5, base_time=1_700_000_000))
+
+    def no_eq(self, other):
+        raise AssertionError("cursor lookup compared NewsItems")
+
+    monkeypatch.setattr(NewsItem, "__eq__", no_eq)
+    for position, item in enumerate(timeline.items):
+        assert timeline.index_after(item.link) == position + 1
+    assert timeline.index_after("https://unknown") is None
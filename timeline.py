@@ -0,0 +1,259 @@
+import asyncio
+import bisect
+import itertools
+import os
+import time
+
+from cache import TTLCache, estimate_size
+
+# ==============================================================================
+# PER-KEYWORD MERGED TIMELINES
+# ==============================================================================
+# Naver pages by offset over a date-sorted list, so every article published
+# while a user scrolls shifts the next page: the same item shows up twice and,
+# if the list is refreshed, items can be skipped. Instead, every base query has
+# one timeline: items keyed by link, kept newest first. Pages are sliced from it
+# after a cursor (the link of the last card on screen), and upstream is only
+# asked for more when the slice runs past what has been fetched so far.
+#
+# Upstream pages are merged by link, so an offset that drifted just re-delivers
+# items we already have. A refreshed first page that doesn't overlap the timeline
+# leaves a gap below it, which is filled from upstream before anyone pages past
+# it. Serving page n starts a background fetch for page n+1.
+
+TIMELINE_FETCH_SIZE = int(os.getenv("TIMELINE_FETCH_SIZE", "100"))  # Naver allows display <= 100
+TIMELINE_MAX_START = 1000  # Naver rejects start > 1000
+TIMELINE_MAX_ITEMS = int(os.getenv("TIMELINE_MAX_ITEMS", "1100"))
+TIMELINE_MAX_KEYWORDS = int(os.getenv("TIMELINE_MAX_KEYWORDS", "200"))
+TIMELINE_MAX_BYTES = int(os.getenv("TIMELINE_MAX_BYTES", str(64 * 1024 * 1024)))
+TIMELINE_TTL = float(os.getenv("TIMELINE_TTL", "1800"))
+
+
+class Timeline:
+    """Date-ordered, link-deduplicated items of one base query."""
+
+    def __init__(self, base: str):
+        self.base = base
+        self.lock = asyncio.Lock()
+        self._seq = itertools.count()
+        self.version = 0         # bumped by upstream fetches and merges
+        self.reset()
+
+    def reset(self):
+        self.items = []          # newest first
+        self._keys = []          # parallel sort keys: (-timestamp, seq)
+        self.links = {}          # link -> item
+        self._key_of = {}        # link -> its sort key, to find an item's position by bisection
+        self.upstream_next = 1   # next Naver `start` to fetch for older items
+        self.exhausted = False   # upstream has nothing older
+        self.gap_after = None    # link right above a stretch of missing items, if any
+        self.gap_next = None     # Naver `start` to fill that gap from
+        self.approx_bytes = 0
+        self.updated_at = time.time()
+
+    def __len__(self):
+        return len(self.items)
+
+    def _insert(self, item):
+        key = (-item.published_at, next(self._seq))
+        index = bisect.bisect(self._keys, key)
+        self._keys.insert(index, key)
+        self.items.insert(index, item)
+        self.links[item.link] = item
+        self._key_of[item.link] = key
+        self.approx_bytes += estimate_size(item)
+
+    def merge(self, items) -> int:
+        """Adds unseen items; returns how many were new."""
+        added = 0
+        for item in items:
+            if item.link and item.link not in self.links:
+                self._insert(item)
+                added += 1
+        # Bounded: the oldest items go first
+        while len(self.items) > TIMELINE_MAX_ITEMS:
+            self._keys.pop()
+            dropped = self.items.pop()
+            del self.links[dropped.link]
+            del self._key_of[dropped.link]
+            self.approx_bytes -= estimate_size(dropped)
+            self.exhausted = True
+        self.updated_at = time.time()
+        return added
+
+    def merge_head(self, items):
+        """
+        Merges a fresh first page. Items newer than our newest one shifted every
+        upstream offset by that many. If none of the page overlaps what we have,
+        items may be missing between it and our older items: remember the gap.
+        """
+        if not items:
+            return
+        self.version += 1
+        disconnected = bool(self.items) and not any(item.link in self.links for item in items)
+        if disconnected and self.gap_after is not None:
+            # A second gap on top of an unfilled one is not worth tracking
+            self.reset()
+            disconnected = False
+        top = self._keys[0][0] if self._keys else None
+        shifted = sum(1 for item in items if item.link not in self.links and (top is None or -item.published_at < top))
+        self.merge(items)
+        if self.upstream_next == 1:
+            self.upstream_next = len(items) + 1
+        else:
+            self.upstream_next += shifted
+        if disconnected:
+            self.gap_after = items[-1].link
+            self.gap_next = len(items) + 1
+
+    def gap_position(self):
+        """Index where missing items would go, or None when the timeline is contiguous."""
+        return self.index_after(self.gap_after) if self.gap_after is not None else None
+
+    def index_after(self, cursor: str):
+        """Position right after the item with link `cursor`, or None if unknown."""
+        key = self._key_of.get(cursor)
+        if key is None:
+            return None
+        # Sort keys are unique (seq breaks ties), so this lands exactly on the item
+        return bisect.bisect_left(self._keys, key) + 1
+
+    def can_fetch_more(self) -> bool:
+        return not self.exhausted and self.upstream_next <= TIMELINE_MAX_START
+
+
+class TimelineCache:
+    """
+    Timelines by base query. `fetch_page(base, start, display)` is the upstream
+    call (returns unfiltered NewsItems).
+    """
+
+    def __init__(self, fetch_page, fetch_size: int = TIMELINE_FETCH_SIZE):
+        self.fetch_page = fetch_page
+        self.fetch_size = fetch_size
+        self.timelines = TTLCache(max_entries=TIMELINE_MAX_KEYWORDS, max_bytes=TIMELINE_MAX_BYTES,
+                                  ttl=TIMELINE_TTL, sizer=lambda timeline: timeline.approx_bytes)
+        self.upstream_fetches = 0
+        self.prefetches = 0
+        self._prefetching = set()
+
+    def get(self, base: str) -> Timeline:
+        timeline = self.timelines.get(base)
+        if timeline is None:
+            timeline = Timeline(base)
+            self.timelines[base] = timeline
+        return timeline
+
+    def merge_head(self, base: str, items):
+        """Feeds a freshly fetched first page (search or poller) into the timeline."""
+        timeline = self.get(base)
+        timeline.merge_head(items)
+        self.timelines[base] = timeline  # re-account size
+
+    def merge(self, base: str, items):
+        """
+        Feeds items that aren't a contiguous first page (routed out of a batched
+        poll) into an existing timeline, leaving its upstream offsets alone.
+        """
+        timeline = self.timelines.get(base)
+        if timeline is None or not items:
+            return
+        if timeline.merge(items):
+            timeline.version += 1
+            self.timelines[base] = timeline
+
+    async def _fetch(self, timeline: Timeline, start: int):
+        display = min(self.fetch_size, TIMELINE_MAX_START - start + 1)
+        items = await self.fetch_page(timeline.base, start, display)
+        self.upstream_fetches += 1
+        timeline.version += 1
+        return items, display
+
+    async def _fetch_more(self, timeline: Timeline):
+        """Fetches the next page of older items."""
+        start = timeline.upstream_next
+        items, display = await self._fetch(timeline, start)
+        timeline.upstream_next = start + display
+        if len(items) < display:
+            timeline.exhausted = True
+        timeline.merge(items)
+        self.timelines[timeline.base] = timeline
+
+    async def _fill_gap(self, timeline: Timeline):
+        """Fetches the next page below the gap; the gap is closed once a page reaches our older items."""
+        older = {item.link for item in timeline.items[timeline.gap_position():]}
+        start = timeline.gap_next
+        items, display = await self._fetch(timeline, start)
+        timeline.merge(items)
+        if any(item.link in older for item in items) or len(items) < display or start + display > TIMELINE_MAX_START:
+            timeline.gap_after = timeline.gap_next = None
+        else:
+            timeline.gap_after = items[-1].link
+            timeline.gap_next = start + display
+        self.timelines[timeline.base] = timeline
+
+    async def _collect(self, timeline: Timeline, query, position: int, limit: int):
+        """Matching items from `position` on, fetching upstream until `limit` are found or upstream ends."""
+        while True:
+            page = []
+            gap = timeline.gap_position()
+            at_gap = gap is not None and gap >= position
+            for item in timeline.items[position:gap if at_gap else None]:
+                if not query.has_filters or query.matches(item.search_text):
+                    page.append(item)
+                    if len(page) == limit:
+                        return page
+            if not at_gap and not timeline.can_fetch_more():
+                return page
+            version = timeline.version
+            async with timeline.lock:
+                # Another request fetched while we waited: rescan first
+                if timeline.version != version:
+                    continue
+                if timeline.gap_after is not None and at_gap:
+                    await self._fill_gap(timeline)
+                elif timeline.can_fetch_more():
+                    await self._fetch_more(timeline)
+                else:
+                    continue
+
+    async def page(self, query, limit: int = 20, cursor: str = None, offset: int = 0):
+        """
+        One page of a CompiledQuery: the `limit` matching items after `cursor`
+        (or after `offset` matching items when the cursor is unknown).
+        Starts prefetching the following page in the background.
+        """
+        timeline = self.get(query.base)
+        position = timeline.index_after(cursor) if cursor else None
+        if position is None:
+            skipped = await self._collect(timeline, query, 0, offset) if offset else []
+            position = timeline.index_after(skipped[-1].link) if skipped else 0
+        page = await self._collect(timeline, query, position, limit)
+        if page:
+            self._prefetch(timeline, query, page[-1].link, limit)
+        return page
+
+    def _prefetch(self, timeline: Timeline, query, cursor: str, limit: int):
+        key = (timeline.base, query.keyword)
+        if key in self._prefetching or not timeline.can_fetch_more():
+            return
+        self._prefetching.add(key)
+        self.prefetches += 1
+
+        async def run():
+            try:
+                await self._collect(timeline, query, timeline.index_after(cursor) or 0, limit)
+            except Exception as e:
+                print(f"[Timeline Error] prefetch {timeline.base}: {e}")
+            finally:
+                self._prefetching.discard(key)
+
+        asyncio.ensure_future(run())
+
+    def stats(self) -> dict:
+        return {
+            "timelines": len(self.timelines),
+            "upstream_fetches": self.upstream_fetches,
+            "prefetches": self.prefetches,
+            "cache": self.timelines.stats(),
+        }